@@ -0,0 +1,194 @@
+# agregados.py
+"""
+Agregación en una pasada de los resultados por grupos (material, control, veredicto
+y etiquetas del usuario como piso o eje).
+
+Por grupo se guardan, para delta_kN, lambda y utilización (carga aplicada / carga
+admisible): cantidad, suma, mínimo, máximo y un boceto de cuantiles. El boceto cuenta
+los valores en cubetas logarítmicas de ancho relativo fijo, así que cada cuantil tiene
+error relativo <= ERROR_RELATIVO, su tamaño no crece con la cantidad de filas y dos
+bocetos se combinan sumando cubetas. Por eso los agregados de bloques calculados en
+paralelo o en flujo se pueden combinar en cualquier orden (salvo el redondeo de las sumas).
+"""
+import json
+import math
+from collections import Counter
+import numpy as np
+
+ERROR_RELATIVO = 0.01
+CUANTILES = (0.05, 0.5, 0.95, 0.99)
+METRICAS = ("delta_kN", "lambda", "utilizacion")
+POR_DEFECTO = ("material", "control", "veredicto")
+
+
+class BocetoCuantiles:
+    """Histograma de cubetas logarítmicas para valores de cualquier signo."""
+    __slots__ = ("positivas", "negativas", "ceros", "gamma_log")
+
+    def __init__(self, error_relativo=ERROR_RELATIVO):
+        gamma = (1.0 + error_relativo) / (1.0 - error_relativo)
+        self.gamma_log = math.log(gamma)
+        self.positivas = Counter()
+        self.negativas = Counter()
+        self.ceros = 0
+
+    def agregar(self, valores):
+        v = np.asarray(valores, dtype=np.float64)
+        v = v[~np.isnan(v)]
+        for signo, cubetas in ((1.0, self.positivas), (-1.0, self.negativas)):
+            parte = v[signo * v > 0]
+            if len(parte):
+                indices, cantidades = np.unique(np.ceil(np.log(np.abs(parte)) / self.gamma_log).astype(np.int64),
+                                                return_counts=True)
+                cubetas.update(dict(zip(indices.tolist(), cantidades.tolist())))
+        self.ceros += int(np.count_nonzero(v == 0))
+
+    def combinar(self, otro):
+        self.positivas.update(otro.positivas)
+        self.negativas.update(otro.negativas)
+        self.ceros += otro.ceros
+
+    def _valor(self, indice):
+        # punto medio (relativo) de la cubeta (gamma^(i-1), gamma^i]
+        gamma = math.exp(self.gamma_log)
+        return 2.0 * math.exp(indice * self.gamma_log) / (gamma + 1.0)
+
+    def cuantil(self, q):
+        total = sum(self.positivas.values()) + sum(self.negativas.values()) + self.ceros
+        if not total:
+            return None
+        rango = q * (total - 1)
+        acumulado = 0
+        # de más negativo a más positivo
+        for indice in sorted(self.negativas, reverse=True):
+            acumulado += self.negativas[indice]
+            if acumulado > rango:
+                return -self._valor(indice)
+        acumulado += self.ceros
+        if acumulado > rango:
+            return 0.0
+        for indice in sorted(self.positivas):
+            acumulado += self.positivas[indice]
+            if acumulado > rango:
+                return self._valor(indice)
+        return self._valor(max(self.positivas)) if self.positivas else 0.0
+
+
+class ResumenMetrica:
+    __slots__ = ("n", "suma", "minimo", "maximo", "boceto")
+
+    def __init__(self):
+        self.n = 0
+        self.suma = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.boceto = BocetoCuantiles()
+
+    def agregar(self, valores):
+        v = np.asarray(valores, dtype=np.float64)
+        v = v[~np.isnan(v)]
+        if not len(v):
+            return
+        self.n += len(v)
+        # suma secuencial, como los totales de calcular_volumenes_totales
+        self.suma += float(np.cumsum(v)[-1])
+        self.minimo = min(self.minimo, float(v.min()))
+        self.maximo = max(self.maximo, float(v.max()))
+        self.boceto.agregar(v)
+
+    def combinar(self, otro):
+        self.n += otro.n
+        self.suma += otro.suma
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self.boceto.combinar(otro.boceto)
+
+    def como_dict(self):
+        if not self.n:
+            return {"n": 0}
+        d = {"n": self.n, "suma": self.suma, "min": self.minimo, "max": self.maximo, "media": self.suma / self.n}
+        for q in CUANTILES:
+            # el mínimo y el máximo son exactos: el cuantil aproximado no puede salirse de ellos
+            d[f"p{round(q * 100)}"] = min(max(self.boceto.cuantil(q), self.minimo), self.maximo)
+        return d
+
+
+def _valor_de_clave(valor):
+    """Valor hashable para la clave de grupo: una etiqueta de JSONL puede ser lista u objeto."""
+    if isinstance(valor, (list, tuple)):
+        return tuple(_valor_de_clave(v) for v in valor)
+    if isinstance(valor, dict):
+        return json.dumps(valor, sort_keys=True, ensure_ascii=False, default=str)
+    try:
+        hash(valor)
+    except TypeError:
+        return repr(valor)
+    return valor
+
+
+class AgregadorResultados:
+    """
+    Acumula bloques de resultados (diccionarios de calcular_carga_admisible) por grupo.
+    por enumera los campos que forman la clave de grupo: material, control, veredicto
+    o el nombre de una etiqueta (sexto elemento de la columna, ver flujo.leer_columnas).
+    La memoria es proporcional a la cantidad de grupos, no de filas.
+    """
+
+    def __init__(self, por=POR_DEFECTO):
+        self.por = tuple(por)
+        self.grupos = {}
+        self.errores = 0
+
+    def agregar(self, resultados, columnas=None):
+        """Agrega un bloque. columnas (la misma matriz del bloque) aporta las etiquetas."""
+        por = self.por
+        valores = {}
+        for i, res in enumerate(resultados):
+            if "error" in res:
+                self.errores += 1
+                continue
+            etiquetas = None
+            if columnas is not None and len(columnas[i]) > 5 and isinstance(columnas[i][5], dict):
+                etiquetas = columnas[i][5]
+            clave = tuple(res[c] if c in res else (etiquetas.get(c) if etiquetas else None) for c in por)
+            try:
+                listas = valores.get(clave)
+            except TypeError:
+                clave = tuple(_valor_de_clave(v) for v in clave)
+                listas = valores.get(clave)
+            if listas is None:
+                listas = valores[clave] = ([], [], [])
+            listas[0].append(res["delta_kN"])
+            listas[1].append(res["lambda"])
+            listas[2].append(res["carga_aplicada_kN"] / res["carga_adm_final_kN"])
+
+        for clave, listas in valores.items():
+            grupo = self.grupos.get(clave)
+            if grupo is None:
+                grupo = self.grupos[clave] = tuple(ResumenMetrica() for _ in METRICAS)
+            for resumen, lista in zip(grupo, listas):
+                resumen.agregar(lista)
+        return self
+
+    def combinar(self, otro):
+        """Suma otro agregador (p. ej. de otro proceso o bloque) con la misma clave de grupo."""
+        if otro.por != self.por:
+            raise ValueError(f"Claves de grupo distintas: {self.por} y {otro.por}")
+        self.errores += otro.errores
+        for clave, grupo in otro.grupos.items():
+            propio = self.grupos.get(clave)
+            if propio is None:
+                propio = self.grupos[clave] = tuple(ResumenMetrica() for _ in METRICAS)
+            for a, b in zip(propio, grupo):
+                a.combinar(b)
+        return self
+
+    def resultado(self):
+        """Lista de grupos ordenada por clave, cada uno con sus métricas como diccionario."""
+        filas = []
+        for clave in sorted(self.grupos, key=lambda k: tuple(str(v) for v in k)):
+            grupo = self.grupos[clave]
+            fila = {"grupo": dict(zip(self.por, clave)), "n": grupo[0].n}
+            fila.update({m: r.como_dict() for m, r in zip(METRICAS, grupo)})
+            filas.append(fila)
+        return {"por": list(self.por), "grupos": filas, "errores": self.errores}
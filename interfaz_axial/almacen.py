@@ -0,0 +1,267 @@
+# almacen.py
+"""
+Almacén persistente de resultados en SQLite.
+
+Cada fila se identifica por (id, factor_seguridad, K_factor): volver a evaluar una
+columna con el mismo FS y K reemplaza su resultado anterior. Además se guarda un hash
+de las entradas (columna, propiedades del material, FS y K) que sólo sirve para
+saltear las columnas que no cambiaron. Los ids se guardan como texto (7 y "7" son
+la misma columna). Control y veredicto se guardan con los códigos enteros de lotes.py;
+consultar() acepta también los textos.
+"""
+import hashlib
+import sqlite3
+import numpy as np
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD, ESBELTEZ_CRITERIO
+from lotes import matriz_a_arreglos, calcular_lote, CONTROL_TEXTO, VEREDICTO_TEXTO
+
+VERSION_ESQUEMA = 3
+VIGENTE = "vigente"  # en consultar: el FS o K de la última evaluación
+
+COLUMNAS = (
+    "hash", "id", "altura_m", "area_m2", "r_m", "material", "f_c_MPa", "E_GPa",
+    "carga_aplicada_kN", "carga_adm_material_kN", "euler_adm_kN", "carga_adm_final_kN",
+    "lambda", "control", "delta_kN", "veredicto", "error", "factor_seguridad", "K_factor",
+)
+
+_TABLA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    hash INTEGER NOT NULL,
+    id TEXT,
+    altura_m REAL, area_m2 REAL, r_m REAL,
+    material TEXT, f_c_MPa REAL, E_GPa REAL,
+    carga_aplicada_kN REAL, carga_adm_material_kN REAL, euler_adm_kN REAL, carga_adm_final_kN REAL,
+    lambda REAL, control INTEGER, delta_kN REAL, veredicto INTEGER, error TEXT,
+    factor_seguridad REAL, K_factor REAL,
+    PRIMARY KEY (id, factor_seguridad, K_factor)
+)
+"""
+_TABLA_CORRIDA = """
+CREATE TABLE IF NOT EXISTS ultima_corrida (
+    fila INTEGER PRIMARY KEY CHECK (fila = 0),
+    factor_seguridad REAL, K_factor REAL
+)
+"""
+# las consultas filtran casi siempre por una corrida (FS, K): va al frente de cada índice
+INDICES = {
+    "ix_resultados_hash": "hash",
+    "ix_resultados_material": "factor_seguridad, K_factor, material, control, veredicto, delta_kN",
+    "ix_resultados_control": "factor_seguridad, K_factor, control, veredicto, delta_kN",
+    "ix_resultados_veredicto": "factor_seguridad, K_factor, veredicto, delta_kN",
+    "ix_resultados_lambda": "factor_seguridad, K_factor, lambda",
+}
+# con inserciones grandes conviene borrar los índices y recrearlos al final
+UMBRAL_RECREAR_INDICES = 50000
+
+CONTROL_CODIGO = {texto: codigo for codigo, texto in enumerate(CONTROL_TEXTO)}
+VEREDICTO_CODIGO = {texto: codigo for codigo, texto in VEREDICTO_TEXTO.items()}
+
+
+def hashes_entrada(matriz_columnas, materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD,
+                   K_factor=0.5):
+    """
+    Entero de 64 bits con signo por columna que identifica sus entradas: el contenido
+    de la columna, f_c y E de su material, FS y K (lo mismo que incremental.clave_columna).
+    """
+    blake2b = hashlib.blake2b
+    desde_bytes = int.from_bytes
+    props = {k: (m["f_c"], m["E_GPa"]) for k, m in materiales_dic.items()}
+    hashes = []
+    for col in matriz_columnas:
+        mat = col[3] if len(col) > 3 and isinstance(col[3], str) else None
+        texto = repr((col, props.get(mat), factor_seguridad, K_factor))
+        hashes.append(desde_bytes(blake2b(texto.encode("utf-8"), digest_size=8).digest(), "big", signed=True))
+    return hashes
+
+
+def _id_texto(id_col):
+    return None if id_col is None else str(id_col)
+
+
+def _codigo(valor, codigos):
+    if valor is None or isinstance(valor, int):
+        return valor
+    if valor not in codigos:
+        raise ValueError(f"Valor desconocido: '{valor}' (use {', '.join(codigos)})")
+    return codigos[valor]
+
+
+class AlmacenResultados:
+    """Tabla de resultados en un archivo SQLite (o en memoria con ':memory:')."""
+
+    def __init__(self, ruta=":memory:"):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("PRAGMA temp_store=MEMORY")
+        version = self.conexion.execute("PRAGMA user_version").fetchone()[0]
+        if version < VERSION_ESQUEMA:
+            # la versión 1 usaba el hash como clave y acumulaba resultados viejos, y la 2
+            # guardaba los ids sin tipo; son recalculables, así que la tabla se vuelve a crear
+            self.conexion.execute("DROP TABLE IF EXISTS resultados")
+        self.conexion.execute(_TABLA)
+        self.conexion.execute(_TABLA_CORRIDA)
+        self._crear_indices()
+        self.conexion.execute(f"PRAGMA user_version={VERSION_ESQUEMA}")
+        self.conexion.commit()
+
+    def _crear_indices(self):
+        for nombre, campos in INDICES.items():
+            self.conexion.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON resultados ({campos})")
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __len__(self):
+        return self.conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+    def faltantes(self, hashes):
+        """Posiciones de hashes que no están guardados (en orden)."""
+        con = self.conexion
+        con.execute("CREATE TEMP TABLE IF NOT EXISTS entrada (pos INTEGER PRIMARY KEY, hash INTEGER)")
+        con.execute("DELETE FROM temp.entrada")
+        con.executemany("INSERT INTO temp.entrada VALUES (?, ?)", enumerate(hashes))
+        filas = con.execute(
+            "SELECT e.pos FROM temp.entrada e LEFT JOIN resultados r ON r.hash = e.hash "
+            "WHERE r.hash IS NULL ORDER BY e.pos").fetchall()
+        con.execute("DELETE FROM temp.entrada")
+        return [f[0] for f in filas]
+
+    def insertar(self, filas):
+        """
+        Inserta tuplas en el orden de COLUMNAS en una sola transacción; la fila con el
+        mismo (id, FS, K) se reemplaza. En cargas grandes los índices secundarios se
+        reconstruyen al final en lugar de mantenerse fila por fila.
+        """
+        filas = list(filas)
+        sql = f"INSERT OR REPLACE INTO resultados VALUES ({', '.join('?' * len(COLUMNAS))})"
+        with self.conexion:
+            # reconstruir sólo compensa si lo nuevo no es una fracción chica de lo guardado
+            recrear = len(filas) >= UMBRAL_RECREAR_INDICES and 4 * len(filas) >= len(self)
+            if recrear:
+                for nombre in INDICES:
+                    self.conexion.execute(f"DROP INDEX IF EXISTS {nombre}")
+            self.conexion.executemany(sql, filas)
+            if recrear:
+                self._crear_indices()
+
+    def corrida_vigente(self):
+        """(factor_seguridad, K_factor) de la última evaluación, o None si no hubo."""
+        return self.conexion.execute("SELECT factor_seguridad, K_factor FROM ultima_corrida").fetchone()
+
+    def evaluar(self, matriz_columnas, materiales_dic=MATERIALES,
+                factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+        """
+        Calcula y guarda las columnas cuyas entradas no están en el almacén; una columna
+        cuyo id ya estaba guardado con este FS y K reemplaza ese resultado. Si un id se
+        repite en la matriz sólo cuenta la última fila (las anteriores no se calculan).
+        Devuelve {'filas', 'calculadas', 'omitidas', 'repetidas'}.
+        """
+        ultima = {_id_texto(col[0] if len(col) else None): i for i, col in enumerate(matriz_columnas)}
+        repetidas = len(matriz_columnas) - len(ultima)
+        if repetidas:
+            # si no, la fila descartada volvería a faltar en cada reevaluación
+            matriz_columnas = [matriz_columnas[i] for i in sorted(ultima.values())]
+        hashes = hashes_entrada(matriz_columnas, materiales_dic, factor_seguridad, K_factor)
+        pendientes = self.faltantes(hashes)
+        if pendientes:
+            nuevas = [matriz_columnas[i] for i in pendientes]
+            self.insertar(_filas_resultado(nuevas, [hashes[i] for i in pendientes], materiales_dic,
+                                           factor_seguridad, K_factor))
+        with self.conexion:
+            self.conexion.execute("INSERT OR REPLACE INTO ultima_corrida VALUES (0, ?, ?)",
+                                  (float(factor_seguridad), float(K_factor)))
+        return {"filas": len(matriz_columnas) + repetidas, "calculadas": len(pendientes),
+                "omitidas": len(matriz_columnas) - len(pendientes), "repetidas": repetidas}
+
+    def consultar(self, id=None, material=None, control=None, veredicto=None,
+                  delta_min=None, delta_max=None, lambda_min=None, lambda_max=None,
+                  con_error=False, limite=None, factor_seguridad=VIGENTE, K_factor=VIGENTE):
+        """
+        Resultados que cumplen todos los filtros dados, como diccionarios con las
+        claves de calcular_carga_admisible más factor_seguridad y K_factor.
+        delta_min y lambda_min son estrictos (>). Por omisión sólo se devuelven los
+        de la última evaluación (VIGENTE); con None se aceptan todos los FS o K.
+        """
+        condiciones, params = [], []
+        vigente = self.corrida_vigente()
+        for campo, valor, i in (("factor_seguridad", factor_seguridad, 0), ("K_factor", K_factor, 1)):
+            if valor == VIGENTE:
+                valor = vigente[i] if vigente is not None else None
+            if valor is not None:
+                condiciones.append(f"{campo} = ?")
+                params.append(float(valor))
+        if id is not None:
+            condiciones.append("id = ?")
+            params.append(_id_texto(id))
+        if material is not None:
+            condiciones.append("material = ?")
+            params.append(material)
+        if control is not None:
+            condiciones.append("control = ?")
+            params.append(_codigo(control, CONTROL_CODIGO))
+        if veredicto is not None:
+            condiciones.append("veredicto = ?")
+            params.append(_codigo(veredicto, VEREDICTO_CODIGO))
+        if delta_min is not None:
+            condiciones.append("delta_kN > ?")
+            params.append(float(delta_min))
+        if delta_max is not None:
+            condiciones.append("delta_kN <= ?")
+            params.append(float(delta_max))
+        if lambda_min is not None:
+            condiciones.append("lambda > ?")
+            params.append(float(lambda_min))
+        if lambda_max is not None:
+            condiciones.append("lambda <= ?")
+            params.append(float(lambda_max))
+        condiciones.append("error IS NOT NULL" if con_error else "error IS NULL")
+
+        sql = "SELECT * FROM resultados WHERE " + " AND ".join(condiciones)
+        if limite is not None:
+            sql += " LIMIT ?"
+            params.append(int(limite))
+        return [_fila_a_dict(f) for f in self.conexion.execute(sql, params)]
+
+
+def _fila_a_dict(fila):
+    d = dict(zip(COLUMNAS, fila))
+    del d["hash"]
+    if d["error"] is not None:
+        return {"id": d["id"], "error": d["error"]}
+    del d["error"]
+    d["control"] = CONTROL_TEXTO[d["control"]]
+    d["veredicto"] = VEREDICTO_TEXTO[d["veredicto"]]
+    return d
+
+
+def _filas_resultado(matriz_columnas, hashes, materiales_dic, factor_seguridad, K_factor):
+    """Tuplas listas para insertar, calculadas con el motor vectorizado."""
+    ids, arr, errores = matriz_a_arreglos(matriz_columnas, materiales_dic)
+    lote = calcular_lote(arr["alturas"], arr["areas"], arr["radios"], arr["materiales_idx"], arr["cargas"],
+                         materiales_dic, factor_seguridad, K_factor)
+    claves = list(materiales_dic.keys())
+    esbelta = lote["lambda"] > ESBELTEZ_CRITERIO
+    euler = np.where(esbelta, lote["euler_adm_kN"], np.nan).tolist()
+    columnas = [lote[c].tolist() for c in (
+        "altura_m", "area_m2", "r_m", "material_idx", "f_c_MPa", "E_GPa", "carga_aplicada_kN",
+        "carga_adm_material_kN", "carga_adm_final_kN", "lambda", "control", "delta_kN", "veredicto")]
+    fs, K = float(factor_seguridad), float(K_factor)
+    vacia = (None,) * 14
+
+    for i, (h, id_col, ok) in enumerate(zip(hashes, ids, lote["valido"].tolist())):
+        id_col = _id_texto(id_col)
+        if not ok:
+            yield (h, id_col) + vacia + (errores[i], fs, K)
+            continue
+        L, A, r, m, f_c, E, P, c_mat, c_final, lam, control, delta, veredicto = (c[i] for c in columnas)
+        e = euler[i]
+        yield (h, id_col, L, A, r, claves[m], f_c, E, P, c_mat, None if e != e else e, c_final,
+               lam, control, delta, veredicto, None, fs, K)
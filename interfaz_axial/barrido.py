@@ -0,0 +1,107 @@
+# barrido.py
+import numpy as np
+from utils import validar_numero
+from materiales import MATERIALES, ESBELTEZ_CRITERIO
+from lotes import (
+    matriz_a_arreglos, tablas_materiales, tabla_pi2_E_Pa,
+    VEREDICTO_FALLA, VEREDICTO_MARGEN, VEREDICTO_EQUILIBRIO,
+)
+
+
+def preparar_barrido(matriz_columnas, materiales_dic=MATERIALES):
+    """
+    Trabajo por columna que no depende de FS ni de K: parseo, validación,
+    búsqueda de material, A·f_c·1000 y π²·E·1e9·A·r².
+    """
+    ids, arr, errores = matriz_a_arreglos(matriz_columnas, materiales_dic)
+    _, tabla_fc, _ = tablas_materiales(materiales_dic)
+    tabla_pi2E = tabla_pi2_E_Pa(materiales_dic)
+
+    valido = arr["materiales_idx"] >= 0
+    idx = np.where(valido, arr["materiales_idx"], 0)
+    A = arr["areas"]
+    r = arr["radios"]
+    f_c = tabla_fc[idx] if len(tabla_fc) else np.zeros(len(ids))
+    pi2_E_Pa = tabla_pi2E[idx] if len(tabla_pi2E) else np.zeros(len(ids))
+
+    return {
+        "ids": ids,
+        "errores": errores,
+        "valido": valido,
+        "altura_m": arr["alturas"],
+        "r_m": r,
+        "carga_aplicada_kN": arr["cargas"],
+        # mismo orden de operaciones que el cálculo escalar
+        "capacidad_material": A * f_c * 1000.0,
+        "rigidez_euler": pi2_E_Pa * (A * (r * r)),
+    }
+
+
+def barrido_parametros(matriz_columnas, factores_seguridad, K_factores,
+                       materiales_dic=MATERIALES, completo=True, preparado=None):
+    """
+    Evalúa todas las columnas para cada combinación (FS, K) de la grilla.
+    Devuelve cubos [FS, K, columna] con carga admisible, delta, control y veredicto,
+    lambda por [K, columna] y totales por [FS, K]. Con completo=False sólo se guardan
+    los totales, útil para tablas de sensibilidad sobre modelos grandes.
+    El eje de columnas recorre sólo las filas válidas, en orden (ver 'valido').
+    Se puede pasar el resultado de preparar_barrido para reutilizarlo entre llamadas.
+    """
+    prep = preparado or preparar_barrido(matriz_columnas, materiales_dic)
+    lista_fs = [validar_numero(fs, "factor_seguridad") for fs in factores_seguridad]
+    lista_K = [float(K) for K in K_factores]
+
+    valido = prep["valido"]
+    L = prep["altura_m"][valido]
+    r = prep["r_m"][valido]
+    P = prep["carga_aplicada_kN"][valido]
+    cap_mat = prep["capacidad_material"][valido]
+    rigidez = prep["rigidez_euler"][valido]
+
+    n_fs, n_K, n = len(lista_fs), len(lista_K), len(L)
+    forma = (n_fs, n_K, n)
+    salida = {
+        "ids": prep["ids"],
+        "errores": prep["errores"],
+        "valido": valido,
+        "factores_seguridad": np.array(lista_fs),
+        "K_factores": np.array(lista_K),
+        "lambda": np.empty((n_K, n)),
+        "total_exceso_kN": np.zeros((n_fs, n_K)),
+        "total_relleno_kN": np.zeros((n_fs, n_K)),
+    }
+    if completo:
+        salida["carga_adm_final_kN"] = np.empty(forma)
+        salida["delta_kN"] = np.empty(forma)
+        salida["control"] = np.empty(forma, dtype=np.int8)
+        salida["veredicto"] = np.empty(forma, dtype=np.int8)
+
+    for j, K in enumerate(lista_K):
+        Le = K * L
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            lam = Le / r
+            esbelta = lam > ESBELTEZ_CRITERIO
+            # Lo que depende sólo de K se calcula una vez por columna de la grilla
+            pcr_N = rigidez / (Le * Le)
+        salida["lambda"][j] = lam
+
+        for i, fs in enumerate(lista_fs):
+            carga_mat = cap_mat / fs
+            euler_adm = (pcr_N / 1000.0) / fs
+            gobierna_euler = esbelta & (euler_adm < carga_mat)
+            carga_final = np.where(gobierna_euler, euler_adm, carga_mat)
+            delta = P - carga_final
+
+            exceso = delta > 0
+            if n:
+                salida["total_exceso_kN"][i, j] = np.cumsum(np.where(exceso, delta, 0.0))[-1]
+                salida["total_relleno_kN"][i, j] = np.cumsum(np.where(exceso, 0.0, np.abs(delta)))[-1]
+
+            if completo:
+                salida["carga_adm_final_kN"][i, j] = carga_final
+                salida["delta_kN"][i, j] = delta
+                salida["control"][i, j] = gobierna_euler
+                salida["veredicto"][i, j] = np.where(
+                    exceso, VEREDICTO_FALLA, np.where(delta < 0, VEREDICTO_MARGEN, VEREDICTO_EQUILIBRIO))
+
+    return salida
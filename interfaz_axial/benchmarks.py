@@ -0,0 +1,203 @@
+# benchmarks.py
+"""
+Mediciones de rendimiento de los núcleos de cálculo y de los caminos por lotes.
+
+    python benchmarks.py --tamanos 1000 10000 100000 --salida bench.json
+
+Las columnas sintéticas son deterministas para una misma semilla, así dos versiones
+del código se comparan sobre exactamente los mismos datos.
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD, ESBELTEZ_CRITERIO
+from calculos import (
+    calcular_carga_material_admisible, calcular_euler_admisible,
+    calcular_carga_admisible, calcular_volumenes_totales,
+)
+from lotes import calcular_volumenes_totales_lote, calcular_lote, matriz_a_arreglos
+from paralelo import calcular_volumenes_totales_paralelo
+from validacion import validar_matriz
+
+K_BENCH = 0.5
+MUESTRAS_MICRO = 20000
+
+
+def generar_columnas(n, semilla=0, frac_invalidas=0.05, frac_esbeltas=0.5, materiales_dic=MATERIALES):
+    """
+    Matriz sintética de n columnas. Mezcla materiales, columnas cortas y esbeltas
+    (lambda repartida a ambos lados de ESBELTEZ_CRITERIO) y filas inválidas.
+    """
+    rnd = random.Random(semilla)
+    claves = list(materiales_dic)
+    matriz = []
+    for i in range(n):
+        id_col = f"B{i}"
+        area = rnd.uniform(0.01, 0.25)
+        r = rnd.uniform(0.2, 0.35) * area ** 0.5
+        if rnd.random() < frac_esbeltas:
+            lam = rnd.uniform(ESBELTEZ_CRITERIO, 6 * ESBELTEZ_CRITERIO)
+        else:
+            lam = rnd.uniform(0.2 * ESBELTEZ_CRITERIO, ESBELTEZ_CRITERIO)
+        altura = lam * r / K_BENCH
+        material = rnd.choice(claves)
+        carga = rnd.uniform(10.0, 5000.0)
+        seccion = [area, r] if rnd.random() < 0.7 else area
+
+        if rnd.random() < frac_invalidas:
+            falla = rnd.randrange(3)
+            if falla == 0:
+                altura = "s/d"
+            elif falla == 1:
+                seccion = -area
+            else:
+                material = "desconocido"
+
+        matriz.append([id_col, altura, seccion, material, carga])
+    return matriz
+
+
+def _percentiles(valores):
+    ordenados = sorted(valores)
+    n = len(ordenados)
+    return ordenados[n // 2], ordenados[min(n - 1, int(n * 0.99))]
+
+
+def medir_llamadas(nombre, funcion, argumentos):
+    """Latencia por llamada de un núcleo escalar, midiendo cada llamada por separado."""
+    tiempos = []
+    reloj = time.perf_counter_ns
+    for args in argumentos:
+        t0 = reloj()
+        try:
+            funcion(*args)
+        except ValueError:
+            pass
+        tiempos.append(reloj() - t0)
+    p50, p99 = _percentiles(tiempos)
+    total_s = sum(tiempos) / 1e9
+    return {
+        "caso": nombre,
+        "llamadas": len(tiempos),
+        "p50_us": p50 / 1000.0,
+        "p99_us": p99 / 1000.0,
+        "llamadas_por_seg": len(tiempos) / total_s if total_s else None,
+    }
+
+
+def medir_lote(nombre, funcion, filas, repeticiones=3, medir_memoria=True):
+    """Tiempo de una pasada completa sobre filas columnas, repetida, y memoria pico aparte."""
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+
+    pico = None
+    if medir_memoria:
+        # pasada separada: tracemalloc distorsiona los tiempos
+        gc.collect()
+        tracemalloc.start()
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    p50, p99 = _percentiles(tiempos)
+    return {
+        "caso": nombre,
+        "filas": filas,
+        "seg_p50": p50,
+        "seg_p99": p99,
+        "filas_por_seg": filas / p50 if p50 else None,
+        "pico_memoria_MB": pico,
+    }
+
+
+def bench_micro(semilla=0, muestras=MUESTRAS_MICRO):
+    matriz = generar_columnas(muestras, semilla, frac_invalidas=0.0)
+    fs = DEFAULT_FACTOR_SEGURIDAD
+    secciones = []
+    for col in matriz:
+        sec = col[2] if isinstance(col[2], list) else [col[2], (col[2] / 12.0) ** 0.5]
+        mat = MATERIALES[col[3]]
+        secciones.append((sec[0], sec[1], col[1], mat["f_c"], mat["E_GPa"]))
+
+    return [
+        medir_llamadas("calcular_carga_material_admisible", calcular_carga_material_admisible,
+                       [(a, f_c, fs) for a, r, L, f_c, E in secciones]),
+        medir_llamadas("calcular_euler_admisible", calcular_euler_admisible,
+                       [(a, r, L, E, K_BENCH, fs) for a, r, L, f_c, E in secciones]),
+        medir_llamadas("calcular_carga_admisible", calcular_carga_admisible,
+                       [(col, MATERIALES, fs, K_BENCH) for col in matriz]),
+    ]
+
+
+def bench_lotes(tamanos, semilla=0, repeticiones=3, paralelo=True, medir_memoria=True):
+    fs = DEFAULT_FACTOR_SEGURIDAD
+    casos = []
+    for n in tamanos:
+        matriz = generar_columnas(n, semilla)
+        casos.append(medir_lote("calcular_volumenes_totales", lambda: calcular_volumenes_totales(
+            matriz, MATERIALES, fs, K_BENCH), n, repeticiones, medir_memoria))
+
+        casos.append(medir_lote("calcular_volumenes_totales_lote", lambda: calcular_volumenes_totales_lote(
+            matriz, MATERIALES, fs, K_BENCH), n, repeticiones, medir_memoria))
+        casos.append(medir_lote("validar_matriz", lambda: validar_matriz(matriz, MATERIALES),
+                                n, repeticiones, medir_memoria))
+        _, arr, _ = matriz_a_arreglos(matriz)
+        casos.append(medir_lote("calcular_lote", lambda: calcular_lote(
+            arr["alturas"], arr["areas"], arr["radios"], arr["materiales_idx"], arr["cargas"],
+            MATERIALES, fs, K_BENCH), n, repeticiones, medir_memoria))
+
+        if paralelo:
+            # la memoria de los procesos hijos no la ve tracemalloc
+            casos.append(medir_lote("calcular_volumenes_totales_paralelo", lambda: calcular_volumenes_totales_paralelo(
+                matriz, MATERIALES, fs, K_BENCH), n, repeticiones, False))
+
+        del matriz
+    return casos
+
+
+def ejecutar_benchmarks(tamanos=(1000, 10000, 100000), semilla=0, repeticiones=3,
+                        paralelo=True, medir_memoria=True):
+    return {
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "semilla": semilla,
+        "micro": bench_micro(semilla),
+        "lotes": bench_lotes(tamanos, semilla, repeticiones, paralelo, medir_memoria),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de los cálculos de carga axial.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="cantidades de filas a medir (p. ej. 1000 ... 10000000)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--sin-paralelo", action="store_true")
+    parser.add_argument("--sin-memoria", action="store_true", help="omite la pasada con tracemalloc")
+    parser.add_argument("--salida", help="archivo JSON de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    informe = ejecutar_benchmarks(args.tamanos, args.semilla, args.repeticiones,
+                                  not args.sin_paralelo, not args.sin_memoria)
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+# binario.py
+"""
+Formato binario columnar para la matriz de columnas y sus resultados.
+
+Un archivo tiene una cabecera JSON y, a continuación, un arreglo contiguo por campo
+(alineado a 64 bytes), de modo que se abre con mmap y cada campo se lee sin copiar:
+
+    b"IAXB" | versión (uint32) | largo de la cabecera (uint64) | cabecera JSON | secciones
+
+Matriz:     alturas, areas, radios, cargas (float64), materiales_idx (int16, -1 = inválida),
+            ids y mensajes de error como tablas de textos (desplazamientos int64 + bytes UTF-8).
+Resultados: los arreglos de calcular_lote, con material/control/veredicto como enteros
+            chicos; las tablas de ids y errores se copian de la matriz.
+
+La cabecera guarda las claves de material (y f_c/E) en el orden de los códigos.
+"""
+import json
+import mmap
+import struct
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+from validacion import validar_matriz
+from lotes import calcular_lote, resumen_lote
+
+MAGIA = b"IAXB"
+VERSION = 1
+ALINEACION = 64
+_PREAMBULO = struct.Struct("<4sIQ")
+
+CAMPOS_MATRIZ = (
+    ("alturas", "<f8"), ("areas", "<f8"), ("radios", "<f8"), ("cargas", "<f8"), ("materiales_idx", "<i2"),
+)
+CAMPOS_RESULTADO = (
+    ("valido", "|b1"), ("altura_m", "<f8"), ("area_m2", "<f8"), ("r_m", "<f8"), ("material_idx", "<i2"),
+    ("carga_aplicada_kN", "<f8"), ("carga_adm_material_kN", "<f8"), ("euler_adm_kN", "<f8"),
+    ("carga_adm_final_kN", "<f8"), ("lambda", "<f8"), ("control", "|i1"), ("delta_kN", "<f8"),
+    ("veredicto", "|i1"),
+)
+MAX_MATERIALES = int(np.iinfo(np.int16).max) + 1  # los códigos de material se guardan como int16
+MIN_FILAS_PARALELO = 2000000  # el cálculo por tramo es tan rápido que antes no compensa
+TAM_BLOQUE = 250000
+
+
+def _alinear(n):
+    return -(-n // ALINEACION) * ALINEACION
+
+
+def _tabla_textos(textos):
+    """(desplazamientos int64 de largo n+1, bytes UTF-8 concatenados)."""
+    codificados = [t.encode("utf-8") for t in textos]
+    desplazamientos = np.zeros(len(codificados) + 1, dtype="<i8")
+    np.cumsum(np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados)),
+              out=desplazamientos[1:])
+    return desplazamientos, np.frombuffer(b"".join(codificados), dtype=np.uint8)
+
+
+class TablaTextos(Sequence):
+    """Textos guardados como desplazamientos + bytes; cada uno se decodifica al pedirlo."""
+
+    def __init__(self, desplazamientos, datos, json_=False):
+        self.desplazamientos = desplazamientos
+        self.datos = datos
+        self.json = json_
+
+    def __len__(self):
+        return len(self.desplazamientos) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        texto = self.datos[int(self.desplazamientos[i]):int(self.desplazamientos[i + 1])].tobytes().decode("utf-8")
+        return json.loads(texto) if self.json else texto
+
+
+class ErroresBinarios(Mapping):
+    """Posición -> mensaje de error, buscando la posición en filas_error (ordenadas)."""
+
+    def __init__(self, filas, mensajes):
+        self.filas = filas
+        self.mensajes = mensajes
+
+    def _posicion(self, i):
+        if not isinstance(i, (int, np.integer)):
+            return -1
+        k = int(np.searchsorted(self.filas, i))
+        return k if k < len(self.filas) and self.filas[k] == i else -1
+
+    def __contains__(self, i):
+        return self._posicion(i) >= 0
+
+    def __getitem__(self, i):
+        k = self._posicion(i)
+        if k < 0:
+            raise KeyError(i)
+        return self.mensajes[k]
+
+    def __iter__(self):
+        return iter(self.filas.tolist())
+
+    def __len__(self):
+        return len(self.filas)
+
+
+def _escribir(ruta, cabecera, secciones, reservados=None):
+    """
+    Escribe la cabecera y las secciones {nombre: arreglo}. reservados ({nombre: (dtype, largo)})
+    ocupa su lugar en el archivo, en cero, sin pasar por memoria. Devuelve la cabecera completa.
+    """
+    cabecera = dict(cabecera, version=VERSION, secciones={})
+    tamanos = [(nombre, arr.dtype, arr.size) for nombre, arr in secciones.items()]
+    tamanos += [(nombre, np.dtype(dtype), largo) for nombre, (dtype, largo) in (reservados or {}).items()]
+    # los desplazamientos dependen del largo de la cabecera, que a su vez los contiene:
+    # se reserva espacio de sobra y se completa con espacios
+    reserva = _alinear(len(json.dumps(cabecera)) + 160 * len(tamanos) + ALINEACION)
+    posicion = _PREAMBULO.size + reserva
+    for nombre, dtype, largo in tamanos:
+        posicion = _alinear(posicion)
+        cabecera["secciones"][nombre] = {"dtype": dtype.str, "largo": int(largo), "desplazamiento": posicion}
+        posicion += int(largo) * dtype.itemsize
+
+    texto = json.dumps(cabecera).encode("utf-8")
+    with open(ruta, "wb") as f:
+        f.write(_PREAMBULO.pack(MAGIA, VERSION, reserva))
+        f.write(texto.ljust(reserva, b" "))
+        for nombre, arr in secciones.items():
+            f.seek(cabecera["secciones"][nombre]["desplazamiento"])
+            f.write(np.ascontiguousarray(arr).data)
+        f.truncate(posicion)
+    return cabecera
+
+
+def _leer_cabecera(f, ruta):
+    magia, version, largo = _PREAMBULO.unpack(f.read(_PREAMBULO.size))
+    if magia != MAGIA:
+        raise ValueError(f"'{ruta}' no es un archivo binario de columnas")
+    if version != VERSION:
+        raise ValueError(f"Versión de formato no soportada en '{ruta}': {version}")
+    return json.loads(f.read(largo))
+
+
+class ArchivoBinario:
+    """
+    Archivo abierto con mmap de sólo lectura. Cada sección es un arreglo de NumPy
+    que apunta directamente a las páginas del archivo (sin copia).
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            self.cabecera = _leer_cabecera(f, ruta)
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.tipo = self.cabecera["tipo"]
+        self.n = self.cabecera["n"]
+        self.claves_materiales = [m[0] for m in self.cabecera["materiales"]]
+        self.ids = TablaTextos(self.seccion("ids_desplazamientos"), self.seccion("ids_datos"),
+                               self.cabecera["ids_json"])
+        self.errores = ErroresBinarios(self.seccion("filas_error"),
+                                       TablaTextos(self.seccion("errores_desplazamientos"),
+                                                   self.seccion("errores_datos")))
+
+    def seccion(self, nombre):
+        s = self.cabecera["secciones"][nombre]
+        return np.frombuffer(self._mm, dtype=np.dtype(s["dtype"]), count=s["largo"], offset=s["desplazamiento"])
+
+    def materiales(self):
+        """Diccionario mínimo {clave: {'f_c', 'E_GPa'}} con el que se calculó/validó el archivo."""
+        return {clave: {"nombre": clave, "f_c": f_c, "E_GPa": E} for clave, f_c, E in self.cabecera["materiales"]}
+
+    def arreglos(self):
+        campos = CAMPOS_MATRIZ if self.tipo == "matriz" else CAMPOS_RESULTADO
+        return {nombre: self.seccion(nombre) for nombre, _ in campos}
+
+    def cerrar(self):
+        # los arreglos devueltos siguen siendo válidos mientras existan referencias
+        self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __len__(self):
+        return self.n
+
+
+def _cabecera_materiales(materiales_dic):
+    return [[clave, float(m["f_c"]), float(m["E_GPa"])] for clave, m in materiales_dic.items()]
+
+
+SECCIONES_TEXTO = ("ids_desplazamientos", "ids_datos", "filas_error", "errores_desplazamientos", "errores_datos")
+
+
+def _secciones_textos(ids, filas_error, mensajes):
+    ids_json = not all(isinstance(i, str) for i in ids)
+    textos = [json.dumps(i) for i in ids] if ids_json else ids
+    ids_desp, ids_datos = _tabla_textos(textos)
+    err_desp, err_datos = _tabla_textos(mensajes)
+    return ids_json, {
+        "ids_desplazamientos": ids_desp, "ids_datos": ids_datos,
+        "filas_error": np.asarray(filas_error, dtype="<i8"),
+        "errores_desplazamientos": err_desp, "errores_datos": err_datos,
+    }
+
+
+def _verificar_materiales(materiales_dic):
+    # astype/asignar a int16 no avisa: un código mayor se guardaría como otro material
+    if len(materiales_dic) > MAX_MATERIALES:
+        raise ValueError(f"El formato binario admite hasta {MAX_MATERIALES} materiales "
+                         f"(el catálogo tiene {len(materiales_dic)})")
+
+
+def escribir_matriz(ruta, matriz_columnas, materiales_dic=MATERIALES):
+    """
+    Valida la matriz (validacion.validar_matriz) y la guarda en formato binario.
+    Devuelve el número de filas con error.
+    """
+    _verificar_materiales(materiales_dic)
+    val = validar_matriz(matriz_columnas, materiales_dic)
+    filas_error = sorted(val.errores)
+    ids_json, secciones = _secciones_textos(val.ids, filas_error, [val.errores[i] for i in filas_error])
+    arr = val.arreglos
+    for nombre, dtype in CAMPOS_MATRIZ:
+        secciones[nombre] = arr[nombre].astype(dtype)
+    _escribir(ruta, {"tipo": "matriz", "n": len(val.ids), "ids_json": ids_json,
+                     "materiales": _cabecera_materiales(materiales_dic)}, secciones)
+    return len(filas_error)
+
+
+def abrir_matriz(ruta):
+    archivo = ArchivoBinario(ruta)
+    if archivo.tipo != "matriz":
+        raise ValueError(f"'{ruta}' no contiene una matriz de columnas")
+    return archivo
+
+
+def _mapa_materiales(claves_archivo, materiales_dic):
+    """Código guardado -> índice en materiales_dic (los dos órdenes pueden diferir)."""
+    indices = {k: i for i, k in enumerate(materiales_dic)}
+    faltantes = [k for k in claves_archivo if k not in indices]
+    if faltantes:
+        raise ValueError(f"Materiales del archivo no registrados: {', '.join(faltantes)}")
+    return np.array([indices[k] for k in claves_archivo], dtype=np.int64)
+
+
+def abrir_resultados(ruta):
+    archivo = ArchivoBinario(ruta)
+    if archivo.tipo != "resultados":
+        raise ValueError(f"'{ruta}' no contiene resultados")
+    return archivo
+
+
+def lote_resultados(ruta):
+    """LoteResultados cuyos arreglos son vistas del archivo de resultados (sin copia)."""
+    from registros import LoteResultados
+
+    archivo = abrir_resultados(ruta)
+    return LoteResultados(archivo.ids, archivo.arreglos(), archivo.errores, archivo.materiales())
+
+
+# Configuración de cada proceso trabajador (se envía una sola vez; los datos se leen del archivo)
+_config = {}
+
+
+def _iniciar_trabajador(ruta_matriz, ruta_resultados, cabecera_resultados, materiales_dic,
+                        factor_seguridad, K_factor):
+    matriz = abrir_matriz(ruta_matriz)
+    _config.update(matriz=matriz, ruta_resultados=ruta_resultados, cabecera=cabecera_resultados,
+                   mapa=_mapa_materiales(matriz.claves_materiales, materiales_dic),
+                   materiales=materiales_dic, fs=factor_seguridad, K=K_factor)
+
+
+def _evaluar_tramo(tramo):
+    """Calcula las filas [inicio, fin) y las escribe en su lugar del archivo de resultados."""
+    inicio, fin = tramo
+    arr = _config["matriz"].arreglos()
+    idx = arr["materiales_idx"][inicio:fin].astype(np.int64)
+    idx = np.where(idx >= 0, _config["mapa"][np.maximum(idx, 0)], -1)
+    lote = calcular_lote(arr["alturas"][inicio:fin], arr["areas"][inicio:fin], arr["radios"][inicio:fin], idx,
+                         arr["cargas"][inicio:fin], _config["materiales"], _config["fs"], _config["K"])
+    secciones = _config["cabecera"]["secciones"]
+    for nombre, dtype in CAMPOS_RESULTADO:
+        s = secciones[nombre]
+        destino = np.memmap(_config["ruta_resultados"], dtype=np.dtype(dtype), mode="r+",
+                            offset=s["desplazamiento"] + inicio * np.dtype(dtype).itemsize, shape=(fin - inicio,))
+        destino[:] = lote[nombre]
+        destino.flush()
+        del destino
+    return fin - inicio
+
+
+def evaluar_binario(ruta_matriz, ruta_resultados, materiales_dic=MATERIALES,
+                    factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5, num_procesos=1, tam_bloque=TAM_BLOQUE):
+    """
+    Evalúa una matriz binaria y escribe los resultados en formato binario.
+    El archivo de resultados se reserva completo y cada tramo de filas se escribe en
+    su lugar; con num_procesos > 1 los trabajadores abren ambos archivos por su cuenta
+    y sólo reciben (inicio, fin), así que los datos no se serializan.
+    Devuelve el resumen de totales (el mismo de calcular_volumenes_totales).
+    """
+    with abrir_matriz(ruta_matriz) as matriz:
+        n = matriz.n
+        _verificar_materiales(materiales_dic)  # fallan antes de crear nada
+        _mapa_materiales(matriz.claves_materiales, materiales_dic)
+        textos = {nombre: matriz.seccion(nombre) for nombre in SECCIONES_TEXTO}
+        cabecera = _escribir(ruta_resultados, {
+            "tipo": "resultados", "n": n, "ids_json": matriz.cabecera["ids_json"],
+            "materiales": _cabecera_materiales(materiales_dic),
+            "factor_seguridad": float(factor_seguridad), "K_factor": float(K_factor),
+        }, textos, {nombre: (dtype, n) for nombre, dtype in CAMPOS_RESULTADO})
+
+    tramos = [(i, min(i + tam_bloque, n)) for i in range(0, n, tam_bloque)]
+    args = (ruta_matriz, ruta_resultados, cabecera, materiales_dic, factor_seguridad, K_factor)
+    if num_procesos <= 1 or n < MIN_FILAS_PARALELO:
+        _iniciar_trabajador(*args)
+        try:
+            for tramo in tramos:
+                _evaluar_tramo(tramo)
+        finally:
+            _config.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=num_procesos, initializer=_iniciar_trabajador, initargs=args) as ex:
+            list(ex.map(_evaluar_tramo, tramos))
+
+    with abrir_resultados(ruta_resultados) as res:
+        return resumen_lote(res.arreglos())
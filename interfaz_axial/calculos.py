@@ -2,6 +2,7 @@
 import math
 from utils import validar_numero, parsear_seccion_raw
 from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD, ESBELTEZ_CRITERIO
+from instrumentacion import INSTRUMENTACION as _instr, reloj as _reloj
 
 
 def calcular_carga_material_admisible(area_m2, f_c_MPa, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD):
@@ -22,11 +23,12 @@ def calcular_euler_admisible(area_m2, r_m, altura_m, E_GPa, K_factor=0.5, factor
     K = validar_numero(K_factor, "K_factor")
     fs = validar_numero(factor_seguridad, "factor_seguridad")
 
-    I = A * (r ** 2)
+    # Productos explícitos: pow() de libm no siempre redondea igual que x*x
+    I = A * (r * r)
     Le = K * L
     E_Pa = E_GPa * 1e9
 
-    Pcr_N = (math.pi ** 2) * E_Pa * I / (Le ** 2)
+    Pcr_N = (math.pi ** 2) * E_Pa * I / (Le * Le)
     return (Pcr_N / 1000.0) / fs  # kN
 
 
@@ -34,62 +36,112 @@ def calcular_carga_admisible(columna, materiales_dic=MATERIALES, factor_segurida
     """
     columna = [id, altura_m, seccion(area o [area,r]), material_key, carga_aplicada_kN]
     Devuelve un diccionario con resultados completos.
+    Con la instrumentación activa además mide cada etapa y cuenta filas, ramas y fallas.
     """
-    id_col = columna[0]
-    altura_m = validar_numero(columna[1], f"altura {id_col}")
-    area_m2, r_m = parsear_seccion_raw(columna[2])
-    material_key = columna[3]
-    carga_aplicada_kN = validar_numero(columna[4], f"carga_aplicada {id_col}")
-
-    if material_key not in materiales_dic:
-        raise ValueError(f"Material '{material_key}' no registrado.")
-
-    mat = materiales_dic[material_key]
-    f_c_MPa = mat["f_c"]
-    E_GPa = mat["E_GPa"]
-
-    carga_mat = calcular_carga_material_admisible(area_m2, f_c_MPa, factor_seguridad)
-
-    Le = K_factor * altura_m
-    lambda_rel = Le / r_m
-
-    euler_adm = None
-    carga_final = carga_mat
-    control = "material"
-
-    if lambda_rel > ESBELTEZ_CRITERIO:
-        euler_adm = calcular_euler_admisible(area_m2, r_m, altura_m, E_GPa, K_factor, factor_seguridad)
-        carga_final = min(carga_mat, euler_adm)
-        control = "Euler" if euler_adm < carga_mat else "material"
-
-    delta = carga_aplicada_kN - carga_final
-
-    veredicto = (
-        "falla por sobrecarga" if delta > 0
-        else "margen disponible" if delta < 0
-        else "equilibrio"
-    )
-
-    return {
-        "id": id_col,
-        "altura_m": altura_m,
-        "area_m2": area_m2,
-        "r_m": r_m,
-        "material": material_key,
-        "f_c_MPa": f_c_MPa,
-        "E_GPa": E_GPa,
-        "carga_aplicada_kN": carga_aplicada_kN,
-        "carga_adm_material_kN": carga_mat,
-        "euler_adm_kN": euler_adm,
-        "carga_adm_final_kN": carga_final,
-        "lambda": lambda_rel,
-        "control": control,
-        "delta_kN": delta,
-        "veredicto": veredicto,
-    }
-
-
-def calcular_volumenes_totales(matriz_columnas, materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+    medir = _instr.activa
+    if medir:
+        _instr.contadores["filas"] += 1
+        t0 = _reloj()
+    campo = None  # dato en validación, para contar la falla con la instrumentación activa
+    try:
+        id_col = columna[0]
+        campo = "altura"
+        altura_m = validar_numero(columna[1], f"altura {id_col}")
+        campo = "seccion"
+        area_m2, r_m = parsear_seccion_raw(columna[2])
+        material_key = columna[3]
+        campo = "carga_aplicada"
+        carga_aplicada_kN = validar_numero(columna[4], f"carga_aplicada {id_col}")
+
+        if material_key not in materiales_dic:
+            campo = "material"
+            raise ValueError(f"Material '{material_key}' no registrado.")
+        campo = None
+
+        mat = materiales_dic[material_key]
+        f_c_MPa = mat["f_c"]
+        E_GPa = mat["E_GPa"]
+        if medir:
+            t1 = _reloj()
+            _instr.sumar_tiempo("validacion", t1 - t0)
+
+        carga_mat = calcular_carga_material_admisible(area_m2, f_c_MPa, factor_seguridad)
+
+        Le = K_factor * altura_m
+        lambda_rel = Le / r_m
+
+        euler_adm = None
+        carga_final = carga_mat
+        control = "material"
+        if medir:
+            t2 = _reloj()
+            _instr.sumar_tiempo("material", t2 - t1)
+
+        if lambda_rel > ESBELTEZ_CRITERIO:
+            euler_adm = calcular_euler_admisible(area_m2, r_m, altura_m, E_GPa, K_factor, factor_seguridad)
+            carga_final = min(carga_mat, euler_adm)
+            control = "Euler" if euler_adm < carga_mat else "material"
+            if medir:
+                _instr.contadores["rama_euler"] += 1
+                if control == "Euler":
+                    _instr.contadores["gobierna_euler"] += 1
+        if medir:
+            t3 = _reloj()
+            _instr.sumar_tiempo("euler", t3 - t2)
+
+        delta = carga_aplicada_kN - carga_final
+
+        veredicto = (
+            "falla por sobrecarga" if delta > 0
+            else "margen disponible" if delta < 0
+            else "equilibrio"
+        )
+
+        res = {
+            "id": id_col,
+            "altura_m": altura_m,
+            "area_m2": area_m2,
+            "r_m": r_m,
+            "material": material_key,
+            "f_c_MPa": f_c_MPa,
+            "E_GPa": E_GPa,
+            "carga_aplicada_kN": carga_aplicada_kN,
+            "carga_adm_material_kN": carga_mat,
+            "euler_adm_kN": euler_adm,
+            "carga_adm_final_kN": carga_final,
+            "lambda": lambda_rel,
+            "control": control,
+            "delta_kN": delta,
+            "veredicto": veredicto,
+        }
+    except Exception as e:
+        if medir:
+            if campo is not None and isinstance(e, ValueError):
+                _instr.fallas_validacion[campo] += 1
+            _instr.excepciones[type(e).__name__] += 1
+            _instr.contadores["filas_error"] += 1
+        raise
+
+    if medir:
+        _instr.sumar_tiempo("resultado", _reloj() - t3)
+        _instr.contadores["filas_ok"] += 1
+    return res
+
+
+def calcular_volumenes_totales(matriz_columnas, materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5,
+                               cargas=None, nombres_combinaciones=None):
+    """
+    Evalúa todas las columnas y acumula los totales de exceso y relleno.
+    Con cargas (columnas × combinaciones) se delega en combinaciones.py: cada resultado
+    es el de la combinación gobernante y el resumen trae los totales por combinación.
+    """
+    if cargas is not None:
+        from combinaciones import volumenes_totales_combinaciones
+        return volumenes_totales_combinaciones(matriz_columnas, cargas, materiales_dic, factor_seguridad, K_factor,
+                                               nombres_combinaciones)
+
+    # con la instrumentación activa la corrida se cuenta, se mide y avisa a los ganchos
+    t_inicio = _reloj() if _instr.activa else None
     resultados = []
     total_exceso = 0.0
     total_relleno = 0.0
@@ -107,4 +159,6 @@ def calcular_volumenes_totales(matriz_columnas, materiales_dic=MATERIALES, facto
         except Exception as e:
             resultados.append({"id": col[0], "error": str(e)})
 
+    if t_inicio is not None:
+        _instr.terminar_corrida(t_inicio)
     return resultados, {"total_exceso_kN": total_exceso, "total_relleno_kN": total_relleno}
@@ -0,0 +1,174 @@
+# catalogo.py
+"""
+Catálogo de materiales cargado desde JSON o CSV, con recarga en caliente.
+
+Se usa en lugar del diccionario MATERIALES (es un Mapping con las mismas claves y
+valores), pero además cada clave tiene un id entero estable y las constantes que
+usan los núcleos por lotes ya están calculadas en arreglos contiguos:
+
+    f_c, E_GPa, f_c_1000 = f_c·1000, pi2_E_Pa = π²·E·1e9
+
+Formatos aceptados:
+    JSON  {"clave": {"nombre": ..., "f_c": ..., "E_GPa": ..., "costo_m3": ...}, ...}
+          o una lista de objetos con "clave"
+    CSV   encabezado clave,nombre,f_c,E_GPa[,costo_m3]
+"""
+import csv
+import json
+import math
+import os
+import sys
+from collections.abc import Mapping
+import numpy as np
+from utils import validar_numero
+
+def _normalizar_material(clave, datos):
+    mat = dict(datos)
+    mat.pop("clave", None)
+    mat["nombre"] = str(mat.get("nombre") or clave)
+    mat["f_c"] = validar_numero(mat.get("f_c"), f"{clave}.f_c")
+    mat["E_GPa"] = validar_numero(mat.get("E_GPa"), f"{clave}.E_GPa")
+    if mat.get("costo_m3") in (None, ""):
+        mat.pop("costo_m3", None)
+    else:
+        mat["costo_m3"] = validar_numero(mat["costo_m3"], f"{clave}.costo_m3")
+    return mat
+
+
+def _por_clave(ruta, entradas):
+    """{clave: entrada} de una lista de entradas con "clave"; ValueError si alguna no la tiene."""
+    datos = {}
+    for i, d in enumerate(entradas):
+        clave = d.get("clave") if isinstance(d, dict) else None
+        if isinstance(clave, str):
+            clave = clave.strip()
+        if clave in (None, ""):
+            raise ValueError(f"Catálogo '{ruta}': la entrada {i} no tiene \"clave\"")
+        datos[clave] = d
+    return datos
+
+
+def leer_catalogo(ruta):
+    """Lee un archivo de catálogo y devuelve {clave: material} en el orden del archivo."""
+    ext = os.path.splitext(ruta)[1].lower()
+    with open(ruta, newline="", encoding="utf-8") as f:
+        if ext == ".json":
+            datos = json.load(f)
+            if isinstance(datos, list):
+                datos = _por_clave(ruta, datos)
+        elif ext in (".csv", ".txt"):
+            datos = _por_clave(ruta, csv.DictReader(f))
+        else:
+            raise ValueError(f"Formato de catálogo no reconocido: '{ruta}'")
+    if not isinstance(datos, dict) or not all(isinstance(mat, dict) for mat in datos.values()):
+        raise ValueError(f"Catálogo inválido: '{ruta}'")
+    return {str(clave): _normalizar_material(clave, mat) for clave, mat in datos.items()}
+
+
+class CatalogoMateriales(Mapping):
+    """
+    Materiales con ids enteros (posición en el orden de iteración) y tablas precalculadas.
+    Los ids se conservan al modificar o agregar materiales; sólo si se quita alguno
+    se renumeran los siguientes.
+    """
+
+    def __init__(self, materiales_dic=None, ruta=None):
+        self._datos = {}
+        self.ids = {}       # clave -> id
+        self.claves = []    # id -> clave
+        self.version = 0
+        self.ruta = None
+        self._firma = None
+        self.oyentes = []   # funcion(claves_cambiadas) tras cada cambio
+        self._armar_tablas()
+        if materiales_dic is not None:
+            self.actualizar(materiales_dic)
+        if ruta is not None:
+            self.cargar(ruta)
+
+    # --- Mapping ---
+    def __getitem__(self, clave):
+        return self._datos[clave]
+
+    def __contains__(self, clave):
+        try:
+            return clave in self._datos
+        except TypeError:
+            return False
+
+    def __iter__(self):
+        return iter(self.claves)
+
+    def __len__(self):
+        return len(self.claves)
+
+    # --- ids y tablas ---
+    def id_de(self, clave):
+        """Id entero de la clave, o -1 si no está registrada."""
+        return self.ids.get(clave, -1)
+
+    def _armar_tablas(self):
+        mats = [self._datos[k] for k in self.claves]
+        self.f_c = np.array([m["f_c"] for m in mats], dtype=np.float64)
+        self.E_GPa = np.array([m["E_GPa"] for m in mats], dtype=np.float64)
+        self.f_c_1000 = self.f_c * 1000.0
+        # mismo orden de operaciones que calcular_euler_admisible: (π²·E_Pa)·I
+        self.pi2_E_Pa = (math.pi ** 2) * (self.E_GPa * 1e9)
+
+    def tablas(self):
+        """(claves, f_c, E_GPa) alineados por id, como lotes.tablas_materiales."""
+        return self.claves, self.f_c, self.E_GPa
+
+    # --- cambios ---
+    def actualizar(self, materiales_dic):
+        """
+        Reemplaza el contenido por materiales_dic. Devuelve el conjunto de claves
+        agregadas, quitadas o con datos distintos, y avisa a los oyentes si no es vacío.
+        """
+        nuevos = {sys.intern(str(k)): _normalizar_material(k, v) for k, v in materiales_dic.items()}
+        cambiadas = {k for k in self._datos if k not in nuevos}
+        cambiadas |= {k for k, v in nuevos.items() if self._datos.get(k) != v}
+        if not cambiadas:
+            return cambiadas
+
+        quitadas = [k for k in self.claves if k not in nuevos]
+        claves = [k for k in self.claves if k in nuevos] if quitadas else list(self.claves)
+        claves += [k for k in nuevos if k not in self.ids]
+
+        self._datos = nuevos
+        self.claves = claves
+        self.ids = {k: i for i, k in enumerate(claves)}
+        self._armar_tablas()
+        self.version += 1
+        for oyente in list(self.oyentes):
+            oyente(cambiadas)
+        return cambiadas
+
+    def _firma_archivo(self):
+        st = os.stat(self.ruta)
+        return st.st_mtime_ns, st.st_size
+
+    def cargar(self, ruta):
+        """Carga el catálogo del archivo y lo deja vigilado por recargar_si_cambio."""
+        datos = leer_catalogo(ruta)
+        self.ruta = ruta
+        self._firma = self._firma_archivo()
+        return self.actualizar(datos)
+
+    def recargar_si_cambio(self):
+        """
+        Vuelve a leer el archivo si cambió desde la última carga. Devuelve las claves
+        cambiadas (vacío si no hubo cambios). Si el archivo quedó a medio escribir o
+        inválido se conserva el catálogo anterior y se propaga el error.
+        """
+        if self.ruta is None:
+            return set()
+        try:
+            firma = self._firma_archivo()
+        except OSError:
+            return set()  # el editor puede estar reemplazando el archivo
+        if firma == self._firma:
+            return set()
+        # la firma se toma antes de leer: un archivo inválido no se reintenta hasta que vuelva a cambiar
+        self._firma = firma
+        return self.actualizar(leer_catalogo(self.ruta))
@@ -0,0 +1,486 @@
+# cli.py
+"""
+Punto de entrada por línea de comandos, sin interfaz gráfica.
+
+    python cli.py evaluar columnas.csv resultados.jsonl --fs 3 --K 0.5
+    python cli.py evaluar columnas.csv resultados.jsonl --memo 100000
+    python cli.py evaluar columnas.csv resultados.csv --punto-control corrida.json
+    python cli.py barrido columnas.csv --fs 2 2.5 3 --K 0.5 0.7 1.0
+    python cli.py dimensionar columnas.csv --forma cuadrada --materiales concreto_25 acero_250
+    python cli.py confiabilidad columnas.csv --muestras 1000000 --dist carga=gumbel:0.25 f_c=lognormal:0.15
+    python cli.py guardar columnas.csv resultados.db --fs 3 --K 0.5
+    python cli.py consultar resultados.db --material concreto_20 --control Euler --delta-min 0
+    python cli.py convertir columnas.csv columnas.iax
+    python cli.py evaluar-binario columnas.iax resultados.iax --procesos 4
+    python cli.py combinaciones columnas.csv cargas.csv --salida gobernantes.jsonl
+    python cli.py servir --puerto 8765 --procesos 4 --max-solicitudes 64
+    python cli.py sensibilidad columnas.csv --salida sensibilidad.jsonl
+    python cli.py agrupar columnas.csv --por material control piso --etiquetas piso
+    python cli.py criticos columnas.csv --k 100 --criterio utilizacion --umbral 1.0
+    python cli.py edificio columnas.csv --pila eje --nivel piso --salida bajada.jsonl
+    python cli.py pruebas
+    python cli.py bench --tamanos 1000 100000 --salida bench.json
+    python cli.py gui
+    python cli.py --estadisticas --perfil corrida.prof evaluar columnas.csv resultados.csv
+    python cli.py --catalogo materiales.json evaluar columnas.csv resultados.csv
+
+Los módulos pesados (NumPy, Tkinter) se importan sólo en el subcomando que los usa.
+"""
+import argparse
+import json
+import sys
+
+from materiales import DEFAULT_FACTOR_SEGURIDAD
+from flujo import TAM_BLOQUE
+
+
+def cmd_evaluar(args):
+    from flujo import evaluar_flujo
+
+    cache = None
+    if args.memo:
+        from memo import CacheLRU
+        cache = CacheLRU(args.memo)
+    resumen, filas = evaluar_flujo(args.entrada, args.salida, args.materiales_dic, factor_seguridad=args.fs,
+                                   K_factor=args.K, tam_bloque=args.tam_bloque, cache=cache,
+                                   punto_control=args.punto_control, intervalo_control_s=args.intervalo_control)
+    salida = {"filas": filas, "resumen": resumen}
+    if cache is not None:
+        salida["memo"] = cache.estadisticas()
+    print(json.dumps(salida, ensure_ascii=False))
+    return 0
+
+
+def cmd_barrido(args):
+    from flujo import leer_columnas
+    from barrido import barrido_parametros
+
+    matriz = [col for bloque in leer_columnas(args.entrada) for col in bloque]
+    res = barrido_parametros(matriz, args.fs, args.K, args.materiales_dic, completo=False)
+
+    tabla = []
+    for i, fs in enumerate(res["factores_seguridad"].tolist()):
+        for j, K in enumerate(res["K_factores"].tolist()):
+            tabla.append({
+                "factor_seguridad": fs,
+                "K_factor": K,
+                "total_exceso_kN": float(res["total_exceso_kN"][i, j]),
+                "total_relleno_kN": float(res["total_relleno_kN"][i, j]),
+            })
+    print(json.dumps({"filas": len(matriz), "errores": len(res["errores"]), "barrido": tabla},
+                     ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_dimensionar(args):
+    from flujo import leer_columnas
+    from diseno import dimensionar_columnas
+
+    matriz = [col for bloque in leer_columnas(args.entrada) for col in bloque]
+    propuestas = dimensionar_columnas(matriz, args.materiales_dic, args.fs, args.K, forma=args.forma,
+                                      materiales=args.materiales, paso_m2=args.paso)
+    texto = json.dumps(propuestas, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+    return 0
+
+
+def _leer_distribucion(texto):
+    """'variable=tipo:parametro' -> (variable, (tipo, parametro))."""
+    try:
+        var, espec = texto.split("=", 1)
+        tipo, _, param = espec.partition(":")
+        return var, (tipo, float(param or 0.0))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"se esperaba variable=tipo:parametro (entrada: {texto})")
+
+
+def cmd_confiabilidad(args):
+    from flujo import leer_columnas
+    from confiabilidad import analizar_confiabilidad
+
+    matriz = [col for bloque in leer_columnas(args.entrada) for col in bloque]
+    res = analizar_confiabilidad(matriz, dict(args.dist or []), args.muestras, args.semilla,
+                                 args.materiales_dic, args.fs, args.K)
+    print(json.dumps(res, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_guardar(args):
+    from flujo import leer_columnas
+    from almacen import AlmacenResultados
+
+    total = {"filas": 0, "calculadas": 0, "omitidas": 0, "repetidas": 0}
+    with AlmacenResultados(args.base) as almacen:
+        for bloque in leer_columnas(args.entrada, args.tam_bloque):
+            res = almacen.evaluar(bloque, args.materiales_dic, args.fs, args.K)
+            for clave in total:
+                total[clave] += res[clave]
+    print(json.dumps(total, ensure_ascii=False))
+    return 0
+
+
+def cmd_consultar(args):
+    from almacen import AlmacenResultados, VIGENTE
+
+    # sin --fs/--K, la corrida vigente; con --todas, cualquier FS y K guardado
+    fs = None if args.todas else (VIGENTE if args.fs is None else args.fs)
+    K = None if args.todas else (VIGENTE if args.K is None else args.K)
+    with AlmacenResultados(args.base) as almacen:
+        filas = almacen.consultar(id=args.id, material=args.material, control=args.control,
+                                  veredicto=args.veredicto, delta_min=args.delta_min, delta_max=args.delta_max,
+                                  lambda_min=args.lambda_min, lambda_max=args.lambda_max,
+                                  con_error=args.con_error, limite=args.limite, factor_seguridad=fs, K_factor=K)
+    for fila in filas:
+        print(json.dumps(fila, ensure_ascii=False))
+    return 0
+
+
+def cmd_convertir(args):
+    from flujo import leer_columnas
+    from binario import escribir_matriz
+
+    matriz = [col for bloque in leer_columnas(args.entrada) for col in bloque]
+    errores = escribir_matriz(args.salida, matriz, args.materiales_dic)
+    print(json.dumps({"filas": len(matriz), "errores": errores}, ensure_ascii=False))
+    return 0
+
+
+def cmd_evaluar_binario(args):
+    from binario import evaluar_binario
+
+    resumen = evaluar_binario(args.entrada, args.salida, args.materiales_dic, args.fs, args.K,
+                              num_procesos=args.procesos)
+    print(json.dumps({"resumen": resumen}, ensure_ascii=False))
+    return 0
+
+
+def _leer_cargas(ruta, ids):
+    """CSV id,<combinación 1>,<combinación 2>,... con las filas en el orden de las columnas."""
+    import csv
+
+    with open(ruta, newline="", encoding="utf-8") as f:
+        lector = csv.reader(f)
+        nombres = next(lector)[1:]
+        filas = list(lector)
+    if [fila[0] for fila in filas] != [str(i) for i in ids]:
+        raise ValueError(f"Los ids de '{ruta}' no coinciden con los de las columnas (en el mismo orden)")
+    return nombres, [fila[1:] for fila in filas]
+
+
+def cmd_combinaciones(args):
+    from flujo import leer_columnas
+    from combinaciones import volumenes_totales_combinaciones
+
+    matriz = [col for bloque in leer_columnas(args.entrada) for col in bloque]
+    nombres, cargas = _leer_cargas(args.cargas, [col[0] for col in matriz])
+    resultados, resumen = volumenes_totales_combinaciones(matriz, cargas, args.materiales_dic, args.fs, args.K,
+                                                          nombres)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            for res in resultados:
+                f.write(json.dumps(res, ensure_ascii=False) + "\n")
+    print(json.dumps({"filas": len(matriz), "resumen": resumen}, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_servir(args):
+    import asyncio
+    from servicio import ServicioCalculo
+
+    servicio = ServicioCalculo(args.materiales_dic, num_procesos=args.procesos,
+                               max_solicitudes=args.max_solicitudes, max_filas_lote=args.max_filas_lote,
+                               tam_microlote=args.tam_microlote)
+    print(f"Escuchando en http://{args.host}:{args.puerto} (Ctrl+C para terminar)", file=sys.stderr)
+    try:
+        asyncio.run(servicio.servir(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_sensibilidad(args):
+    from flujo import leer_columnas
+    from sensibilidad import informe_sensibilidad
+
+    matriz = [col for bloque in leer_columnas(args.entrada) for col in bloque]
+    filas = informe_sensibilidad(matriz, args.materiales_dic, args.fs, args.K)
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        for fila in filas:
+            salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+    finally:
+        if args.salida:
+            salida.close()
+    return 0
+
+
+def cmd_agrupar(args):
+    from flujo import leer_columnas
+    from lotes import calcular_volumenes_totales_lote
+    from agregados import AgregadorResultados
+
+    etiquetas = args.etiquetas or [c for c in args.por if c not in ("material", "control", "veredicto")]
+    agregador = AgregadorResultados(args.por)
+    for bloque in leer_columnas(args.entrada, args.tam_bloque, etiquetas=etiquetas):
+        resultados, _ = calcular_volumenes_totales_lote(bloque, args.materiales_dic, args.fs, args.K)
+        agregador.agregar(resultados, bloque)
+    print(json.dumps(agregador.resultado(), ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_criticos(args):
+    from criticos import criticos_flujo
+
+    def alerta(res):
+        print(json.dumps({"alerta": res}, ensure_ascii=False), file=sys.stderr, flush=True)
+
+    seleccion = criticos_flujo(args.entrada, args.k, args.criterio, args.umbral, alerta,
+                               args.materiales_dic, args.fs, args.K, args.tam_bloque)
+    for fila in seleccion.resultado():
+        print(json.dumps(fila, ensure_ascii=False))
+    print(json.dumps(seleccion.resumen()), file=sys.stderr)
+    return 0
+
+
+def cmd_edificio(args):
+    from flujo import leer_columnas
+    from edificio import Edificio
+
+    matriz = [col for bloque in leer_columnas(args.entrada, etiquetas=(args.pila, args.nivel)) for col in bloque]
+    edificio = Edificio.desde_columnas(matriz, args.pila, args.nivel, materiales_dic=args.materiales_dic,
+                                       factor_seguridad=args.fs, K_factor=args.K)
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        for nombre, pila in edificio.pilas.items():
+            for res in pila.resultados:
+                fila = {"pila": nombre}
+                fila.update(res)
+                salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+    finally:
+        if args.salida:
+            salida.close()
+    print(json.dumps(edificio.resumen()), file=sys.stderr)
+    return 0
+
+
+def cmd_pruebas(args):
+    from pruebas import pruebas_unitarias
+    from pruebas_regresion import pruebas_regresion
+
+    res = pruebas_unitarias()
+    for id_col, veredicto in res["evaluacion"]:
+        print(f"{id_col}: {veredicto}")
+    print(json.dumps(res["resumen"]))
+
+    # regresión: los caminos alternativos deben coincidir con el cálculo escalar
+    fallas = pruebas_regresion()
+    for nombre, lista in fallas.items():
+        print(f"{nombre}: {'ok' if not lista else f'{len(lista)} fallas'}")
+        for texto in lista:
+            print("    " + texto)
+    return 1 if any(fallas.values()) else 0
+
+
+def cmd_bench(args):
+    from benchmarks import main as main_benchmarks
+
+    return main_benchmarks(args.opciones_bench)
+
+
+def cmd_gui(args):
+    import tkinter as tk
+    from gui import ColumnApp
+
+    root = tk.Tk()
+    ColumnApp(root, args.materiales_dic if args.catalogo else None)
+    root.mainloop()
+    return 0
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Carga axial admisible de columnas (modo sin ventana).")
+    parser.add_argument("--estadisticas", action="store_true",
+                        help="activa la instrumentación y muestra contadores y tiempos al terminar (stderr)")
+    parser.add_argument("--perfil", metavar="RUTA", help="guarda un perfil de cProfile para pstats")
+    parser.add_argument("--catalogo", metavar="RUTA", help="catálogo de materiales JSON/CSV (por defecto, materiales.py)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("evaluar", help="evalúa un CSV/JSONL de columnas y escribe los resultados")
+    p.add_argument("entrada")
+    p.add_argument("salida")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.add_argument("--tam-bloque", type=int, default=TAM_BLOQUE)
+    p.add_argument("--memo", type=int, metavar="N", help="reutiliza columnas repetidas (caché LRU de N entradas)")
+    p.add_argument("--punto-control", metavar="RUTA",
+                   help="guarda el avance en RUTA (JSON) y, si ya existe, reanuda la corrida desde ahí")
+    p.add_argument("--intervalo-control", type=float, metavar="S", help="segundos entre puntos de control (30)")
+    p.set_defaults(funcion=cmd_evaluar)
+
+    p = sub.add_parser("barrido", help="totales para una grilla de factores de seguridad y K")
+    p.add_argument("entrada")
+    p.add_argument("--fs", type=float, nargs="+", default=[DEFAULT_FACTOR_SEGURIDAD])
+    p.add_argument("--K", type=float, nargs="+", default=[0.5])
+    p.set_defaults(funcion=cmd_barrido)
+
+    p = sub.add_parser("dimensionar", help="sección y material más baratos que resisten cada carga")
+    p.add_argument("entrada")
+    p.add_argument("--salida", help="archivo JSON de salida (por defecto, stdout)")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.add_argument("--forma", choices=("cuadrada", "circular", "actual"), default="cuadrada")
+    p.add_argument("--materiales", nargs="+", help="claves candidatas (por defecto, todas)")
+    p.add_argument("--paso", type=float, help="redondea el área hacia arriba a múltiplos de este valor (m²)")
+    p.set_defaults(funcion=cmd_dimensionar)
+
+    p = sub.add_parser("confiabilidad", help="probabilidad de falla por Monte Carlo")
+    p.add_argument("entrada")
+    p.add_argument("--muestras", type=int, default=100000)
+    p.add_argument("--semilla", type=int, default=0)
+    p.add_argument("--dist", type=_leer_distribucion, nargs="+", metavar="VAR=TIPO:PARAM",
+                   help="altura, area, r, f_c, E o carga; tipos fijo, normal, lognormal, uniforme, gumbel")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.set_defaults(funcion=cmd_confiabilidad)
+
+    p = sub.add_parser("guardar", help="evalúa y guarda en una base SQLite sólo las columnas nuevas o cambiadas")
+    p.add_argument("entrada")
+    p.add_argument("base")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.add_argument("--tam-bloque", type=int, default=TAM_BLOQUE)
+    p.set_defaults(funcion=cmd_guardar)
+
+    p = sub.add_parser("consultar", help="filtra los resultados guardados por guardar (JSONL a stdout)")
+    p.add_argument("base")
+    p.add_argument("--id")
+    p.add_argument("--material")
+    p.add_argument("--control", choices=("material", "Euler"))
+    p.add_argument("--veredicto", choices=("falla por sobrecarga", "margen disponible", "equilibrio"))
+    p.add_argument("--delta-min", type=float, help="delta_kN estrictamente mayor")
+    p.add_argument("--delta-max", type=float)
+    p.add_argument("--lambda-min", type=float, help="lambda estrictamente mayor")
+    p.add_argument("--lambda-max", type=float)
+    p.add_argument("--con-error", action="store_true", help="devuelve las filas con error de datos")
+    p.add_argument("--limite", type=int)
+    p.add_argument("--fs", type=float, help="FS de los resultados (por defecto, el de la última evaluación)")
+    p.add_argument("--K", type=float, help="K de los resultados (por defecto, el de la última evaluación)")
+    p.add_argument("--todas", action="store_true", help="resultados de todos los FS y K guardados")
+    p.set_defaults(funcion=cmd_consultar)
+
+    p = sub.add_parser("convertir", help="valida un CSV/JSONL de columnas y lo guarda en formato binario")
+    p.add_argument("entrada")
+    p.add_argument("salida")
+    p.set_defaults(funcion=cmd_convertir)
+
+    p = sub.add_parser("evaluar-binario", help="evalúa una matriz binaria y escribe los resultados en binario")
+    p.add_argument("entrada")
+    p.add_argument("salida")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.add_argument("--procesos", type=int, default=1)
+    p.set_defaults(funcion=cmd_evaluar_binario)
+
+    p = sub.add_parser("combinaciones", help="verifica cada columna contra varias combinaciones de carga")
+    p.add_argument("entrada")
+    p.add_argument("cargas", help="CSV id,<combinación 1>,<combinación 2>,... en el orden de las columnas")
+    p.add_argument("--salida", help="JSONL con el resultado de la combinación gobernante de cada columna")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.set_defaults(funcion=cmd_combinaciones)
+
+    p = sub.add_parser("servir", help="servicio HTTP/JSON local (/columna, /lote, /metricas)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--puerto", type=int, default=8765)
+    p.add_argument("--procesos", type=int, help="procesos de cálculo (por defecto, uno por núcleo)")
+    p.add_argument("--max-solicitudes", type=int, default=64, help="solicitudes atendidas a la vez")
+    p.add_argument("--max-filas-lote", type=int, default=5000000)
+    p.add_argument("--tam-microlote", type=int, default=2000, help="columnas sueltas agrupadas por cálculo")
+    p.set_defaults(funcion=cmd_servir)
+
+    p = sub.add_parser("sensibilidad", help="derivadas de la carga admisible respecto de cada dato (JSONL)")
+    p.add_argument("entrada")
+    p.add_argument("--salida", help="archivo JSONL de salida (por defecto, stdout)")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.set_defaults(funcion=cmd_sensibilidad)
+
+    p = sub.add_parser("agrupar", help="estadísticas de delta, lambda y utilización por grupo")
+    p.add_argument("entrada")
+    p.add_argument("--por", nargs="+", default=["material", "control", "veredicto"],
+                   help="material, control, veredicto y/o nombres de campos del archivo (p. ej. piso)")
+    p.add_argument("--etiquetas", nargs="+", help="campos del archivo a leer (por defecto, los de --por)")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.add_argument("--tam-bloque", type=int, default=TAM_BLOQUE)
+    p.set_defaults(funcion=cmd_agrupar)
+
+    p = sub.add_parser("criticos", help="las k columnas más críticas y alertas por umbral, sin guardar el resto (JSONL)")
+    p.add_argument("entrada")
+    p.add_argument("--k", type=int, default=100)
+    p.add_argument("--criterio", choices=("utilizacion", "delta_kN", "lambda"), default="utilizacion")
+    p.add_argument("--umbral", type=float, help="utilización a partir de la cual se avisa cada columna (stderr)")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.add_argument("--tam-bloque", type=int, default=TAM_BLOQUE)
+    p.set_defaults(funcion=cmd_criticos)
+
+    p = sub.add_parser("edificio", help="bajada de cargas por pilas verticales, verificando cada nivel (JSONL)")
+    p.add_argument("entrada")
+    p.add_argument("--pila", default="pila", help="campo del archivo que identifica la vertical")
+    p.add_argument("--nivel", default="nivel", help="campo numérico del piso (el mayor es el de arriba)")
+    p.add_argument("--salida", help="archivo JSONL de salida (por defecto, stdout)")
+    p.add_argument("--fs", type=float, default=DEFAULT_FACTOR_SEGURIDAD)
+    p.add_argument("--K", type=float, default=0.5)
+    p.set_defaults(funcion=cmd_edificio)
+
+    p = sub.add_parser("pruebas", help="ejecuta los casos de prueba integrados y las pruebas de regresión")
+    p.set_defaults(funcion=cmd_pruebas)
+
+    p = sub.add_parser("bench", help="benchmarks de rendimiento (opciones de benchmarks.py)")
+    p.set_defaults(funcion=cmd_bench)
+
+    p = sub.add_parser("gui", help="abre la interfaz gráfica")
+    p.set_defaults(funcion=cmd_gui)
+
+    return parser
+
+
+def main(argv=None):
+    parser = crear_parser()
+    # las opciones de bench se pasan tal cual a benchmarks.py
+    args, resto = parser.parse_known_args(argv)
+    if args.comando == "bench":
+        args.opciones_bench = resto
+    elif resto:
+        parser.error("argumentos no reconocidos: " + " ".join(resto))
+    if args.estadisticas:
+        import instrumentacion
+        instrumentacion.activar()
+
+    try:
+        if args.catalogo:
+            from catalogo import CatalogoMateriales
+            args.materiales_dic = CatalogoMateriales(ruta=args.catalogo)
+        else:
+            from materiales import MATERIALES
+            args.materiales_dic = MATERIALES
+        if args.perfil:
+            from instrumentacion import perfil
+            with perfil(args.perfil):
+                return args.funcion(args)
+        return args.funcion(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.estadisticas:
+            print(json.dumps(instrumentacion.estadisticas(), indent=2, ensure_ascii=False), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
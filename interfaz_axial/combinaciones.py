@@ -0,0 +1,171 @@
+# combinaciones.py
+"""
+Combinaciones de carga: cada columna se verifica contra una matriz de cargas
+(columnas × combinaciones). La capacidad no depende de la carga, así que se calcula
+una sola vez por columna con calcular_lote y se difunde contra todas las combinaciones.
+
+Las cargas pueden venir en un arreglo aparte o en la propia columna:
+    [id, altura, seccion, material, [carga_1, carga_2, ...]]
+"""
+import numpy as np
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+from validacion import validar_matriz
+from lotes import calcular_lote, fila_a_dict, VEREDICTO_FALLA, VEREDICTO_MARGEN, VEREDICTO_EQUILIBRIO
+
+
+def _matriz_cargas(matriz_columnas, cargas, nombres, ids):
+    """
+    Arreglo float64 (n, m) y {fila: mensaje} para las filas con cargas inválidas.
+    Los mensajes siguen el formato de validar_numero.
+    """
+    filas = cargas if cargas is not None else [col[4] if len(col) > 4 else None for col in matriz_columnas]
+    if len(filas) != len(matriz_columnas):
+        raise ValueError(f"Se esperaban {len(matriz_columnas)} filas de cargas (entrada: {len(filas)})")
+    if nombres is None:
+        primera = next((f for f in filas if isinstance(f, (list, tuple, np.ndarray))), ())
+        nombres = [f"C{j + 1}" for j in range(len(primera))]
+    m = len(nombres)
+    if not m:
+        raise ValueError("No hay combinaciones de carga")
+
+    try:
+        # camino rápido: todo numérico y con la forma esperada
+        P = np.array(filas, dtype=np.float64)
+        if P.shape != (len(filas), m):
+            raise ValueError
+        errores = {}
+        malas = np.flatnonzero(~(P > 0).all(axis=1))
+    except (ValueError, TypeError):
+        P = np.full((len(filas), m), np.nan)
+        errores = {}
+        malas = []
+        for i, fila in enumerate(filas):
+            if not isinstance(fila, (list, tuple, np.ndarray)) or len(fila) != m:
+                errores[i] = f"'carga_aplicada {ids[i]}' debe tener {m} combinaciones (entrada: {fila})"
+                continue
+            try:
+                P[i] = np.array(fila, dtype=np.float64)
+            except (ValueError, TypeError):
+                pass
+            if not (P[i] > 0).all():
+                malas.append(i)
+
+    for i in malas:
+        for j, valor in enumerate(filas[i]):
+            try:
+                ok = float(valor) > 0
+                texto = "mayor que cero"
+            except (ValueError, TypeError):
+                ok = False
+                texto = "un número válido"
+            if not ok:
+                errores[i] = f"'carga_aplicada {ids[i]} [{nombres[j]}]' debe ser {texto} (entrada: {valor})"
+                break
+    return P, errores, list(nombres)
+
+
+def evaluar_combinaciones(matriz_columnas, cargas=None, materiales_dic=MATERIALES,
+                          factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5, nombres=None, completo=True):
+    """
+    Verifica cada columna contra todas las combinaciones de carga en una pasada.
+    cargas es (n, m); si es None se toma la lista de cargas de cada columna (posición 4).
+    Devuelve arreglos por columna (capacidad, lambda, control, combinación gobernante,
+    peor delta y su veredicto), delta_kN (n, m) si completo, y totales por combinación.
+    Las filas con error quedan con valido=False y combinacion_gobernante=-1.
+    """
+    # la carga no entra en la capacidad: se valida aparte y se pasa 1.0 al núcleo
+    sin_carga = [list(col[:4]) + [1.0] if len(col) >= 4 else col for col in matriz_columnas]
+    val = validar_matriz(sin_carga, materiales_dic)
+    P, errores_carga, nombres = _matriz_cargas(matriz_columnas, cargas, nombres, val.ids)
+    errores = {i: val.errores[i] for i in val.errores}
+    for i, mensaje in errores_carga.items():
+        errores.setdefault(i, mensaje)
+
+    arr = val.arreglos
+    lote = calcular_lote(arr["alturas"], arr["areas"], arr["radios"], arr["materiales_idx"], arr["cargas"],
+                         materiales_dic, factor_seguridad, K_factor)
+    valido = lote["valido"].copy()
+    valido[list(errores_carga)] = False
+    capacidad = lote["carga_adm_final_kN"]
+
+    # mismo orden de operaciones que el cálculo escalar: P - carga_final
+    delta = P - capacidad[:, None]
+    delta[~valido] = np.nan
+
+    n = len(val.ids)
+    gobernante = np.full(n, -1, dtype=np.int64)
+    delta_max = np.full(n, np.nan)
+    if valido.any():
+        gobernante[valido] = np.argmax(delta[valido], axis=1)
+        delta_max[valido] = delta[valido, gobernante[valido]]
+    veredicto = np.where(delta_max > 0, VEREDICTO_FALLA,
+                         np.where(delta_max < 0, VEREDICTO_MARGEN, VEREDICTO_EQUILIBRIO)).astype(np.int8)
+
+    # totales por combinación con la suma secuencial de calcular_volumenes_totales
+    dv = delta[valido]
+    exceso = dv > 0
+    total_exceso = np.cumsum(np.where(exceso, dv, 0.0), axis=0)[-1] if len(dv) else np.zeros(len(nombres))
+    total_relleno = np.cumsum(np.where(exceso, 0.0, np.abs(dv)), axis=0)[-1] if len(dv) else np.zeros(len(nombres))
+
+    salida = {
+        "ids": val.ids,
+        "errores": errores,
+        "valido": valido,
+        "nombres": nombres,
+        "cargas_kN": P,
+        "lote": lote,
+        "carga_adm_final_kN": capacidad,
+        "lambda": lote["lambda"],
+        "control": lote["control"],
+        "combinacion_gobernante": gobernante,
+        "delta_max_kN": delta_max,
+        "veredicto": veredicto,
+        "total_exceso_kN": total_exceso,
+        "total_relleno_kN": total_relleno,
+    }
+    if completo:
+        salida["delta_kN"] = delta
+    return salida
+
+
+def volumenes_totales_combinaciones(matriz_columnas, cargas=None, materiales_dic=MATERIALES,
+                                    factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5, nombres=None):
+    """
+    Como calcular_volumenes_totales, pero cada resultado corresponde a la combinación
+    gobernante (carga_aplicada_kN y delta_kN de la peor) y agrega 'combinacion' y
+    'deltas_kN'. El resumen suma los peores deltas e incluye 'por_combinacion'.
+    """
+    res = evaluar_combinaciones(matriz_columnas, cargas, materiales_dic, factor_seguridad, K_factor, nombres)
+    lote, ids, errores, nombres = res["lote"], res["ids"], res["errores"], res["nombres"]
+    claves = list(materiales_dic.keys())
+    gobernante = res["combinacion_gobernante"].tolist()
+    P = res["cargas_kN"]
+    delta = res["delta_kN"]
+
+    resultados = []
+    total_exceso = 0.0
+    total_relleno = 0.0
+    for i, id_col in enumerate(ids):
+        if i in errores:
+            resultados.append({"id": id_col, "error": errores[i]})
+            continue
+        j = gobernante[i]
+        d = fila_a_dict(lote, i, id_col, claves)
+        d["carga_aplicada_kN"] = float(P[i, j])
+        d["delta_kN"] = float(delta[i, j])
+        d["veredicto"] = ("falla por sobrecarga" if d["delta_kN"] > 0
+                          else "margen disponible" if d["delta_kN"] < 0 else "equilibrio")
+        d["combinacion"] = nombres[j]
+        d["deltas_kN"] = delta[i].tolist()
+        resultados.append(d)
+        if d["delta_kN"] > 0:
+            total_exceso += d["delta_kN"]
+        else:
+            total_relleno += abs(d["delta_kN"])
+
+    por_combinacion = [
+        {"combinacion": nombre, "total_exceso_kN": float(e), "total_relleno_kN": float(r)}
+        for nombre, e, r in zip(nombres, res["total_exceso_kN"], res["total_relleno_kN"])
+    ]
+    return resultados, {"total_exceso_kN": total_exceso, "total_relleno_kN": total_relleno,
+                        "por_combinacion": por_combinacion}
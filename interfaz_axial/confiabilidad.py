@@ -0,0 +1,190 @@
+# confiabilidad.py
+"""
+Análisis de confiabilidad por Monte Carlo: probabilidad de falla P(delta > 0) e
+índice de confiabilidad beta = -Phi^-1(Pf) de cada columna.
+
+Cada variable se muestrea como nominal * factor, con el factor tomado de una
+distribución de media 1 (el parámetro es el coeficiente de variación, o el
+semiancho relativo para 'uniforme'). Como los factores son comunes a todas las
+columnas, por muestra basta con tres cocientes:
+
+    s1 = fP / (fA * f_fc)              falla por material si  s1 > carga_mat / P
+    s2 = fP * fL² / (fE * fA * fr²)    falla por Euler si     s2 > euler / P
+    s3 = fL / fr                       esbelta si             s3 > 12 / lambda
+
+Si la sección no da r, el radio se deriva del área (r = sqrt(A/12)) y sigue al área
+muestreada: para esas columnas fr = sqrt(fA) y el factor propio de r no se usa.
+
+y el costo de generar números aleatorios no crece con la cantidad de columnas
+(números aleatorios comunes). Cada variable tiene su propio flujo derivado de la
+semilla, así que el resultado no depende del tamaño de bloque ni de qué otras
+columnas se analicen.
+"""
+import math
+from statistics import NormalDist
+import numpy as np
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD, ESBELTEZ_CRITERIO
+from utils import validar_numero
+from barrido import preparar_barrido
+from validacion import radios_derivados
+
+VARIABLES = ("altura", "area", "r", "f_c", "E", "carga")
+TIPOS = ("fijo", "normal", "lognormal", "uniforme", "gumbel")
+DISTRIBUCIONES_DEFECTO = {
+    "altura": ("normal", 0.01),
+    "area": ("normal", 0.04),
+    "r": ("normal", 0.04),
+    "f_c": ("lognormal", 0.15),
+    "E": ("lognormal", 0.10),
+    "carga": ("gumbel", 0.20),
+}
+TAM_BLOQUE = 1 << 18
+GAMMA_EULER = 0.5772156649015329
+
+
+def normalizar_distribuciones(distribuciones=None):
+    """Completa con DISTRIBUCIONES_DEFECTO y valida tipo y parámetro de cada variable."""
+    dist = dict(DISTRIBUCIONES_DEFECTO)
+    for var, espec in (distribuciones or {}).items():
+        if var not in VARIABLES:
+            raise ValueError(f"Variable '{var}' no reconocida (use {', '.join(VARIABLES)}).")
+        if isinstance(espec, str):
+            espec = (espec, 0.0)
+        tipo, param = espec[0], validar_numero(espec[1] if len(espec) > 1 else 0.0, f"{var}.parametro", False)
+        if tipo not in TIPOS:
+            raise ValueError(f"Distribución '{tipo}' no reconocida (use {', '.join(TIPOS)}).")
+        if param < 0:
+            raise ValueError(f"'{var}.parametro' no puede ser negativo (entrada: {param})")
+        dist[var] = (tipo, param)
+    return dist
+
+
+def muestrear_factor(rng, tipo, param, m):
+    """m factores de media 1 (None si la variable es fija)."""
+    if tipo == "fijo" or param == 0:
+        return None
+    if tipo == "normal":
+        return 1.0 + param * rng.standard_normal(m)
+    if tipo == "lognormal":
+        s2 = math.log1p(param * param)
+        return rng.lognormal(-0.5 * s2, math.sqrt(s2), m)
+    if tipo == "uniforme":
+        return rng.uniform(1.0 - param, 1.0 + param, m)
+    if tipo == "gumbel":
+        escala = param * math.sqrt(6.0) / math.pi
+        return rng.gumbel(1.0 - GAMMA_EULER * escala, escala, m)
+    raise ValueError(f"Distribución '{tipo}' no reconocida.")
+
+
+def _contar_fallas(factores, m, t_mat, t_euler, t_esbelta):
+    """Fallas por columna en un bloque de m muestras y cantidad de muestras válidas (factores > 0)."""
+    uno = np.ones(m)
+    fL, fA, fr, f_fc, fE, fP = (uno if f is None else f for f in factores)
+
+    validas = (fL > 0) & (fA > 0) & (fr > 0) & (f_fc > 0) & (fE > 0) & (fP > 0)
+    if not validas.all():
+        fL, fA, fr, f_fc, fE, fP = (f[validas] for f in (fL, fA, fr, f_fc, fE, fP))
+    m = len(fL)
+
+    s1 = fP / (fA * f_fc)
+    s2 = fP * (fL * fL) / (fE * fA * (fr * fr))
+    s3 = fL / fr
+
+    # falla por material: conteo directo sobre s1 ordenado
+    fallas = m - np.searchsorted(np.sort(s1), t_mat, side="right")
+
+    # falla sólo por Euler: muestras esbeltas (sufijo de s3 ordenado) con s1 <= t_mat y s2 > t_euler
+    orden = np.argsort(s3, kind="stable")
+    s3, s1, s2 = s3[orden], s1[orden], s2[orden]
+    n_esbeltas = m - np.searchsorted(s3, t_esbelta, side="right")
+    for j in np.flatnonzero(n_esbeltas):
+        k = n_esbeltas[j]
+        fallas[j] += np.count_nonzero((s2[m - k:] > t_euler[j]) & (s1[m - k:] <= t_mat[j]))
+    return fallas, m
+
+
+def indice_confiabilidad(prob_falla):
+    """beta = -Phi^-1(Pf); infinito si no hubo fallas, -infinito si fallaron todas."""
+    if prob_falla <= 0.0:
+        return math.inf
+    if prob_falla >= 1.0:
+        return -math.inf
+    return -NormalDist().inv_cdf(prob_falla)
+
+
+def analizar_lote(cap_material, rigidez_euler, alturas, radios, cargas, distribuciones=None,
+                  n_muestras=100000, semilla=0, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5,
+                  tam_bloque=TAM_BLOQUE, r_derivado=None):
+    """
+    Monte Carlo sobre arreglos de columnas válidas (capacidad_material y rigidez_euler
+    como en barrido.preparar_barrido). r_derivado marca las columnas cuyo r sale del
+    área (ver validacion.radios_derivados). Devuelve (fallas, muestras válidas), ambos
+    por columna.
+    """
+    fs = validar_numero(factor_seguridad, "factor_seguridad")
+    K = validar_numero(K_factor, "K_factor")
+    dist = normalizar_distribuciones(distribuciones)
+    P = np.asarray(cargas, dtype=np.float64)
+    Le = K * np.asarray(alturas, dtype=np.float64)
+
+    # umbrales nominales por columna (mismas fórmulas que calcular_lote)
+    t_mat = np.asarray(cap_material, dtype=np.float64) / fs / P
+    t_euler = (np.asarray(rigidez_euler, dtype=np.float64) / (Le * Le) / 1000.0) / fs / P
+    t_esbelta = ESBELTEZ_CRITERIO / (Le / np.asarray(radios, dtype=np.float64))
+
+    derivado = np.zeros(len(P), dtype=bool) if r_derivado is None else np.asarray(r_derivado, dtype=bool)
+    grupos = [(g, np.flatnonzero(derivado == g)) for g in (False, True)]
+    grupos = [(g, cols) for g, cols in grupos if len(cols)]
+
+    flujos = [np.random.default_rng(s) for s in np.random.SeedSequence(semilla).spawn(len(VARIABLES))]
+    fallas = np.zeros(len(P), dtype=np.int64)
+    validas = np.zeros(len(P), dtype=np.int64)
+    hechas = 0
+    while hechas < n_muestras:
+        m = min(tam_bloque, n_muestras - hechas)
+        factores = [muestrear_factor(rng, *dist[var], m) for rng, var in zip(flujos, VARIABLES)]
+        for es_derivado, cols in grupos:
+            f = factores
+            if es_derivado:
+                # r = sqrt(A/12): el radio escala con sqrt(fA); fA <= 0 da fr = 0 y la muestra se descarta
+                f = list(factores)
+                f[2] = None if factores[1] is None else np.sqrt(np.maximum(factores[1], 0.0))
+            f_bloque, m_validas = _contar_fallas(f, m, t_mat[cols], t_euler[cols], t_esbelta[cols])
+            fallas[cols] += f_bloque
+            validas[cols] += m_validas
+        hechas += m
+    return fallas, validas
+
+
+def analizar_confiabilidad(matriz_columnas, distribuciones=None, n_muestras=100000, semilla=0,
+                           materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD,
+                           K_factor=0.5, tam_bloque=TAM_BLOQUE):
+    """
+    Probabilidad de falla por columna. Devuelve una lista con
+    {'id', 'prob_falla', 'indice_confiabilidad', 'error_estandar', 'muestras'} o {'id', 'error'}.
+    """
+    prep = preparar_barrido(matriz_columnas, materiales_dic)
+    valido = prep["valido"]
+    fallas, validas = analizar_lote(
+        prep["capacidad_material"][valido], prep["rigidez_euler"][valido], prep["altura_m"][valido],
+        prep["r_m"][valido], prep["carga_aplicada_kN"][valido], distribuciones, n_muestras, semilla,
+        factor_seguridad, K_factor, tam_bloque, radios_derivados(matriz_columnas)[valido])
+
+    salida = []
+    j = 0
+    for i, ok in enumerate(valido.tolist()):
+        id_col = prep["ids"][i]
+        if not ok:
+            salida.append({"id": id_col, "error": prep["errores"][i]})
+            continue
+        n = int(validas[j])
+        pf = int(fallas[j]) / n if n else math.nan
+        salida.append({
+            "id": id_col,
+            "prob_falla": pf,
+            "indice_confiabilidad": indice_confiabilidad(pf) if n else math.nan,
+            "error_estandar": math.sqrt(pf * (1.0 - pf) / n) if n else math.nan,
+            "muestras": n,
+        })
+        j += 1
+    return salida
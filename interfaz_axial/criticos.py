@@ -0,0 +1,157 @@
+# criticos.py
+"""
+Columnas más críticas de un archivo o lote sin guardar todos los resultados.
+
+Se conservan las k filas con mayor valor del criterio (delta_kN, utilización =
+carga aplicada / carga admisible, o lambda) en un montículo de tamaño k, así que la
+memoria es O(k + tam_bloque) sin importar cuántas columnas haya. De cada bloque
+evaluado con calcular_lote sólo se arman los diccionarios de las filas que entran
+al montículo o que superan el umbral de alerta.
+
+A igual valor queda la fila que apareció primero, así que el resultado no depende de
+cómo se corte el archivo en bloques.
+"""
+import heapq
+import numpy as np
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+from lotes import matriz_a_arreglos, calcular_lote, fila_a_dict
+from flujo import leer_columnas, TAM_BLOQUE
+
+CRITERIOS = ("utilizacion", "delta_kN", "lambda")
+K_DEFECTO = 100
+
+
+def valores_criterio(lote, criterio):
+    """Valor del criterio por fila de un lote de calcular_lote (NaN en las inválidas)."""
+    if criterio == "utilizacion":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            valores = lote["carga_aplicada_kN"] / lote["carga_adm_final_kN"]
+    elif criterio in ("delta_kN", "lambda"):
+        valores = lote[criterio].astype(np.float64, copy=True)
+    else:
+        raise ValueError(f"Criterio desconocido: '{criterio}' (use {', '.join(CRITERIOS)})")
+    valores[~lote["valido"]] = np.nan
+    return valores
+
+
+def _valor_resultado(res, criterio):
+    if criterio == "utilizacion":
+        return res["carga_aplicada_kN"] / res["carga_adm_final_kN"]
+    return res[criterio]
+
+
+class SeleccionCriticos:
+    """
+    Las k filas con mayor criterio vistas hasta ahora. Con umbral, alerta(res) se llama
+    apenas se evalúa cada fila cuya utilización lo supera (en el orden de entrada).
+    """
+
+    def __init__(self, k=K_DEFECTO, criterio="utilizacion", umbral=None, alerta=None):
+        if criterio not in CRITERIOS:
+            raise ValueError(f"Criterio desconocido: '{criterio}' (use {', '.join(CRITERIOS)})")
+        if k < 1:
+            raise ValueError("k debe ser al menos 1")
+        self.k = k
+        self.criterio = criterio
+        self.umbral = umbral
+        self.alerta = alerta
+        self.monticulo = []  # (valor, -orden, resultado): la raíz es la primera en salir
+        self.filas = 0
+        self.alertas = 0
+        self.errores = 0
+
+    def _minimo(self):
+        return self.monticulo[0][0] if len(self.monticulo) >= self.k else -np.inf
+
+    def _ofrecer(self, valor, orden, res):
+        entrada = (valor, -orden, res)
+        if len(self.monticulo) < self.k:
+            heapq.heappush(self.monticulo, entrada)
+        elif entrada[:2] > self.monticulo[0][:2]:
+            heapq.heapreplace(self.monticulo, entrada)
+
+    def agregar_lote(self, lote, ids, materiales_dic=MATERIALES):
+        """Agrega un lote de calcular_lote; ids son los de sus filas, en el mismo orden."""
+        n = len(ids)
+        base = self.filas
+        self.filas += n
+        self.errores += n - int(np.count_nonzero(lote["valido"]))
+        claves = list(materiales_dic.keys())
+
+        if self.umbral is not None:
+            utilizacion = valores_criterio(lote, "utilizacion")
+            excedidas = np.flatnonzero(utilizacion > self.umbral)
+            self.alertas += len(excedidas)
+            if self.alerta is not None:
+                for i in excedidas.tolist():
+                    self.alerta(fila_a_dict(lote, i, ids[i], claves))
+
+        valores = valores_criterio(lote, self.criterio)
+        candidatas = np.flatnonzero(valores >= self._minimo())
+        if len(candidatas) > self.k:
+            # sólo las k mayores del bloque pueden entrar; a igual valor, las primeras
+            orden = np.lexsort((candidatas, -valores[candidatas]))
+            candidatas = np.sort(candidatas[orden[:self.k]])
+        for i in candidatas.tolist():
+            valor = float(valores[i])
+            if len(self.monticulo) < self.k or (valor, -(base + i)) > self.monticulo[0][:2]:
+                self._ofrecer(valor, base + i, fila_a_dict(lote, i, ids[i], claves))
+        return self
+
+    def agregar(self, resultados, columnas=None):
+        """
+        Agrega diccionarios de calcular_carga_admisible. Tiene la misma forma que
+        AgregadorResultados.agregar, así que sirve de agregador en flujo.evaluar_flujo.
+        """
+        for res in resultados:
+            orden = self.filas
+            self.filas += 1
+            if "error" in res:
+                self.errores += 1
+                continue
+            if self.umbral is not None and _valor_resultado(res, "utilizacion") > self.umbral:
+                self.alertas += 1
+                if self.alerta is not None:
+                    self.alerta(res)
+            self._ofrecer(_valor_resultado(res, self.criterio), orden, res)
+        return self
+
+    def combinar(self, otro):
+        """
+        Suma otra selección del mismo criterio; sus filas se consideran posteriores a
+        las propias (combinar en el orden de los bloques conserva el desempate).
+        """
+        if (otro.k, otro.criterio) != (self.k, self.criterio):
+            raise ValueError("Sólo se combinan selecciones con igual k y criterio")
+        for valor, menos_orden, res in otro.monticulo:
+            self._ofrecer(valor, self.filas - menos_orden, res)
+        self.filas += otro.filas
+        self.alertas += otro.alertas
+        self.errores += otro.errores
+        return self
+
+    def resultado(self):
+        """Las filas seleccionadas, de la más crítica a la menos, con su 'valor' del criterio."""
+        filas = []
+        for valor, _, res in sorted(self.monticulo, key=lambda e: (-e[0], -e[1])):
+            fila = dict(res)
+            fila["valor"] = valor
+            filas.append(fila)
+        return filas
+
+    def resumen(self):
+        return {"criterio": self.criterio, "k": self.k, "filas": self.filas,
+                "errores": self.errores, "alertas": self.alertas}
+
+
+def criticos_flujo(ruta_entrada, k=K_DEFECTO, criterio="utilizacion", umbral=None, alerta=None,
+                   materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5,
+                   tam_bloque=TAM_BLOQUE):
+    """Recorre un CSV/JSONL de columnas una vez y devuelve la SeleccionCriticos resultante."""
+    seleccion = SeleccionCriticos(k, criterio, umbral, alerta)
+    for bloque in leer_columnas(ruta_entrada, tam_bloque):
+        ids, arr, _ = matriz_a_arreglos(bloque, materiales_dic)
+        lote = calcular_lote(arr["alturas"], arr["areas"], arr["radios"], arr["materiales_idx"], arr["cargas"],
+                             materiales_dic, factor_seguridad, K_factor)
+        seleccion.agregar_lote(lote, ids, materiales_dic)
+    return seleccion
@@ -0,0 +1,158 @@
+# diseno.py
+"""
+Dimensionamiento: para cada columna, la sección y el material más baratos cuya
+carga admisible cubre carga_aplicada_kN.
+
+La sección se escala con forma fija, r = coef * sqrt(A) (cuadrada maciza: 1/sqrt(12),
+la misma aproximación de parsear_seccion_raw). Con eso la capacidad es creciente en A
+y cada rama tiene forma cerrada:
+
+    material (lambda <= 12):  A = P * fs / (1000 * f_c)
+    Euler    (lambda > 12):   A = K*L / coef * sqrt(1000 * fs * P / (pi² * E_Pa))
+
+El resultado se verifica con calcular_lote y, si el redondeo lo deja apenas por
+debajo de la carga, se sube el área unos ulp hasta que pase.
+"""
+import math
+import numpy as np
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD, ESBELTEZ_CRITERIO
+from utils import validar_numero
+from lotes import calcular_lote, tablas_materiales, CONTROL_TEXTO, VEREDICTO_FALLA
+from validacion import validar_matriz, I_ALTURA, I_AREA, I_RADIO, I_CARGA
+
+COEF_FORMA = {
+    "cuadrada": 1.0 / math.sqrt(12.0),
+    "circular": 1.0 / (2.0 * math.sqrt(math.pi)),
+}
+MAX_AJUSTES = 64
+
+
+def tabla_costos(materiales_dic=MATERIALES, costos=None):
+    """Costo por m³ de cada material (en orden de índice); sin dato, 1.0 (se minimiza el volumen)."""
+    costos = costos or {}
+    return np.array([costos.get(k, materiales_dic[k].get("costo_m3", 1.0)) for k in materiales_dic],
+                    dtype=np.float64)
+
+
+def area_minima(cargas, alturas, f_c_MPa, E_GPa, coef_forma, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD,
+                K_factor=0.5):
+    """Área mínima (forma cerrada) con capacidad >= carga. Admite arreglos que se difunden entre sí."""
+    P = np.asarray(cargas, dtype=np.float64)
+    Le = K_factor * np.asarray(alturas, dtype=np.float64)
+    c = np.asarray(coef_forma, dtype=np.float64)
+    fs = factor_seguridad
+
+    A_mat = P * fs / (1000.0 * np.asarray(f_c_MPa, dtype=np.float64))
+    A_euler = Le / c * np.sqrt(1000.0 * fs * P / ((math.pi ** 2) * (np.asarray(E_GPa, dtype=np.float64) * 1e9)))
+    # por debajo de A_limite la columna es esbelta (lambda > criterio)
+    A_limite = (Le / (ESBELTEZ_CRITERIO * c)) ** 2
+
+    esbelta = A_mat < A_limite
+    return np.where(esbelta, np.minimum(np.maximum(A_mat, A_euler), A_limite), A_mat)
+
+
+def _ajustar(A, alturas, coef, idx, cargas, materiales_dic, fs, K):
+    """Sube el área de las filas que la verificación exacta rechaza por redondeo."""
+    paso = np.finfo(np.float64).eps
+    for _ in range(MAX_AJUSTES):
+        lote = calcular_lote(alturas, A, coef * np.sqrt(A), idx, cargas, materiales_dic, fs, K)
+        fallan = lote["veredicto"] == VEREDICTO_FALLA
+        if not fallan.any():
+            return A, lote
+        A = np.where(fallan, A * (1.0 + paso), A)
+        paso *= 2.0
+    raise ValueError("No se pudo ajustar el área de diseño (revise los datos).")
+
+
+def dimensionar_lote(alturas, cargas, materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD,
+                     K_factor=0.5, coef_forma=COEF_FORMA["cuadrada"], materiales=None, costos=None, paso_m2=None):
+    """
+    Sección y material más baratos para cada columna (arreglos de alturas y cargas válidas).
+    coef_forma puede ser un escalar o un arreglo por columna. materiales limita las claves
+    candidatas; paso_m2 redondea el área hacia arriba a múltiplos de ese valor.
+    Devuelve un diccionario de arreglos con el formato de calcular_lote más costo.
+    """
+    fs = validar_numero(factor_seguridad, "factor_seguridad")
+    K = validar_numero(K_factor, "K_factor")
+    L = np.asarray(alturas, dtype=np.float64)
+    P = np.asarray(cargas, dtype=np.float64)
+    coef = np.broadcast_to(np.asarray(coef_forma, dtype=np.float64), L.shape)
+
+    claves, tabla_fc, tabla_E = tablas_materiales(materiales_dic)
+    if materiales is None:
+        materiales = claves
+    for k in materiales:
+        if k not in materiales_dic:
+            raise ValueError(f"Material '{k}' no registrado.")
+    candidatos = np.array([claves.index(k) for k in materiales], dtype=np.int64)
+    if not len(candidatos):
+        raise ValueError("No hay materiales candidatos para dimensionar.")
+    costo_m3 = tabla_costos(materiales_dic, costos)
+
+    # una fila por material candidato: [m, columna]
+    A = area_minima(P, L, tabla_fc[candidatos, None], tabla_E[candidatos, None], coef, fs, K)
+    if paso_m2:
+        A = np.ceil(A / paso_m2) * paso_m2
+
+    m, n = A.shape
+    A_plano, lote = _ajustar(A.ravel(), np.tile(L, m), np.tile(coef, m), np.repeat(candidatos, n),
+                             np.tile(P, m), materiales_dic, fs, K)
+    A = A_plano.reshape(m, n)
+
+    costo = A * L * costo_m3[candidatos, None]
+    mejor = np.argmin(costo, axis=0)
+    cols = np.arange(n)
+    pos = mejor * n + cols
+    resultado = {campo: valores[pos] for campo, valores in lote.items()}
+    resultado["costo"] = costo[mejor, cols]
+    return resultado
+
+
+def dimensionar_columnas(matriz_columnas, materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD,
+                         K_factor=0.5, forma="cuadrada", materiales=None, costos=None, paso_m2=None):
+    """
+    Propuesta de diseño para toda la matriz en una llamada. forma es 'cuadrada',
+    'circular' o 'actual' (conserva la relación r/sqrt(A) de la sección ingresada).
+    Devuelve una lista con {'id', 'material', 'seccion': [area, r], ...} o {'id', 'error'}.
+    """
+    val = validar_matriz(matriz_columnas, materiales_dic)
+    requeridos = (I_ALTURA, I_AREA, I_RADIO, I_CARGA) if forma == "actual" else (I_ALTURA, I_CARGA)
+    if forma != "actual" and forma not in COEF_FORMA:
+        raise ValueError(f"Forma '{forma}' no reconocida.")
+
+    validas = ~val.invalidas_en(requeridos)
+    arr = val.arreglos
+    if forma == "actual":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coef = (arr["radios"] / np.sqrt(arr["areas"]))[validas]
+    else:
+        coef = COEF_FORMA[forma]
+
+    lote = dimensionar_lote(arr["alturas"][validas], arr["cargas"][validas], materiales_dic, factor_seguridad,
+                            K_factor, coef, materiales, costos, paso_m2)
+
+    claves = list(materiales_dic.keys())
+    A, r, mat = lote["area_m2"].tolist(), lote["r_m"].tolist(), lote["material_idx"].tolist()
+    final, control = lote["carga_adm_final_kN"].tolist(), lote["control"].tolist()
+    lam, delta, costo = lote["lambda"].tolist(), lote["delta_kN"].tolist(), lote["costo"].tolist()
+
+    propuestas = []
+    j = 0
+    for i, ok in enumerate(validas.tolist()):
+        if not ok:
+            propuestas.append({"id": val.ids[i], "error": val.mensaje(i, requeridos)})
+            continue
+        propuestas.append({
+            "id": val.ids[i],
+            "material": claves[mat[j]],
+            "seccion": [A[j], r[j]],
+            "area_m2": A[j],
+            "r_m": r[j],
+            "costo": costo[j],
+            "carga_adm_final_kN": final[j],
+            "lambda": lam[j],
+            "control": CONTROL_TEXTO[control[j]],
+            "delta_kN": delta[j],
+        })
+        j += 1
+    return propuestas
@@ -0,0 +1,200 @@
+# edificio.py
+"""
+Bajada de cargas en edificios de varios pisos.
+
+Las columnas se enlazan en pilas verticales, de arriba hacia abajo. En cada columna,
+la posición 4 es la carga que recibe en su propio nivel; la carga axial que se verifica
+es la suma de esa carga y las de todas las columnas de encima en la misma pila:
+
+    carga_aplicada_kN[k] = carga_nivel[0] + ... + carga_nivel[k]
+
+Al cambiar la carga de un nivel sólo se recalculan ese nivel y los de abajo en su pila;
+al cambiar altura, sección o material sólo esa columna (el peso propio no se modela,
+así que la sección no altera la carga de las de abajo). Los totales de una pila se
+vuelven a sumar desde sus filas cada vez que cambia (no se ajustan por diferencia, que
+acumula redondeo con muchos cambios) y los del edificio son la suma de los de las
+pilas, así que coinciden exactamente con los de un edificio armado de nuevo.
+
+Una carga de nivel inválida no detiene la bajada: ese nivel queda con su error (como
+cualquier fila inválida en calcular_volumenes_totales) y no aporta a los de abajo.
+"""
+from calculos import calcular_carga_admisible
+from utils import validar_numero
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+from incremental import aporte_totales
+
+
+def _carga_nivel(id_columna, valor):
+    """(carga, None) si es válida; (None, mensaje) si no."""
+    try:
+        return validar_numero(valor, f"carga_nivel {id_columna}", positive=False), None
+    except ValueError as e:
+        return None, str(e)
+
+
+class Pila:
+    """
+    Columnas de una vertical, de arriba hacia abajo, con la carga acumulada por nivel.
+    cargas_nivel[k] es None si la carga de ese nivel es inválida (el motivo en errores_carga[k]).
+    """
+    __slots__ = ("nombre", "columnas", "cargas_nivel", "errores_carga", "acumuladas", "resultados",
+                 "total_exceso", "total_relleno")
+
+    def __init__(self, nombre, columnas):
+        self.nombre = nombre
+        self.columnas = [list(c) for c in columnas]
+        self.cargas_nivel = [None] * len(self.columnas)
+        self.errores_carga = [None] * len(self.columnas)
+        for k, c in enumerate(self.columnas):
+            self.cargas_nivel[k], self.errores_carga[k] = _carga_nivel(c[0], c[4] if len(c) > 4 else None)
+        self.acumuladas = [0.0] * len(self.columnas)
+        self.resultados = [None] * len(self.columnas)
+        self.total_exceso = 0.0
+        self.total_relleno = 0.0
+
+    def totalizar(self):
+        """Vuelve a sumar los totales de la pila desde sus resultados, de arriba hacia abajo."""
+        exceso = relleno = 0.0
+        for res in self.resultados:
+            if res is not None:
+                e, r = aporte_totales(res)
+                exceso += e
+                relleno += r
+        self.total_exceso = exceso
+        self.total_relleno = relleno
+
+
+class Edificio:
+    def __init__(self, materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+        self.materiales_dic = materiales_dic
+        self.factor_seguridad = factor_seguridad
+        self.K_factor = K_factor
+        self.pilas = {}
+        self.ubicacion = {}  # id -> (pila, nivel desde arriba)
+        self.recalculadas = 0  # columnas evaluadas desde la creación (para medir el ahorro)
+
+    @classmethod
+    def desde_columnas(cls, matriz_columnas, campo_pila="pila", campo_nivel="nivel", **kwargs):
+        """
+        Arma las pilas con las etiquetas de cada columna (posición 5, ver flujo.leer_columnas):
+        campo_pila la identifica y campo_nivel ordena (el número más alto es el de arriba).
+        """
+        edificio = cls(**kwargs)
+        pilas = {}
+        for col in matriz_columnas:
+            etiquetas = col[5] if len(col) > 5 and isinstance(col[5], dict) else {}
+            if etiquetas.get(campo_pila) is None:
+                raise ValueError(f"Columna {col[0]}: falta la etiqueta '{campo_pila}'")
+            nivel = validar_numero(etiquetas.get(campo_nivel), f"{campo_nivel} {col[0]}", positive=False)
+            pilas.setdefault(etiquetas[campo_pila], []).append((nivel, col))
+        for nombre, niveles in pilas.items():
+            niveles.sort(key=lambda t: -t[0])
+            edificio.agregar_pila(nombre, [col for _, col in niveles])
+        return edificio
+
+    def agregar_pila(self, nombre, columnas):
+        """columnas de arriba hacia abajo; la carga de cada una es la de su nivel."""
+        if nombre in self.pilas:
+            raise ValueError(f"La pila '{nombre}' ya existe")
+        pila = Pila(nombre, columnas)
+        # todo se verifica antes de registrar, así un error no deja la pila a medias
+        vistos = set()
+        for col in pila.columnas:
+            if col[0] in self.ubicacion or col[0] in vistos:
+                raise ValueError(f"Id de columna repetido: {col[0]}")
+            vistos.add(col[0])
+        for k, col in enumerate(pila.columnas):
+            self.ubicacion[col[0]] = (nombre, k)
+        self.pilas[nombre] = pila
+        self._recalcular(pila, 0)
+        return pila
+
+    # ---------------- cálculo ----------------
+
+    def _evaluar(self, pila, k):
+        col = pila.columnas[k]
+        if pila.cargas_nivel[k] is None:
+            return {"id": col[0], "error": pila.errores_carga[k]}
+        columna = [col[0], col[1], col[2], col[3], pila.acumuladas[k]]
+        try:
+            res = calcular_carga_admisible(columna, self.materiales_dic, self.factor_seguridad, self.K_factor)
+        except Exception as e:
+            res = {"id": col[0], "error": str(e)}
+        self.recalculadas += 1
+        return res
+
+    def _recalcular(self, pila, desde):
+        """Acumula desde el nivel 'desde' hacia abajo y evalúa esas columnas."""
+        acumulada = pila.acumuladas[desde - 1] if desde > 0 else 0.0
+        cambios = []
+        for k in range(desde, len(pila.columnas)):
+            if pila.cargas_nivel[k] is not None:
+                acumulada += pila.cargas_nivel[k]
+            pila.acumuladas[k] = acumulada
+            res = self._evaluar(pila, k)
+            pila.resultados[k] = res
+            cambios.append(res)
+        pila.totalizar()
+        return cambios
+
+    # ---------------- cambios ----------------
+
+    def cambiar_carga(self, id_columna, carga_nivel):
+        """
+        Nueva carga de nivel. Devuelve los resultados recalculados (ese nivel y los de
+        abajo); si la carga es inválida, ese nivel queda con el error.
+        """
+        nombre, k = self.ubicacion[id_columna]
+        pila = self.pilas[nombre]
+        pila.columnas[k][4] = carga_nivel
+        pila.cargas_nivel[k], pila.errores_carga[k] = _carga_nivel(id_columna, carga_nivel)
+        return self._recalcular(pila, k)
+
+    def cambiar_columna(self, id_columna, altura=None, seccion=None, material=None):
+        """Nueva altura, sección y/o material. Sólo cambia la capacidad de esa columna."""
+        nombre, k = self.ubicacion[id_columna]
+        pila = self.pilas[nombre]
+        col = pila.columnas[k]
+        for pos, valor in ((1, altura), (2, seccion), (3, material)):
+            if valor is not None:
+                col[pos] = valor
+        res = self._evaluar(pila, k)
+        pila.resultados[k] = res
+        pila.totalizar()
+        return [res]
+
+    def invalidar_materiales(self, claves):
+        """Recalcula las columnas con esos materiales (p. ej. tras recargar el catálogo)."""
+        claves = set(claves)
+        cambios = []
+        for pila in self.pilas.values():
+            n = len(cambios)
+            for k, col in enumerate(pila.columnas):
+                if isinstance(col[3], str) and col[3] in claves:
+                    res = self._evaluar(pila, k)
+                    pila.resultados[k] = res
+                    cambios.append(res)
+            if len(cambios) > n:
+                pila.totalizar()
+        return cambios
+
+    # ---------------- consulta ----------------
+
+    def resultado(self, id_columna):
+        nombre, k = self.ubicacion[id_columna]
+        return self.pilas[nombre].resultados[k]
+
+    def resultados(self):
+        """Resultados pila por pila, de arriba hacia abajo."""
+        return [res for pila in self.pilas.values() for res in pila.resultados]
+
+    @property
+    def total_exceso(self):
+        return sum(pila.total_exceso for pila in self.pilas.values())
+
+    @property
+    def total_relleno(self):
+        return sum(pila.total_relleno for pila in self.pilas.values())
+
+    def resumen(self):
+        return {"total_exceso_kN": self.total_exceso, "total_relleno_kN": self.total_relleno}
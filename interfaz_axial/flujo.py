@@ -0,0 +1,216 @@
+# flujo.py
+import csv
+import json
+import os
+from itertools import repeat, islice
+from calculos import calcular_carga_admisible
+from utils import parsear_seccion_texto
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+from instrumentacion import INSTRUMENTACION as _instr, reloj as _reloj
+
+TAM_BLOQUE = 10000
+
+CAMPOS_RESULTADO = [
+    "id", "altura_m", "area_m2", "r_m", "material", "f_c_MPa", "E_GPa",
+    "carga_aplicada_kN", "carga_adm_material_kN", "euler_adm_kN", "carga_adm_final_kN",
+    "lambda", "control", "delta_kN", "veredicto", "error",
+    "total_exceso_kN", "total_relleno_kN",
+]
+
+
+def detectar_formato(ruta):
+    """'csv' o 'jsonl' según la extensión del archivo."""
+    ext = os.path.splitext(ruta)[1].lower()
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if ext in (".csv", ".txt"):
+        return "csv"
+    raise ValueError(f"Formato de archivo no reconocido: '{ruta}'")
+
+
+def _registro_desde_dict(d, etiquetas=()):
+    """
+    Arma [id, altura, seccion, material, carga] desde un registro con nombres de campo.
+    Con etiquetas se agrega un sexto elemento {etiqueta: valor} (p. ej. piso o eje).
+    """
+    if "seccion" in d and d["seccion"] not in (None, ""):
+        seccion = d["seccion"]
+        if isinstance(seccion, str):
+            seccion = parsear_seccion_texto(seccion)
+    else:
+        r = d.get("r")
+        seccion = [d.get("area"), r if r not in (None, "") else None]
+
+    material = d.get("material")
+    if isinstance(material, str):
+        material = material.strip()
+
+    registro = [d.get("id"), d.get("altura"), seccion, material, d.get("carga")]
+    if etiquetas:
+        registro.append({e: d.get(e) for e in etiquetas})
+    return registro
+
+
+def _filas_csv(f, etiquetas=()):
+    lector = csv.DictReader(f)
+    for d in lector:
+        yield _registro_desde_dict(d, etiquetas)
+
+
+def _fila_ilegible(num_linea, motivo):
+    # fila que no pasa la validación: el motivo llega al error de esa fila y el resto sigue
+    return [f"línea {num_linea}", motivo, None, None, None]
+
+
+def _filas_jsonl(f, etiquetas=()):
+    for num_linea, linea in enumerate(f, 1):
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            d = json.loads(linea)
+        except ValueError as e:
+            yield _fila_ilegible(num_linea, f"JSON inválido: {e}")
+            continue
+        if isinstance(d, list):
+            yield list(d)
+        elif isinstance(d, dict):
+            yield _registro_desde_dict(d, etiquetas)
+        else:
+            yield _fila_ilegible(num_linea, f"se esperaba un objeto o una lista, no {type(d).__name__}")
+
+
+def leer_columnas(ruta, tam_bloque=TAM_BLOQUE, formato=None, etiquetas=(), saltar=0):
+    """
+    Lee columnas de un CSV o JSONL sin cargar el archivo completo.
+    Produce bloques (listas) de hasta tam_bloque registros [id, altura, seccion, material, carga].
+    CSV: encabezado id,altura,seccion,material,carga (o area,r en lugar de seccion).
+    JSONL: un objeto con esos campos o una lista por línea; una línea ilegible se
+    produce como fila inválida con id "línea N", para que dé un error en esa fila.
+    etiquetas: campos adicionales que se guardan como dict en la posición 5.
+    saltar: filas iniciales que se leen sin producirlas (para reanudar una corrida).
+    """
+    formato = formato or detectar_formato(ruta)
+    with open(ruta, newline="" if formato == "csv" else None, encoding="utf-8") as f:
+        filas = _filas_csv(f, etiquetas) if formato == "csv" else _filas_jsonl(f, etiquetas)
+        if saltar:
+            filas = islice(filas, saltar, None)
+        bloque = []
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) >= tam_bloque:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+
+
+class EscritorResultados:
+    """
+    Escribe resultados fila a fila en CSV o JSONL junto con los totales acumulados.
+    Con desde_byte se continúa un archivo existente cortado en ese tamaño (sin repetir el encabezado).
+    """
+
+    def __init__(self, ruta, formato=None, desde_byte=None):
+        self.formato = formato or detectar_formato(ruta)
+        if desde_byte is not None:
+            os.truncate(ruta, desde_byte)
+        modo = "w" if desde_byte is None else "a"
+        self.archivo = open(ruta, modo, newline="" if self.formato == "csv" else None, encoding="utf-8")
+        self.csv = None
+        if self.formato == "csv":
+            self.csv = csv.DictWriter(self.archivo, fieldnames=CAMPOS_RESULTADO, extrasaction="ignore")
+            if desde_byte is None:
+                self.csv.writeheader()
+
+    def escribir(self, res, totales):
+        fila = dict(res)
+        fila.update(totales)
+        if self.csv is not None:
+            self.csv.writerow(fila)
+        else:
+            self.archivo.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+    def cerrar(self):
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def evaluar_flujo(ruta_entrada, ruta_salida, materiales_dic=MATERIALES,
+                  factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5, tam_bloque=TAM_BLOQUE, cache=None,
+                  agregador=None, etiquetas=(), punto_control=None, intervalo_control_s=None):
+    """
+    Evalúa un archivo de columnas bloque a bloque y escribe cada resultado con los
+    totales acumulados hasta esa fila. La memoria usada depende de tam_bloque, no del archivo.
+    Con cache (memo.CacheLRU) las columnas repetidas de cada bloque se calculan una vez
+    y la caché se conserva entre bloques. Con agregador (agregados.AgregadorResultados)
+    cada bloque se agrega por grupos; etiquetas son los campos de grupo leídos del archivo.
+    Con punto_control (ruta de un JSON, ver puntos_control.py) el avance se guarda cada
+    intervalo_control_s segundos y, si el archivo ya existe, la corrida sigue desde ahí;
+    al terminar se borra. La salida final es la misma que sin interrupciones.
+    Devuelve el resumen final y el número de filas procesadas.
+    """
+    # con la instrumentación activa la corrida se cuenta y se mide como en calcular_volumenes_totales
+    t_inicio = _reloj() if _instr.activa else None
+    total_exceso = 0.0
+    total_relleno = 0.0
+    filas = 0
+
+    control = None
+    desde_byte = None
+    if punto_control is not None:
+        from puntos_control import PuntoControl, huella_corrida, INTERVALO_S
+        if agregador is not None:
+            raise ValueError("El agregador no se guarda en el punto de control; no se pueden usar juntos")
+        huella = huella_corrida(ruta_entrada, ruta_salida, materiales_dic, factor_seguridad, K_factor)
+        intervalo = INTERVALO_S if intervalo_control_s is None else intervalo_control_s
+        control = PuntoControl(punto_control, huella, intervalo)
+        estado = control.cargar()
+        if estado is not None:
+            filas = estado["filas"]
+            desde_byte = estado["bytes_salida"]
+            total_exceso = estado["total_exceso_kN"]
+            total_relleno = estado["total_relleno_kN"]
+
+    with EscritorResultados(ruta_salida, desde_byte=desde_byte) as escritor:
+        for bloque in leer_columnas(ruta_entrada, tam_bloque, etiquetas=etiquetas, saltar=filas):
+            if cache is not None:
+                from memo import calcular_volumenes_totales_memo
+                resultados = calcular_volumenes_totales_memo(bloque, materiales_dic, factor_seguridad, K_factor,
+                                                             cache)[0]
+            else:
+                resultados = map(_evaluar_o_error, bloque, repeat((materiales_dic, factor_seguridad, K_factor)))
+            if agregador is not None:
+                resultados = list(resultados)
+                agregador.agregar(resultados, bloque)
+            for res in resultados:
+                if "error" not in res:
+                    if res["delta_kN"] > 0:
+                        total_exceso += res["delta_kN"]
+                    else:
+                        total_relleno += abs(res["delta_kN"])
+
+                escritor.escribir(res, {"total_exceso_kN": total_exceso, "total_relleno_kN": total_relleno})
+                filas += 1
+
+            if control is not None and control.vencido():
+                control.guardar(escritor.archivo, filas,
+                                {"total_exceso_kN": total_exceso, "total_relleno_kN": total_relleno})
+
+    if control is not None:
+        control.borrar()
+    if t_inicio is not None:
+        _instr.terminar_corrida(t_inicio)
+    return {"total_exceso_kN": total_exceso, "total_relleno_kN": total_relleno}, filas
+
+
+def _evaluar_o_error(col, parametros):
+    try:
+        return calcular_carga_admisible(col, *parametros)
+    except Exception as e:
+        return {"id": col[0], "error": str(e)}
@@ -1,16 +1,36 @@
 # gui.py
 import tkinter as tk
-from tkinter import ttk, messagebox
-from calculos import calcular_volumenes_totales
+from tkinter import ttk, messagebox, filedialog
 from pruebas import pruebas_unitarias
 from materiales import MATERIALES
+from utils import parsear_seccion_texto
+from incremental import ResultadosIncrementales
+from tareas import TareaSegundoPlano
+from vista_resultados import VistaResultados
+from diseno import dimensionar_columnas
+from catalogo import CatalogoMateriales
+import instrumentacion
+
+INTERVALO_SONDEO_MS = 50
+INTERVALO_CATALOGO_MS = 1000  # cada cuánto se revisa si cambió el archivo de catálogo
+
+
+def _pruebas_en_fondo():
+    yield pruebas_unitarias()
+
 
 class ColumnApp:
-    def __init__(self, root):
+    def __init__(self, root, catalogo=None):
         root.title("Cálculo de carga axial admisible - Columnas")
         root.geometry("1000x600")
 
-        self.matriz_columnas = []
+        self.root = root
+        self.tarea = None
+        self.matriz_columnas = []  # columnas en orden de ingreso
+        self.columnas = {}  # item de self.tree -> su columna (el mismo objeto que en matriz_columnas)
+        self.incremental = ResultadosIncrementales()
+        self.materiales = catalogo if catalogo is not None else CatalogoMateriales(MATERIALES)
+        self.medir = tk.BooleanVar(value=False)
         self.factor_seguridad = tk.DoubleVar(value=3.0)
         self.K_factor = tk.DoubleVar(value=0.5)
 
@@ -26,8 +46,9 @@ class ColumnApp:
             ent.grid(row=i, column=1)
             self.entries.append(ent)
 
-        mat_text = "Materiales: " + ", ".join(MATERIALES.keys())
-        ttk.Label(frame_in, text=mat_text).grid(row=5, column=0, columnspan=2, pady=4)
+        self.lbl_materiales = ttk.Label(frame_in, text="")
+        self.lbl_materiales.grid(row=5, column=0, columnspan=2, pady=4)
+        self._mostrar_materiales()
 
         ttk.Label(frame_in, text="Factor seguridad:").grid(row=0, column=2)
         ttk.Spinbox(frame_in, from_=1.1, to=10.0, increment=0.1, textvariable=self.factor_seguridad).grid(row=0, column=3)
@@ -37,6 +58,7 @@ class ColumnApp:
 
         ttk.Button(frame_in, text="Agregar", command=self.agregar_columna).grid(row=6, column=1, pady=6)
         ttk.Button(frame_in, text="Limpiar", command=self.limpiar_campos).grid(row=6, column=2, pady=6)
+        ttk.Button(frame_in, text="Catálogo...", command=self.abrir_catalogo).grid(row=6, column=3, pady=6)
 
         frame_list = ttk.LabelFrame(root, text="Columnas ingresadas")
         frame_list.pack(fill="both", expand=True, padx=8, pady=6)
@@ -50,18 +72,36 @@ class ColumnApp:
         frame_buttons = ttk.Frame(root)
         frame_buttons.pack(fill="x")
 
-        ttk.Button(frame_buttons, text="Calcular", command=self.calcular_gui).pack(side="left", padx=6)
+        self.btn_calcular = ttk.Button(frame_buttons, text="Calcular", command=self.calcular_gui)
+        self.btn_calcular.pack(side="left", padx=6)
         ttk.Button(frame_buttons, text="Pruebas", command=self.ejecutar_pruebas_gui).pack(side="left", padx=6)
         ttk.Button(frame_buttons, text="Eliminar", command=self.eliminar_seleccion).pack(side="left", padx=6)
+        ttk.Button(frame_buttons, text="Dimensionar", command=self.dimensionar_gui).pack(side="left", padx=6)
+
+        ttk.Checkbutton(frame_buttons, text="Medir", variable=self.medir,
+                        command=self.alternar_medicion).pack(side="left", padx=6)
+        ttk.Button(frame_buttons, text="Estadísticas", command=self.mostrar_estadisticas).pack(side="left", padx=6)
+
+        self.btn_cancelar = ttk.Button(frame_buttons, text="Cancelar", command=self.cancelar_calculo, state="disabled")
+        self.btn_cancelar.pack(side="left", padx=6)
+        self.progreso = ttk.Progressbar(frame_buttons, length=200, mode="determinate")
+        self.progreso.pack(side="left", padx=6)
+
+        self.lbl_resumen = ttk.Label(frame_buttons, text="")
+        self.lbl_resumen.pack(side="left", padx=12)
 
         frame_res = ttk.LabelFrame(root, text="Resultados")
         frame_res.pack(fill="both", expand=True, padx=8, pady=6)
 
-        cols_res = ("id", "c_aplicada", "c_adm", "lambda", "delta", "veredicto")
-        self.tree_res = ttk.Treeview(frame_res, columns=cols_res, show="headings")
-        for c in cols_res:
-            self.tree_res.heading(c, text=c)
-        self.tree_res.pack(fill="both", expand=True)
+        self.vista_res = VistaResultados(frame_res)
+        self.root.after(INTERVALO_CATALOGO_MS, self._vigilar_catalogo)
+
+    def _reemplazar_columna(self, vieja, nueva):
+        # las filas se identifican por el objeto columna (ver ResultadosIncrementales)
+        for i, col in enumerate(self.matriz_columnas):
+            if col is vieja:
+                self.matriz_columnas[i] = nueva
+                return
 
     def limpiar_campos(self):
         for e in self.entries:
@@ -79,61 +119,161 @@ class ColumnApp:
                 messagebox.showwarning("Error", "El ID no puede estar vacío.")
                 return
 
-            if seccion.startswith("[") or "," in seccion:
-                try:
-                    s = seccion.replace(" ", "")
-                    if s.startswith("[") and s.endswith("]"):
-                        s = s[1:-1]
-                    parts = s.split(",")
-                    vals = [float(p) for p in parts]
-                    seccion_parsed = vals
-                except:
-                    seccion_parsed = seccion
-            else:
-                seccion_parsed = seccion
+            seccion_parsed = parsear_seccion_texto(seccion)
 
             nueva = [idv, altura, seccion_parsed, material, carga]
+            item = self.tree.insert("", tk.END, values=(idv, altura, seccion_parsed, material, carga))
+            self.columnas[item] = nueva
             self.matriz_columnas.append(nueva)
-
-            self.tree.insert("", tk.END, values=(idv, altura, seccion_parsed, material, carga))
             self.limpiar_campos()
 
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     def eliminar_seleccion(self):
-        sel = self.tree.selection()
-        if sel:
-            val = self.tree.item(sel[0], "values")
-            idb = val[0]
-            self.matriz_columnas = [c for c in self.matriz_columnas if str(c[0]) != str(idb)]
-            self.tree.delete(sel[0])
+        quitadas = set()
+        for item in self.tree.selection():
+            col = self.columnas.pop(item, None)
+            if col is not None:
+                quitadas.add(id(col))
+            self.tree.delete(item)
+        self.matriz_columnas = [c for c in self.matriz_columnas if id(c) not in quitadas]
+
+    def dimensionar_gui(self):
+        """Reemplaza sección y material de las columnas seleccionadas (o de todas) por el diseño más barato."""
+        items = [it for it in (self.tree.selection() or self.tree.get_children()) if it in self.columnas]
+        if not items:
+            return
+        try:
+            propuestas = dimensionar_columnas([self.columnas[it] for it in items], self.materiales,
+                                              float(self.factor_seguridad.get()), float(self.K_factor.get()))
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        validas = [(it, p) for it, p in zip(items, propuestas) if "error" not in p]
+        if not messagebox.askyesno("Dimensionar", f"Se redimensionarán {len(validas)} de {len(items)} columnas. ¿Continuar?"):
+            return
+        for item, p in validas:
+            col = self.columnas[item]
+            nueva = [col[0], col[1], p["seccion"], p["material"], col[4]]
+            self._reemplazar_columna(col, nueva)
+            self.columnas[item] = nueva
+            self.tree.item(item, values=tuple(nueva))
 
     def calcular_gui(self):
-        for i in self.tree_res.get_children():
-            self.tree_res.delete(i)
+        if self.tarea is not None:
+            return
 
         try:
             fs = float(self.factor_seguridad.get())
             K = float(self.K_factor.get())
-            resultados, resumen = calcular_volumenes_totales(self.matriz_columnas, MATERIALES, fs, K)
-
-            for r in resultados:
-                if "error" in r:
-                    self.tree_res.insert("", tk.END, values=(r["id"], "Error", r["error"], "-", "-", "ERROR"))
-                else:
-                    self.tree_res.insert("", tk.END, values=(
-                        r["id"],
-                        f"{r['carga_aplicada_kN']:.3f}",
-                        f"{r['carga_adm_final_kN']:.3f}",
-                        f"{r['lambda']:.3f}",
-                        f"{r['delta_kN']:.3f}",
-                        r["veredicto"],
-                    ))
-
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+
+        # el hilo trabaja sobre una copia; agregar o eliminar mientras calcula no la altera
+        matriz = list(self.matriz_columnas)
+        self.progreso.config(maximum=max(1, len(matriz)), value=0)
+        self.btn_calcular.state(["disabled"])
+        self.btn_cancelar.state(["!disabled"])
+
+        self.tarea = TareaSegundoPlano(self.incremental.actualizar_por_bloques, matriz, self.materiales, fs, K).iniciar()
+        self.root.after(INTERVALO_SONDEO_MS, self._sondear_calculo)
+
+    def _sondear_calculo(self):
+        tarea = self.tarea
+        for eliminadas, cambios, procesadas in tarea.recoger():
+            self._aplicar_cambios(eliminadas, cambios)
+            self.progreso.config(value=procesadas)
+        self.vista_res.refrescar()
+        self._mostrar_resumen(self.incremental.resumen())
+
+        if not tarea.terminada():
+            self.root.after(INTERVALO_SONDEO_MS, self._sondear_calculo)
+            return
+
+        self.tarea = None
+        self.btn_calcular.state(["!disabled"])
+        self.btn_cancelar.state(["disabled"])
+        if tarea.error is not None:
+            messagebox.showerror("Error", str(tarea.error))
+
+    def _aplicar_cambios(self, eliminadas, cambios):
+        tabla = self.vista_res.tabla
+        for k in eliminadas:
+            tabla.eliminar(k)
+        # sólo se tocan las filas nuevas o modificadas
+        for pos, k, r, nueva in cambios:
+            tabla.actualizar(k, r)
+
+    def cancelar_calculo(self):
+        if self.tarea is not None:
+            self.tarea.cancelar()
+
+    def _mostrar_resumen(self, resumen):
+        self.lbl_resumen.config(text=(
+            f"Exceso total: {resumen['total_exceso_kN']:.3f} kN   "
+            f"Relleno total: {resumen['total_relleno_kN']:.3f} kN"
+        ))
+
+    def _mostrar_materiales(self):
+        claves = list(self.materiales)
+        texto = ", ".join(claves[:8]) + (f" ... ({len(claves)} en total)" if len(claves) > 8 else "")
+        self.lbl_materiales.config(text="Materiales: " + texto)
+
+    def abrir_catalogo(self):
+        if self.tarea is not None:
+            messagebox.showwarning("Catálogo", "Espere a que termine el cálculo en curso.")
+            return
+        ruta = filedialog.askopenfilename(filetypes=[("Catálogo de materiales", "*.json *.csv"), ("Todos", "*.*")])
+        if not ruta:
+            return
+        try:
+            cambiadas = self.materiales.cargar(ruta)
+        except Exception as e:
+            messagebox.showerror("Catálogo", str(e))
+            return
+        self._catalogo_cambiado(cambiadas)
+
+    def _vigilar_catalogo(self):
+        # mientras hay un cálculo en curso el catálogo no se toca; se revisa en la próxima vuelta
+        if self.tarea is None:
+            try:
+                cambiadas = self.materiales.recargar_si_cambio()
+            except Exception as e:
+                cambiadas = set()
+                messagebox.showerror("Catálogo", f"No se pudo recargar el catálogo: {e}")
+            self._catalogo_cambiado(cambiadas)
+        self.root.after(INTERVALO_CATALOGO_MS, self._vigilar_catalogo)
+
+    def _catalogo_cambiado(self, cambiadas):
+        if not cambiadas:
+            return
+        self._mostrar_materiales()
+        # sólo se recalculan las columnas que usan los materiales modificados
+        self.incremental.invalidar_materiales(cambiadas)
+        if self.matriz_columnas:
+            self.calcular_gui()
+
+    def alternar_medicion(self):
+        if self.medir.get():
+            instrumentacion.activar()
+        else:
+            instrumentacion.desactivar()
+
+    def mostrar_estadisticas(self):
+        messagebox.showinfo("Estadísticas", instrumentacion.formatear(instrumentacion.estadisticas()))
 
     def ejecutar_pruebas_gui(self):
-        res = pruebas_unitarias()
-        messagebox.showinfo("Pruebas", str(res))
+        tarea = TareaSegundoPlano(_pruebas_en_fondo).iniciar()
+        self.root.after(INTERVALO_SONDEO_MS, self._sondear_pruebas, tarea)
+
+    def _sondear_pruebas(self, tarea):
+        for res in tarea.recoger():
+            messagebox.showinfo("Pruebas", str(res))
+
+        if not tarea.terminada():
+            self.root.after(INTERVALO_SONDEO_MS, self._sondear_pruebas, tarea)
+        elif tarea.error is not None:
+            messagebox.showerror("Pruebas", str(tarea.error))
@@ -0,0 +1,124 @@
+# incremental.py
+from calculos import calcular_carga_admisible
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+
+MAX_CACHE = 200000  # entradas guardadas antes de vaciar la caché
+TAM_BLOQUE = 500    # filas revisadas entre entregas parciales
+
+
+def _congelar(valor):
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def clave_columna(columna, materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+    """Clave de caché: contenido de la columna, propiedades de su material, FS y K."""
+    mat = materiales_dic.get(columna[3]) if len(columna) > 3 and isinstance(columna[3], str) else None
+    props = (mat["f_c"], mat["E_GPa"]) if mat is not None else None
+    return (_congelar(columna), props, factor_seguridad, K_factor)
+
+
+def aporte_totales(res):
+    """Contribución de un resultado a (total_exceso_kN, total_relleno_kN)."""
+    if "error" in res:
+        return 0.0, 0.0
+    if res["delta_kN"] > 0:
+        return res["delta_kN"], 0.0
+    return 0.0, abs(res["delta_kN"])
+
+
+class ResultadosIncrementales:
+    """
+    Mantiene los resultados de la matriz de columnas entre recálculos.
+    Sólo se evalúan las filas nuevas o cuyo contenido cambió, y los totales
+    se ajustan por diferencia. Las filas se identifican por el objeto columna.
+    """
+
+    def __init__(self):
+        self.cache = {}
+        self.filas = {}  # id(columna) -> (columna, clave, resultado)
+        self.total_exceso = 0.0
+        self.total_relleno = 0.0
+
+    def resumen(self):
+        return {"total_exceso_kN": self.total_exceso, "total_relleno_kN": self.total_relleno}
+
+    def _evaluar(self, columna, clave, materiales_dic, factor_seguridad, K_factor):
+        res = self.cache.get(clave)
+        if res is None:
+            try:
+                res = calcular_carga_admisible(columna, materiales_dic, factor_seguridad, K_factor)
+            except Exception as e:
+                res = {"id": columna[0], "error": str(e)}
+            if len(self.cache) >= MAX_CACHE:
+                self.cache.clear()
+            self.cache[clave] = res
+        return res
+
+    def _sumar(self, res, signo):
+        exceso, relleno = aporte_totales(res)
+        self.total_exceso += signo * exceso
+        self.total_relleno += signo * relleno
+
+    def invalidar_materiales(self, claves):
+        """
+        Olvida los resultados de las columnas con esos materiales (p. ej. tras recargar
+        el catálogo); el próximo actualizar recalcula sólo esas filas.
+        """
+        claves = set(claves)
+
+        def depende(columna):
+            return len(columna) > 3 and isinstance(columna[3], str) and columna[3] in claves
+
+        self.cache = {k: r for k, r in self.cache.items() if not depende(k[0])}
+        for k_fila, (col, clave, res) in self.filas.items():
+            if depende(col):
+                self.filas[k_fila] = (col, None, res)
+
+    def actualizar_por_bloques(self, matriz_columnas, materiales_dic=MATERIALES,
+                               factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5, tam_bloque=TAM_BLOQUE):
+        """
+        Sincroniza con la matriz actual de a bloques. Produce (eliminadas, cambios, procesadas):
+        eliminadas son las claves de fila que ya no existen, cambios es una lista de
+        (posicion, clave_fila, resultado, es_nueva) para filas nuevas o modificadas y
+        procesadas cuántas filas de la matriz se revisaron hasta ahora.
+        Si se deja de consumir el generador, las filas pendientes se evalúan en la próxima llamada.
+        """
+        actuales = {id(c) for c in matriz_columnas}
+        eliminadas = [k for k in self.filas if k not in actuales]
+        for k in eliminadas:
+            self._sumar(self.filas.pop(k)[2], -1)
+
+        cambios = []
+        for pos, col in enumerate(matriz_columnas):
+            k_fila = id(col)
+            clave = clave_columna(col, materiales_dic, factor_seguridad, K_factor)
+            previa = self.filas.get(k_fila)
+            if previa is None or previa[1] != clave:
+                res = self._evaluar(col, clave, materiales_dic, factor_seguridad, K_factor)
+                if previa is not None:
+                    self._sumar(previa[2], -1)
+                self._sumar(res, +1)
+                self.filas[k_fila] = (col, clave, res)
+                cambios.append((pos, k_fila, res, previa is None))
+
+            if (pos + 1) % tam_bloque == 0:
+                yield eliminadas, cambios, pos + 1
+                eliminadas, cambios = [], []
+
+        if not self.filas:
+            # sin filas no queda nada que arrastrar por redondeo
+            self.total_exceso = 0.0
+            self.total_relleno = 0.0
+
+        yield eliminadas, cambios, len(matriz_columnas)
+
+    def actualizar(self, matriz_columnas, materiales_dic=MATERIALES,
+                   factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+        """Sincroniza de una vez. Devuelve (eliminadas, cambios) como actualizar_por_bloques."""
+        eliminadas, cambios = [], []
+        for e, c, _ in self.actualizar_por_bloques(matriz_columnas, materiales_dic, factor_seguridad, K_factor):
+            eliminadas.extend(e)
+            cambios.extend(c)
+        return eliminadas, cambios
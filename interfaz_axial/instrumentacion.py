@@ -0,0 +1,114 @@
+# instrumentacion.py
+"""
+Contadores y temporizadores opcionales para calcular_carga_admisible y
+calcular_volumenes_totales. Mientras está desactivada, el cálculo sólo paga
+la consulta de un booleano por llamada.
+"""
+import cProfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+reloj = time.perf_counter
+
+
+class Instrumentacion:
+    def __init__(self):
+        self.activa = False
+        self.ganchos = []
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.tiempos = defaultdict(float)      # etapa -> segundos acumulados
+        self.contadores = Counter()            # filas, euler, errores, corridas...
+        self.fallas_validacion = Counter()     # campo -> cantidad
+        self.excepciones = Counter()           # tipo de excepción -> cantidad
+
+    def sumar_tiempo(self, etapa, segundos):
+        self.tiempos[etapa] += segundos
+
+    def estadisticas(self):
+        """Copia de los datos acumulados como diccionario simple (apto para JSON)."""
+        return {
+            "tiempos_s": dict(self.tiempos),
+            "contadores": dict(self.contadores),
+            "fallas_validacion": dict(self.fallas_validacion),
+            "excepciones": dict(self.excepciones),
+        }
+
+    def terminar_corrida(self, t_inicio):
+        """Cuenta una corrida completa, suma su tiempo total y avisa a los ganchos."""
+        self.contadores["corridas"] += 1
+        self.sumar_tiempo("total", reloj() - t_inicio)
+        self.notificar()
+
+    def notificar(self):
+        """Pasa las estadísticas a cada gancho registrado (al terminar una corrida)."""
+        if self.ganchos:
+            datos = self.estadisticas()
+            for gancho in self.ganchos:
+                gancho(datos)
+
+
+INSTRUMENTACION = Instrumentacion()
+
+
+def activar(reiniciar=True):
+    if reiniciar:
+        INSTRUMENTACION.reiniciar()
+    INSTRUMENTACION.activa = True
+
+
+def desactivar():
+    INSTRUMENTACION.activa = False
+
+
+def estadisticas():
+    return INSTRUMENTACION.estadisticas()
+
+
+def registrar_gancho(funcion):
+    """funcion(estadisticas) se llama al final de cada corrida medida (calcular_volumenes_totales o evaluar_flujo)."""
+    INSTRUMENTACION.ganchos.append(funcion)
+
+
+def quitar_gancho(funcion):
+    INSTRUMENTACION.ganchos.remove(funcion)
+
+
+@contextmanager
+def medir(reiniciar=True):
+    """Activa la instrumentación dentro del bloque y la deja como estaba al salir."""
+    previa = INSTRUMENTACION.activa
+    activar(reiniciar)
+    try:
+        yield INSTRUMENTACION
+    finally:
+        INSTRUMENTACION.activa = previa
+
+
+@contextmanager
+def perfil(ruta=None):
+    """Ejecuta el bloque bajo cProfile; si se da ruta, vuelca ahí el archivo para pstats."""
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield perfilador
+    finally:
+        perfilador.disable()
+        if ruta:
+            perfilador.dump_stats(ruta)
+
+
+def formatear(datos):
+    """Texto breve de unas estadísticas, para la GUI o la consola."""
+    lineas = []
+    for clave, valor in sorted(datos["contadores"].items()):
+        lineas.append(f"{clave}: {valor}")
+    for etapa, seg in sorted(datos["tiempos_s"].items()):
+        lineas.append(f"tiempo {etapa}: {seg * 1000:.3f} ms")
+    for campo, n in sorted(datos["fallas_validacion"].items()):
+        lineas.append(f"validación fallida en {campo}: {n}")
+    for tipo, n in sorted(datos["excepciones"].items()):
+        lineas.append(f"excepción {tipo}: {n}")
+    return "\n".join(lineas) if lineas else "Sin datos (instrumentación desactivada)."
@@ -0,0 +1,197 @@
+# lotes.py
+import math
+import numpy as np
+from utils import validar_numero
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD, ESBELTEZ_CRITERIO
+from validacion import validar_matriz
+from catalogo import CatalogoMateriales
+
+# Códigos compactos para control y veredicto
+CONTROL_MATERIAL = 0
+CONTROL_EULER = 1
+CONTROL_TEXTO = ("material", "Euler")
+
+VEREDICTO_MARGEN = -1
+VEREDICTO_EQUILIBRIO = 0
+VEREDICTO_FALLA = 1
+VEREDICTO_TEXTO = {
+    VEREDICTO_FALLA: "falla por sobrecarga",
+    VEREDICTO_MARGEN: "margen disponible",
+    VEREDICTO_EQUILIBRIO: "equilibrio",
+}
+
+
+def tablas_materiales(materiales_dic=MATERIALES):
+    """Claves en orden de índice y arreglos f_c / E alineados con ellas."""
+    if isinstance(materiales_dic, CatalogoMateriales):
+        return materiales_dic.tablas()
+    claves = list(materiales_dic.keys())
+    f_c = np.array([materiales_dic[k]["f_c"] for k in claves], dtype=np.float64)
+    E = np.array([materiales_dic[k]["E_GPa"] for k in claves], dtype=np.float64)
+    return claves, f_c, E
+
+
+def tabla_pi2_E_Pa(materiales_dic=MATERIALES):
+    """π²·E·1e9 por material (ya precalculado si materiales_dic es un CatalogoMateriales)."""
+    if isinstance(materiales_dic, CatalogoMateriales):
+        return materiales_dic.pi2_E_Pa
+    _, _, E = tablas_materiales(materiales_dic)
+    return (math.pi ** 2) * (E * 1e9)
+
+
+def calcular_lote(alturas, areas, radios, materiales_idx, cargas,
+                  materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+    """
+    Versión vectorizada de calcular_carga_admisible sobre arreglos columnares.
+    materiales_idx indexa las claves de materiales_dic en su orden de inserción.
+    Las filas con datos no positivos o material desconocido quedan con valido=False.
+    """
+    fs = validar_numero(factor_seguridad, "factor_seguridad")
+    K = float(K_factor)
+
+    L = np.asarray(alturas, dtype=np.float64)
+    A = np.asarray(areas, dtype=np.float64)
+    r = np.asarray(radios, dtype=np.float64)
+    P = np.asarray(cargas, dtype=np.float64)
+    idx = np.asarray(materiales_idx, dtype=np.int64)
+
+    _, tabla_fc, tabla_E = tablas_materiales(materiales_dic)
+    tabla_pi2E = tabla_pi2_E_Pa(materiales_dic)
+    n_mat = len(tabla_fc)
+
+    # Misma regla que validar_numero: se rechaza todo valor <= 0
+    valido = ~((L <= 0) | (A <= 0) | (r <= 0) | (P <= 0))
+    valido &= (idx >= 0) & (idx < n_mat)
+    if n_mat:
+        idx_seguro = np.where(valido, idx, 0)
+        f_c = tabla_fc[idx_seguro]
+        E_GPa = tabla_E[idx_seguro]
+        pi2_E_Pa = tabla_pi2E[idx_seguro]
+    else:
+        f_c = np.full(L.shape, np.nan)
+        E_GPa = np.full(L.shape, np.nan)
+        pi2_E_Pa = np.full(L.shape, np.nan)
+
+    carga_mat = A * f_c * 1000.0 / fs  # kN
+
+    Le = K * L
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        lam = Le / r
+
+        # Rama de Euler sólo donde lambda > criterio
+        esbelta = lam > ESBELTEZ_CRITERIO
+        Pcr_N = pi2_E_Pa * (A * (r * r)) / (Le * Le)
+        euler_adm = np.where(esbelta, (Pcr_N / 1000.0) / fs, np.nan)  # kN
+
+    gobierna_euler = esbelta & (euler_adm < carga_mat)
+    carga_final = np.where(gobierna_euler, euler_adm, carga_mat)
+    control = gobierna_euler.astype(np.int8)
+
+    with np.errstate(invalid="ignore"):
+        delta = P - carga_final
+    veredicto = np.where(delta > 0, VEREDICTO_FALLA,
+                         np.where(delta < 0, VEREDICTO_MARGEN, VEREDICTO_EQUILIBRIO)).astype(np.int8)
+
+    return {
+        "valido": valido,
+        "altura_m": L,
+        "area_m2": A,
+        "r_m": r,
+        "material_idx": idx,
+        "f_c_MPa": f_c,
+        "E_GPa": E_GPa,
+        "carga_aplicada_kN": P,
+        "carga_adm_material_kN": carga_mat,
+        "euler_adm_kN": euler_adm,
+        "carga_adm_final_kN": carga_final,
+        "lambda": lam,
+        "control": control,
+        "delta_kN": delta,
+        "veredicto": veredicto,
+    }
+
+
+def resumen_lote(lote):
+    """Totales de exceso y relleno con la misma suma secuencial del cálculo escalar."""
+    delta = lote["delta_kN"][lote["valido"]]
+    exceso = delta > 0
+    # cumsum acumula en orden, igual que el bucle de calcular_volumenes_totales
+    parcial_exceso = np.cumsum(np.where(exceso, delta, 0.0))
+    parcial_relleno = np.cumsum(np.where(exceso, 0.0, np.abs(delta)))
+    return {
+        "total_exceso_kN": float(parcial_exceso[-1]) if len(delta) else 0.0,
+        "total_relleno_kN": float(parcial_relleno[-1]) if len(delta) else 0.0,
+    }
+
+
+def matriz_a_arreglos(matriz_columnas, materiales_dic=MATERIALES):
+    """
+    Convierte la matriz de columnas (listas heterogéneas) a arreglos columnares.
+    Devuelve (ids, arreglos, errores) donde errores mapea posición -> mensaje;
+    los mensajes se arman recién al consultarlos (ver validacion.validar_matriz).
+    """
+    val = validar_matriz(matriz_columnas, materiales_dic)
+    return val.ids, val.arreglos, val.errores
+
+
+def fila_a_dict(lote, i, id_col, claves):
+    """Reconstruye el diccionario de calcular_carga_admisible para la fila i."""
+    esbelta = lote["lambda"][i] > ESBELTEZ_CRITERIO
+    return {
+        "id": id_col,
+        "altura_m": float(lote["altura_m"][i]),
+        "area_m2": float(lote["area_m2"][i]),
+        "r_m": float(lote["r_m"][i]),
+        "material": claves[lote["material_idx"][i]],
+        "f_c_MPa": float(lote["f_c_MPa"][i]),
+        "E_GPa": float(lote["E_GPa"][i]),
+        "carga_aplicada_kN": float(lote["carga_aplicada_kN"][i]),
+        "carga_adm_material_kN": float(lote["carga_adm_material_kN"][i]),
+        "euler_adm_kN": float(lote["euler_adm_kN"][i]) if esbelta else None,
+        "carga_adm_final_kN": float(lote["carga_adm_final_kN"][i]),
+        "lambda": float(lote["lambda"][i]),
+        "control": CONTROL_TEXTO[lote["control"][i]],
+        "delta_kN": float(lote["delta_kN"][i]),
+        "veredicto": VEREDICTO_TEXTO[int(lote["veredicto"][i])],
+    }
+
+
+def calcular_volumenes_totales_lote(matriz_columnas, materiales_dic=MATERIALES,
+                                    factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+    """Misma salida que calcular_volumenes_totales, usando el motor vectorizado."""
+    ids, arr, errores = matriz_a_arreglos(matriz_columnas, materiales_dic)
+    lote = calcular_lote(arr["alturas"], arr["areas"], arr["radios"], arr["materiales_idx"], arr["cargas"],
+                         materiales_dic, factor_seguridad, K_factor)
+    claves = list(materiales_dic.keys())
+
+    # pasar a listas una sola vez es mucho más barato que indexar NumPy fila por fila
+    L, A, r, P = (lote[c].tolist() for c in ("altura_m", "area_m2", "r_m", "carga_aplicada_kN"))
+    f_c, E, mat_idx = (lote[c].tolist() for c in ("f_c_MPa", "E_GPa", "material_idx"))
+    c_mat, euler, c_final = (lote[c].tolist() for c in ("carga_adm_material_kN", "euler_adm_kN", "carga_adm_final_kN"))
+    lam, control, delta, veredicto = (lote[c].tolist() for c in ("lambda", "control", "delta_kN", "veredicto"))
+    validas = lote["valido"].tolist()
+
+    resultados = []
+    for i, id_col in enumerate(ids):
+        if not validas[i]:
+            resultados.append({"id": id_col, "error": errores[i]})
+            continue
+        resultados.append({
+            "id": id_col,
+            "altura_m": L[i],
+            "area_m2": A[i],
+            "r_m": r[i],
+            "material": claves[mat_idx[i]],
+            "f_c_MPa": f_c[i],
+            "E_GPa": E[i],
+            "carga_aplicada_kN": P[i],
+            "carga_adm_material_kN": c_mat[i],
+            "euler_adm_kN": euler[i] if lam[i] > ESBELTEZ_CRITERIO else None,
+            "carga_adm_final_kN": c_final[i],
+            "lambda": lam[i],
+            "control": CONTROL_TEXTO[control[i]],
+            "delta_kN": delta[i],
+            "veredicto": VEREDICTO_TEXTO[veredicto[i]],
+        })
+
+    return resultados, resumen_lote(lote)
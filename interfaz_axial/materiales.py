@@ -3,9 +3,10 @@ DEFAULT_FACTOR_SEGURIDAD = 3.0
 ESBELTEZ_CRITERIO = 12.0  # si lambda > 12 se evalúa Euler
 
 # Base de datos de materiales
-# f_c en MPa, E en GPa
+# f_c en MPa, E en GPa, costo_m3 en unidades relativas por m³ de columna (sólo para dimensionar):
+# concreto colocado ≈ 100-110; acero ≈ 1.1 unidades/kg × 7850 kg/m³ ≈ 8600
 MATERIALES = {
-    "concreto_25": {"nombre": "Concreto f'c=25 MPa", "f_c": 25.0, "E_GPa": 25.0},
-    "concreto_20": {"nombre": "Concreto f'c=20 MPa", "f_c": 20.0, "E_GPa": 25.0},
-    "acero_250":  {"nombre": "Acero S250 (σy≈250 MPa)", "f_c": 250.0, "E_GPa": 200.0},
+    "concreto_25": {"nombre": "Concreto f'c=25 MPa", "f_c": 25.0, "E_GPa": 25.0, "costo_m3": 110.0},
+    "concreto_20": {"nombre": "Concreto f'c=20 MPa", "f_c": 20.0, "E_GPa": 25.0, "costo_m3": 100.0},
+    "acero_250":  {"nombre": "Acero S250 (σy≈250 MPa)", "f_c": 250.0, "E_GPa": 200.0, "costo_m3": 8600.0},
 }
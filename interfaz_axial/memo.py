@@ -0,0 +1,188 @@
+# memo.py
+"""
+Memoización de columnas "típicas": filas que sólo se diferencian en el id.
+
+La clave canónica es (altura, área, r, material, f_c, E, carga, FS, K) ya convertidos
+a float, así que 3, 3.0 y "3" dan la misma entrada, y una sección sin r coincide con
+la misma sección con r = sqrt(A/12) explícito. Las propiedades del material forman
+parte de la clave: si cambia el catálogo, las entradas viejas simplemente no se usan.
+"""
+from collections import OrderedDict
+from calculos import calcular_carga_admisible
+from utils import validar_numero, parsear_seccion_raw
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+from validacion import validar_matriz
+from lotes import calcular_volumenes_totales_lote
+
+MAX_ENTRADAS = 100000
+
+
+class CacheLRU:
+    """Diccionario acotado: al llenarse se descarta la entrada usada hace más tiempo."""
+
+    def __init__(self, capacidad=MAX_ENTRADAS):
+        self.capacidad = capacidad
+        self.datos = OrderedDict()
+        self.reiniciar_estadisticas()
+
+    def reiniciar_estadisticas(self):
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave):
+        res = self.datos.get(clave)
+        if res is None:
+            self.fallos += 1
+            return None
+        self.datos.move_to_end(clave)
+        self.aciertos += 1
+        return res
+
+    def guardar(self, clave, res):
+        self.datos[clave] = res
+        self.datos.move_to_end(clave)
+        if len(self.datos) > self.capacidad:
+            self.datos.popitem(last=False)
+            self.desalojos += 1
+
+    def vaciar(self):
+        self.datos.clear()
+
+    def __len__(self):
+        return len(self.datos)
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self.datos),
+            "capacidad": self.capacidad,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+        }
+
+
+# Caché compartida por omisión
+CACHE = CacheLRU()
+
+
+def clave_canonica(altura_m, area_m2, r_m, material_key, materiales_dic, carga_kN, factor_seguridad, K_factor):
+    mat = materiales_dic[material_key]
+    return (altura_m, area_m2, r_m, material_key, mat["f_c"], mat["E_GPa"], carga_kN,
+            float(factor_seguridad), float(K_factor))
+
+
+def _con_id(res, id_col):
+    # cada fila recibe su propio diccionario: quien lo use puede modificarlo
+    copia = res.copy()
+    copia["id"] = id_col
+    return copia
+
+
+def calcular_carga_admisible_memo(columna, materiales_dic=MATERIALES, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD,
+                                  K_factor=0.5, cache=None):
+    """Como calcular_carga_admisible, pero reutiliza el resultado de una columna igual ya calculada."""
+    cache = CACHE if cache is None else cache
+    id_col = columna[0]
+    try:
+        altura_m = validar_numero(columna[1], f"altura {id_col}")
+        area_m2, r_m = parsear_seccion_raw(columna[2])
+        carga = validar_numero(columna[4], f"carga_aplicada {id_col}")
+        clave = clave_canonica(altura_m, area_m2, r_m, columna[3], materiales_dic, carga, factor_seguridad, K_factor)
+    except (ValueError, KeyError, TypeError, IndexError):
+        # datos inválidos: el cálculo normal arma el mismo mensaje de error
+        return calcular_carga_admisible(columna, materiales_dic, factor_seguridad, K_factor)
+
+    res = cache.obtener(clave)
+    if res is None:
+        res = calcular_carga_admisible(columna, materiales_dic, factor_seguridad, K_factor)
+        cache.guardar(clave, res)
+        return dict(res)
+    return _con_id(res, id_col)
+
+
+def _agrupar(matriz_columnas):
+    """Índice de fila única de cada fila (por contenido sin el id) y las filas únicas."""
+    grupos = {}
+    unicas = []
+    asignacion = []
+    agregar = asignacion.append
+    for i, col in enumerate(matriz_columnas):
+        # clave plana para la fila típica [id, altura, seccion, material, carga]
+        if len(col) == 5:
+            sec = col[2]
+            clave = (col[1], tuple(sec) if isinstance(sec, list) else sec, col[3], col[4])
+        else:
+            clave = ("fila", i)
+        try:
+            j = grupos.get(clave)
+        except TypeError:  # algún valor no hasheable: la fila queda sola
+            clave, j = ("fila", i), None
+        if j is None:
+            j = grupos[clave] = len(unicas)
+            unicas.append(col)
+        agregar(j)
+    return asignacion, unicas
+
+
+def calcular_volumenes_totales_memo(matriz_columnas, materiales_dic=MATERIALES,
+                                    factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5, cache=None):
+    """
+    Misma salida que calcular_volumenes_totales. Las filas con igual contenido se
+    agrupan, cada entrada distinta se busca una vez en la caché y las que faltan se
+    calculan juntas con el motor vectorizado; después el resultado se copia a cada id.
+    """
+    cache = CACHE if cache is None else cache
+    asignacion, unicas = _agrupar(matriz_columnas)
+
+    val = validar_matriz(unicas, materiales_dic)
+    arr = val.arreglos
+    L, A, r, P = (arr[c].tolist() for c in ("alturas", "areas", "radios", "cargas"))
+    mat_idx = arr["materiales_idx"].tolist()
+    claves_mat = list(materiales_dic.keys())
+
+    res_unicas = [None] * len(unicas)
+    claves = {}
+    faltantes = []
+    for j in range(len(unicas)):
+        if mat_idx[j] < 0:
+            continue  # fila inválida: el mensaje lleva el id, se arma por fila
+        clave = clave_canonica(L[j], A[j], r[j], claves_mat[mat_idx[j]], materiales_dic, P[j],
+                               factor_seguridad, K_factor)
+        res = cache.obtener(clave)
+        if res is None:
+            claves[j] = clave
+            faltantes.append(j)
+        else:
+            res_unicas[j] = res
+
+    if faltantes:
+        calculados, _ = calcular_volumenes_totales_lote([unicas[j] for j in faltantes], materiales_dic,
+                                                       factor_seguridad, K_factor)
+        for j, res in zip(faltantes, calculados):
+            cache.guardar(claves[j], res)
+            res_unicas[j] = res
+
+    invalidas = [i for i, j in enumerate(asignacion) if res_unicas[j] is None]
+    errores = {}
+    if invalidas:
+        val_err = validar_matriz([matriz_columnas[i] for i in invalidas], materiales_dic)
+        errores = {i: val_err.errores[k] for k, i in enumerate(invalidas)}
+
+    resultados = []
+    total_exceso = 0.0
+    total_relleno = 0.0
+    for i, col in enumerate(matriz_columnas):
+        res = res_unicas[asignacion[i]]
+        if res is None:
+            resultados.append({"id": col[0], "error": errores[i]})
+            continue
+        resultados.append(_con_id(res, col[0]))
+        if res["delta_kN"] > 0:
+            total_exceso += res["delta_kN"]
+        else:
+            total_relleno += abs(res["delta_kN"])
+
+    return resultados, {"total_exceso_kN": total_exceso, "total_relleno_kN": total_relleno}
@@ -0,0 +1,72 @@
+# paralelo.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from calculos import calcular_volumenes_totales
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+
+MIN_FILAS_PARALELO = 20000   # por debajo de esto el costo de los procesos no compensa
+BLOQUES_POR_PROCESO = 4      # algo de holgura para repartir bloques desparejos
+TAM_BLOQUE_MIN = 2000
+TAM_BLOQUE_MAX = 100000
+
+# Configuración fija de cada proceso trabajador (se envía una sola vez)
+_config = {}
+
+
+def _iniciar_trabajador(materiales_dic, factor_seguridad, K_factor):
+    _config["materiales"] = materiales_dic
+    _config["fs"] = factor_seguridad
+    _config["K"] = K_factor
+
+
+def _evaluar_bloque(bloque):
+    return calcular_volumenes_totales(bloque, _config["materiales"], _config["fs"], _config["K"])
+
+
+def num_procesos_defecto():
+    return os.cpu_count() or 1
+
+
+def tam_bloque_sugerido(n_filas, num_procesos):
+    """Reparte las filas en ~BLOQUES_POR_PROCESO bloques por proceso, dentro de límites razonables."""
+    tam = -(-n_filas // max(1, num_procesos * BLOQUES_POR_PROCESO))
+    return max(TAM_BLOQUE_MIN, min(TAM_BLOQUE_MAX, tam))
+
+
+def combinar_resumenes(resumenes):
+    """Suma los resúmenes parciales en el orden recibido (determinista para un mismo troceo)."""
+    total_exceso = 0.0
+    total_relleno = 0.0
+    for r in resumenes:
+        total_exceso += r["total_exceso_kN"]
+        total_relleno += r["total_relleno_kN"]
+    return {"total_exceso_kN": total_exceso, "total_relleno_kN": total_relleno}
+
+
+def calcular_volumenes_totales_paralelo(matriz_columnas, materiales_dic=MATERIALES,
+                                        factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5,
+                                        num_procesos=None, tam_bloque=None):
+    """
+    Igual que calcular_volumenes_totales pero repartiendo bloques de filas entre procesos.
+    Los resultados conservan el orden de entrada. Con pocas filas o un solo proceso
+    se calcula en serie. En Windows debe llamarse bajo `if __name__ == "__main__":`.
+    """
+    num_procesos = num_procesos or num_procesos_defecto()
+    n = len(matriz_columnas)
+
+    if num_procesos <= 1 or n < MIN_FILAS_PARALELO:
+        return calcular_volumenes_totales(matriz_columnas, materiales_dic, factor_seguridad, K_factor)
+
+    tam_bloque = tam_bloque or tam_bloque_sugerido(n, num_procesos)
+    bloques = (matriz_columnas[i:i + tam_bloque] for i in range(0, n, tam_bloque))
+
+    resultados = []
+    resumenes = []
+    with ProcessPoolExecutor(max_workers=num_procesos, initializer=_iniciar_trabajador,
+                             initargs=(materiales_dic, factor_seguridad, K_factor)) as ex:
+        # map entrega los bloques en el orden de envío
+        for res_bloque, resumen_bloque in ex.map(_evaluar_bloque, bloques):
+            resultados.extend(res_bloque)
+            resumenes.append(resumen_bloque)
+
+    return resultados, combinar_resumenes(resumenes)
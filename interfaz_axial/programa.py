@@ -14,8 +14,15 @@ Incluye:
 """
 
 import math
-import tkinter as tk
-from tkinter import ttk, messagebox
+
+# Tkinter se importa recién al crear la interfaz, así el cálculo puro no lo carga
+tk = ttk = messagebox = None
+
+
+def _importar_tkinter():
+    global tk, ttk, messagebox
+    import tkinter as tk
+    from tkinter import ttk, messagebox
 
 
 # ============================================================
@@ -197,6 +204,7 @@ def pruebas_unitarias():
 
 class ColumnApp:
     def __init__(self, root):
+        _importar_tkinter()
         root.title("Cálculo de carga axial admisible - Columnas")
         root.geometry("1000x600")
 
@@ -333,6 +341,7 @@ class ColumnApp:
 # ============================================================
 
 if __name__ == "__main__":
+    _importar_tkinter()
     root = tk.Tk()
     app = ColumnApp(root)
     root.mainloop()
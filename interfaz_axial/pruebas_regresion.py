@@ -0,0 +1,266 @@
+# pruebas_regresion.py
+"""
+Comprobaciones de regresión de los caminos alternativos contra el cálculo escalar.
+
+Cada prueba_* devuelve una lista de fallas (textos); vacía si todo coincide.
+pruebas_regresion() las ejecuta todas y devuelve {nombre: fallas}.
+"""
+import math
+from calculos import calcular_volumenes_totales
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+
+# Filas con todo lo que puede llegar de un CSV o de la GUI: textos, guiones bajos,
+# nan/inf, r faltante o inválido, materiales inexistentes, filas cortas...
+FILAS_DESPROLIJAS = [
+    ["D1", "3", "0.04", "concreto_25", "200"],
+    ["D2", 3.0, [0.02, None], "concreto_25", 100],
+    ["D3", "abc", 0.04, "concreto_25", 1],
+    ["D4", 3.0, -0.04, "concreto_25", 1],
+    ["D5", 3.0, 0.04, "inexistente", 100],
+    ["D6", 0, 0.04, "concreto_25", 1],
+    ["D7", 6.0, ["0.02", "0.01"], "concreto_25", 50],
+    ["D8", 3.0, 0.04, None, 100],
+    ["D9", " 3_0 ", "1e-2", "concreto_25", "nan"],
+    ["D10", 3, "inf", "concreto_25", 5],
+    ["D11", 12.0, [0.02, 0.05], "acero_250", 1000],
+    ["D12", 3.0, [], "concreto_25", 1],
+    ["D13", 3.0, [0.02, "x"], "concreto_25", 1],
+    ["D14", 3.0, (0.02, 0.001), "concreto_25", 1],
+    ["D15", True, 0.04, "concreto_25", 1],
+    ["D16", 3.0, 0.04, "concreto_25"],
+    ["D17", 3.0, 0.04, ["concreto_25"], 1],
+    ["D18", 3.0, {"a": 1}, "concreto_25", 1],
+    ["D19", 3.0, 0.04, "concreto_25", -5],
+    ["D20", 3.0, 0.03, "concreto_25", 0.03 * 25.0 * 1000.0 / DEFAULT_FACTOR_SEGURIDAD],  # equilibrio
+    ["D21", 8.0, [0.05, 0.08], "concreto_20", 600.0],
+]
+
+
+def _iguales(a, b):
+    """Igualdad exacta de resultados, con NaN igual a NaN."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_iguales(a[k], b[k]) for k in a)
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return type(a) is type(b) and a == b
+
+
+def _comparar(nombre, esperados, obtenidos):
+    fallas = []
+    if len(esperados) != len(obtenidos):
+        return [f"{nombre}: {len(obtenidos)} resultados en lugar de {len(esperados)}"]
+    for e, o in zip(esperados, obtenidos):
+        if not _iguales(e, o):
+            fallas.append(f"{nombre} {e.get('id')}: {o} en lugar de {e}")
+    return fallas
+
+
+def prueba_paridad_lote():
+    """calcular_volumenes_totales_lote da los mismos resultados, mensajes y totales que el escalar."""
+    from lotes import calcular_volumenes_totales_lote
+
+    fallas = []
+    for fs, K in ((DEFAULT_FACTOR_SEGURIDAD, 0.5), (2.0, 1.0)):
+        esperados, resumen = calcular_volumenes_totales(FILAS_DESPROLIJAS, MATERIALES, fs, K)
+        obtenidos, resumen_lote = calcular_volumenes_totales_lote(FILAS_DESPROLIJAS, MATERIALES, fs, K)
+        fallas += _comparar(f"lote FS={fs} K={K}", esperados, obtenidos)
+        if not _iguales(resumen, resumen_lote):
+            fallas.append(f"lote FS={fs} K={K}: resumen {resumen_lote} en lugar de {resumen}")
+    return fallas
+
+
+def prueba_almacen():
+    """
+    AlmacenResultados: una columna modificada reemplaza su fila (clave id, FS, K), las
+    no modificadas se saltean y consultar devuelve por omisión sólo la última corrida.
+    """
+    from almacen import AlmacenResultados
+
+    fallas = []
+    matriz = [list(c) for c in FILAS_DESPROLIJAS]
+    with AlmacenResultados() as almacen:
+        almacen.evaluar(matriz)
+        matriz[0][4] = 900.0
+        res = almacen.evaluar(matriz)
+        if (res["calculadas"], res["omitidas"]) != (1, len(matriz) - 1):
+            fallas.append(f"almacén: reevaluar con un cambio calculó {res}")
+        almacen.evaluar(matriz, factor_seguridad=2.0)
+
+        if len(almacen) != 2 * len(matriz):
+            fallas.append(f"almacén: {len(almacen)} filas en lugar de {2 * len(matriz)} "
+                          "(resultados viejos sin reemplazar)")
+        filas = almacen.consultar(id="D1")
+        if [(f["carga_aplicada_kN"], f["factor_seguridad"]) for f in filas] != [(900.0, 2.0)]:
+            fallas.append(f"almacén: consultar(id='D1') devolvió {filas}")
+        if len(almacen.consultar(id="D1", factor_seguridad=None)) != 2:
+            fallas.append("almacén: consultar con factor_seguridad=None no devolvió ambas corridas")
+
+        # lo guardado coincide con el cálculo escalar, errores incluidos
+        esperados, _ = calcular_volumenes_totales(matriz, MATERIALES, 2.0, 0.5)
+        guardados = {f["id"]: f for f in almacen.consultar() + almacen.consultar(con_error=True)}
+        for e in esperados:
+            g = dict(guardados.get(e["id"], {}))
+            g.pop("factor_seguridad", None)
+            g.pop("K_factor", None)
+            if "error" not in e and math.isnan(e["delta_kN"]):
+                continue  # SQLite guarda NaN como NULL
+            if not _iguales(e, g):
+                fallas.append(f"almacén {e['id']}: {g} en lugar de {e}")
+
+    # ids numéricos se consultan como texto; con ids repetidos queda la última fila,
+    # también al reevaluar
+    repetidas = [[7, 3.0, 0.04, "concreto_25", 10.0], [8, 3.0, 0.04, "concreto_25", 20.0],
+                 [7, 3.0, 0.04, "concreto_25", 900.0]]
+    with AlmacenResultados() as almacen:
+        almacen.evaluar(repetidas)
+        res = almacen.evaluar(repetidas)
+        if (res["calculadas"], res["repetidas"]) != (0, 1):
+            fallas.append(f"almacén: reevaluar con ids repetidos calculó {res}")
+        filas = almacen.consultar(id="7")
+        if [f["carga_aplicada_kN"] for f in filas] != [900.0]:
+            fallas.append(f"almacén: consultar(id='7') devolvió {filas}")
+    return fallas
+
+
+def prueba_sensibilidad():
+    """
+    La derivada de la carga admisible respecto del área coincide con una diferencia
+    finita del cálculo escalar, también cuando r se deriva del área (r = sqrt(A/12)).
+    """
+    from calculos import calcular_carga_admisible
+    from sensibilidad import calcular_sensibilidades
+
+    fallas = []
+    columnas = [["S1", 20.0, 0.03, "concreto_25", 55.0],               # Euler, r derivado
+                ["S2", 20.0, [0.03, None], "concreto_25", 55.0],       # Euler, r derivado
+                ["S3", 20.0, [0.03, 0.05], "concreto_25", 55.0],       # Euler, r dado
+                ["S4", 3.0, 0.09, "concreto_20", 500.0]]               # material, r derivado
+    sens = calcular_sensibilidades(columnas)
+    for i, col in enumerate(columnas):
+        def carga(area):
+            seccion = [area, col[2][1]] if isinstance(col[2], list) else area
+            return calcular_carga_admisible([col[0], col[1], seccion, col[3], col[4]])["carga_adm_final_kN"]
+
+        area = col[2][0] if isinstance(col[2], list) else col[2]
+        h = area * 1e-6
+        esperada = (carga(area + h) - carga(area - h)) / (2 * h)
+        obtenida = float(sens["derivadas"]["area_m2"][i])
+        if not math.isclose(obtenida, esperada, rel_tol=1e-6):
+            fallas.append(f"sensibilidad {col[0]}: dC/dA = {obtenida} en lugar de {esperada}")
+        esperadas = (["area_m2", "altura_m", "K_factor"], ["area_m2", "altura_m", "K_factor"],
+                     ["r_m", "altura_m", "K_factor"], ["area_m2", "factor_seguridad", "f_c_MPa"])[i]
+        if sens["mas_influyentes"][i] != esperadas:
+            fallas.append(f"sensibilidad {col[0]}: más influyentes {sens['mas_influyentes'][i]} "
+                          f"en lugar de {esperadas} (empates exactos)")
+        derivado = col[0] != "S3"
+        if sens["r_derivado"][i] != derivado or math.isnan(sens["derivadas"]["r_m"][i]) != derivado:
+            fallas.append(f"sensibilidad {col[0]}: r_derivado o dC/dr mal marcados")
+    return fallas
+
+
+def prueba_edificio():
+    """
+    Edificio: tras cambios de carga y de columna los resultados coinciden con armarlo
+    de nuevo; una carga de nivel inválida queda como error de esa fila y una pila con
+    ids repetidos se rechaza sin registrar nada.
+    """
+    from edificio import Edificio
+
+    fallas = []
+    pila = [["E1", 3.0, 0.04, "concreto_25", 100.0],
+            ["E2", 3.0, 0.04, "concreto_25", "xx"],
+            ["E3", 3.0, [0.02, 0.01], "concreto_25", 50.0],
+            ["E4", 3.0, 0.04, "concreto_25", 400.0]]
+    edificio = Edificio()
+    edificio.agregar_pila("P", pila)
+    if "error" not in edificio.resultado("E2") or edificio.resultado("E3")["carga_aplicada_kN"] != 150.0:
+        fallas.append(f"edificio: carga inválida mal tratada: {edificio.resultados()}")
+
+    edificio.cambiar_carga("E2", 30.0)
+    edificio.cambiar_columna("E3", altura=6.0)
+    edificio.cambiar_carga("E1", "-")
+    pila[1][4], pila[2][1], pila[0][4] = 30.0, 6.0, "-"
+    nuevo = Edificio()
+    nuevo.agregar_pila("P", pila)
+    fallas += _comparar("edificio", nuevo.resultados(), edificio.resultados())
+    # los totales se vuelven a sumar por pila: son exactamente los del edificio nuevo
+    if edificio.resumen() != nuevo.resumen():
+        fallas.append(f"edificio: resumen {edificio.resumen()} en lugar de {nuevo.resumen()}")
+
+    for columnas in ([["E5", 3.0, 0.04, "concreto_25", 1.0], ["E1", 3.0, 0.04, "concreto_25", 1.0]],
+                     [["E6", 3.0, 0.04, "concreto_25", 1.0], ["E6", 3.0, 0.04, "concreto_25", 1.0]]):
+        try:
+            edificio.agregar_pila("Q", columnas)
+            fallas.append(f"edificio: se aceptó la pila con ids repetidos {[c[0] for c in columnas]}")
+        except ValueError:
+            pass
+        if columnas[0][0] in edificio.ubicacion or "Q" in edificio.pilas:
+            fallas.append(f"edificio: la pila rechazada dejó registrado {columnas[0][0]}")
+    return fallas
+
+
+class _Interrupcion(Exception):
+    pass
+
+
+def prueba_reanudacion():
+    """
+    evaluar_flujo con punto de control: una corrida cortada a mitad y reanudada deja
+    la misma salida, byte a byte, que una sin cortes, y al terminar borra el punto de control.
+    """
+    import os
+    import tempfile
+    from flujo import evaluar_flujo
+    from memo import CacheLRU
+
+    class CacheQueFalla(CacheLRU):
+        # simula la caída del proceso en la consulta número 'tope'
+        def __init__(self, tope):
+            super().__init__()
+            self.tope = tope
+
+        def obtener(self, clave):
+            self.tope -= 1
+            if self.tope < 0:
+                raise _Interrupcion()
+            return super().obtener(clave)
+
+    fallas = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        entrada = os.path.join(carpeta, "columnas.csv")
+        with open(entrada, "w", encoding="utf-8", newline="") as f:
+            f.write("id,altura,area,material,carga\n")
+            for i in range(14):
+                f.write(f"R{i},{2.0 + i * 0.7},{0.01 + i * 0.003},concreto_25,{37.5 * (i + 1)}\n")
+        salida, esperada = os.path.join(carpeta, "salida.csv"), os.path.join(carpeta, "esperada.csv")
+        control = os.path.join(carpeta, "salida.control.json")
+
+        resumen = evaluar_flujo(entrada, esperada, tam_bloque=4)
+        try:
+            evaluar_flujo(entrada, salida, tam_bloque=4, cache=CacheQueFalla(10),
+                          punto_control=control, intervalo_control_s=0)
+            fallas.append("reanudación: la corrida no se interrumpió")
+        except _Interrupcion:
+            pass
+        if not os.path.exists(control):
+            fallas.append("reanudación: no quedó punto de control tras la interrupción")
+        with open(salida, "a", encoding="utf-8") as f:
+            f.write("fila escrita después del último punto de control\n")
+
+        reanudado = evaluar_flujo(entrada, salida, tam_bloque=4, punto_control=control, intervalo_control_s=0)
+        with open(esperada, "rb") as f1, open(salida, "rb") as f2:
+            if f1.read() != f2.read():
+                fallas.append("reanudación: la salida reanudada difiere de la corrida sin cortes")
+        if reanudado != resumen:
+            fallas.append(f"reanudación: devolvió {reanudado} en lugar de {resumen}")
+        if os.path.exists(control):
+            fallas.append("reanudación: el punto de control no se borró al terminar")
+    return fallas
+
+
+PRUEBAS = (prueba_paridad_lote, prueba_almacen, prueba_sensibilidad, prueba_edificio, prueba_reanudacion)
+
+
+def pruebas_regresion():
+    return {prueba.__name__: prueba() for prueba in PRUEBAS}
+
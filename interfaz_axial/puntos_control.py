@@ -0,0 +1,104 @@
+# puntos_control.py
+"""
+Puntos de control para corridas largas de flujo.evaluar_flujo.
+
+Cada tanto (al terminar un bloque, si pasó intervalo_s desde el anterior) se vacía
+el archivo de salida a disco y se guarda un JSON con las filas procesadas, el tamaño
+en bytes de la salida hasta ahí y los totales acumulados. El JSON se escribe en un
+archivo temporal y se renombra, así que en disco siempre hay un punto de control
+completo: el anterior o el nuevo.
+
+Al reanudar se corta la salida en ese tamaño (lo escrito después se descarta), se
+saltean las filas ya procesadas y los totales siguen desde los guardados. Los floats
+se guardan con repr, así que la suma continúa exactamente donde quedó y la salida
+final es idéntica a la de una corrida sin interrupciones.
+"""
+import hashlib
+import json
+import os
+import time
+
+VERSION = 1
+INTERVALO_S = 30.0
+
+
+def huella_corrida(ruta_entrada, ruta_salida, materiales_dic, factor_seguridad, K_factor):
+    """Datos que deben coincidir para que un punto de control sirva a esta corrida."""
+    info = os.stat(ruta_entrada)
+    materiales = json.dumps({k: [v["f_c"], v["E_GPa"]] for k, v in materiales_dic.items()}, sort_keys=True)
+    return {
+        "entrada": os.path.abspath(ruta_entrada),
+        "tam_entrada": info.st_size,
+        "mtime_entrada": info.st_mtime_ns,
+        "salida": os.path.abspath(ruta_salida),
+        "factor_seguridad": float(factor_seguridad),
+        "K_factor": float(K_factor),
+        "materiales": hashlib.blake2b(materiales.encode("utf-8"), digest_size=16).hexdigest(),
+    }
+
+
+def _sincronizar_directorio(ruta):
+    # en POSIX el renombre es durable recién cuando se sincroniza el directorio
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(ruta)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class PuntoControl:
+    """Estado de una corrida guardado en ruta (JSON)."""
+
+    def __init__(self, ruta, huella, intervalo_s=INTERVALO_S):
+        self.ruta = ruta
+        self.huella = huella
+        self.intervalo_s = intervalo_s
+        self.ultimo = time.monotonic()
+        self.guardados = 0
+
+    def cargar(self):
+        """Estado guardado o None si no hay. Error si es de otra corrida."""
+        if not os.path.exists(self.ruta):
+            return None
+        with open(self.ruta, encoding="utf-8") as f:
+            estado = json.load(f)
+        if estado.get("version") != VERSION or estado.get("huella") != self.huella:
+            raise ValueError(f"El punto de control '{self.ruta}' es de otra corrida "
+                             "(entrada, salida, catálogo, FS o K distintos); bórrelo para empezar de nuevo")
+        if not os.path.exists(self.huella["salida"]) or os.path.getsize(self.huella["salida"]) < estado["bytes_salida"]:
+            raise ValueError(f"La salida '{self.huella['salida']}' es más corta que la registrada en el punto de control")
+        return estado
+
+    def vencido(self):
+        return time.monotonic() - self.ultimo >= self.intervalo_s
+
+    def guardar(self, archivo_salida, filas, totales):
+        """Vacía la salida a disco y reemplaza el punto de control de forma atómica."""
+        archivo_salida.flush()
+        os.fsync(archivo_salida.fileno())
+        estado = {
+            "version": VERSION,
+            "huella": self.huella,
+            "filas": filas,
+            "bytes_salida": os.fstat(archivo_salida.fileno()).st_size,
+            "total_exceso_kN": totales["total_exceso_kN"],
+            "total_relleno_kN": totales["total_relleno_kN"],
+        }
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(estado, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta)
+        _sincronizar_directorio(self.ruta)
+        self.ultimo = time.monotonic()
+        self.guardados += 1
+
+    def borrar(self):
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
@@ -0,0 +1,241 @@
+# registros.py
+from collections.abc import Mapping
+from enum import IntEnum
+import numpy as np
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD, ESBELTEZ_CRITERIO
+from utils import validar_numero, parsear_seccion_raw
+from lotes import (
+    calcular_lote, matriz_a_arreglos,
+    CONTROL_MATERIAL, CONTROL_EULER, CONTROL_TEXTO,
+    VEREDICTO_MARGEN, VEREDICTO_EQUILIBRIO, VEREDICTO_FALLA, VEREDICTO_TEXTO,
+)
+
+
+class Control(IntEnum):
+    MATERIAL = CONTROL_MATERIAL
+    EULER = CONTROL_EULER
+
+    @property
+    def texto(self):
+        return CONTROL_TEXTO[self]
+
+    @classmethod
+    def desde_texto(cls, texto):
+        return cls(CONTROL_TEXTO.index(texto))
+
+
+class Veredicto(IntEnum):
+    MARGEN = VEREDICTO_MARGEN
+    EQUILIBRIO = VEREDICTO_EQUILIBRIO
+    FALLA = VEREDICTO_FALLA
+
+    @property
+    def texto(self):
+        return VEREDICTO_TEXTO[self]
+
+    @classmethod
+    def desde_texto(cls, texto):
+        for v in cls:
+            if VEREDICTO_TEXTO[v] == texto:
+                return v
+        raise ValueError(f"Veredicto desconocido: '{texto}'")
+
+
+CLAVES_RESULTADO = (
+    "id", "altura_m", "area_m2", "r_m", "material", "f_c_MPa", "E_GPa",
+    "carga_aplicada_kN", "carga_adm_material_kN", "euler_adm_kN", "carga_adm_final_kN",
+    "lambda", "control", "delta_kN", "veredicto",
+)
+
+
+class Columna:
+    """Columna ya validada; material es el índice de su clave en el diccionario de materiales."""
+    __slots__ = ("id", "altura_m", "area_m2", "r_m", "material", "carga_aplicada_kN")
+
+    def __init__(self, id, altura_m, area_m2, r_m, material, carga_aplicada_kN):
+        self.id = id
+        self.altura_m = altura_m
+        self.area_m2 = area_m2
+        self.r_m = r_m
+        self.material = material
+        self.carga_aplicada_kN = carga_aplicada_kN
+
+    @classmethod
+    def desde_lista(cls, columna, materiales_dic=MATERIALES):
+        """Valida [id, altura, seccion, material, carga] igual que calcular_carga_admisible."""
+        id_col = columna[0]
+        altura_m = validar_numero(columna[1], f"altura {id_col}")
+        area_m2, r_m = parsear_seccion_raw(columna[2])
+        carga = validar_numero(columna[4], f"carga_aplicada {id_col}")
+        if columna[3] not in materiales_dic:
+            raise ValueError(f"Material '{columna[3]}' no registrado.")
+        return cls(id_col, altura_m, area_m2, r_m, list(materiales_dic).index(columna[3]), carga)
+
+    def como_lista(self, materiales_dic=MATERIALES):
+        return [self.id, self.altura_m, [self.area_m2, self.r_m], list(materiales_dic)[self.material],
+                self.carga_aplicada_kN]
+
+
+class Resultado:
+    """Resultado de una columna con material, control y veredicto como códigos enteros."""
+    __slots__ = ("id", "altura_m", "area_m2", "r_m", "material", "carga_aplicada_kN",
+                 "carga_adm_material_kN", "euler_adm_kN", "carga_adm_final_kN",
+                 "lambda_", "control", "delta_kN", "veredicto")
+
+    @classmethod
+    def desde_dict(cls, res, materiales_dic=MATERIALES):
+        r = cls()
+        r.id = res["id"]
+        r.altura_m = res["altura_m"]
+        r.area_m2 = res["area_m2"]
+        r.r_m = res["r_m"]
+        r.material = list(materiales_dic).index(res["material"])
+        r.carga_aplicada_kN = res["carga_aplicada_kN"]
+        r.carga_adm_material_kN = res["carga_adm_material_kN"]
+        r.euler_adm_kN = res["euler_adm_kN"]
+        r.carga_adm_final_kN = res["carga_adm_final_kN"]
+        r.lambda_ = res["lambda"]
+        r.control = Control.desde_texto(res["control"])
+        r.delta_kN = res["delta_kN"]
+        r.veredicto = Veredicto.desde_texto(res["veredicto"])
+        return r
+
+    def como_dict(self, materiales_dic=MATERIALES):
+        clave = list(materiales_dic)[self.material]
+        mat = materiales_dic[clave]
+        return {
+            "id": self.id,
+            "altura_m": self.altura_m,
+            "area_m2": self.area_m2,
+            "r_m": self.r_m,
+            "material": clave,
+            "f_c_MPa": mat["f_c"],
+            "E_GPa": mat["E_GPa"],
+            "carga_aplicada_kN": self.carga_aplicada_kN,
+            "carga_adm_material_kN": self.carga_adm_material_kN,
+            "euler_adm_kN": self.euler_adm_kN,
+            "carga_adm_final_kN": self.carga_adm_final_kN,
+            "lambda": self.lambda_,
+            "control": self.control.texto,
+            "delta_kN": self.delta_kN,
+            "veredicto": self.veredicto.texto,
+        }
+
+
+class VistaResultado(Mapping):
+    """Vista de sólo lectura de una fila de LoteResultados con las claves del diccionario clásico."""
+    __slots__ = ("_lote", "_i")
+
+    def __init__(self, lote, i):
+        self._lote = lote
+        self._i = i
+
+    def _claves(self):
+        if self._i in self._lote.errores:
+            return ("id", "error")
+        return CLAVES_RESULTADO
+
+    def __getitem__(self, clave):
+        lote, i = self._lote, self._i
+        if clave == "id":
+            return lote.ids[i]
+        if i in lote.errores:
+            if clave == "error":
+                return lote.errores[i]
+            raise KeyError(clave)
+
+        if clave == "material":
+            return lote.claves_materiales[lote.material[i]]
+        if clave == "f_c_MPa":
+            return float(lote.tabla_fc[lote.material[i]])
+        if clave == "E_GPa":
+            return float(lote.tabla_E[lote.material[i]])
+        if clave == "control":
+            return CONTROL_TEXTO[lote.control[i]]
+        if clave == "veredicto":
+            return VEREDICTO_TEXTO[int(lote.veredicto[i])]
+        if clave == "euler_adm_kN":
+            return float(lote.euler_adm_kN[i]) if lote.lambda_[i] > ESBELTEZ_CRITERIO else None
+        if clave == "lambda":
+            return float(lote.lambda_[i])
+        if clave in LoteResultados.CAMPOS_FLOAT:
+            return float(getattr(lote, clave)[i])
+        raise KeyError(clave)
+
+    def __iter__(self):
+        return iter(self._claves())
+
+    def __len__(self):
+        return len(self._claves())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class LoteResultados:
+    """
+    Resultados de muchas columnas como estructura de arreglos: un float64 por campo
+    numérico, códigos enteros para material/control/veredicto y los ids aparte.
+    Las filas con error quedan en errores (posición -> mensaje).
+    """
+    CAMPOS_FLOAT = ("altura_m", "area_m2", "r_m", "carga_aplicada_kN", "carga_adm_material_kN",
+                    "euler_adm_kN", "carga_adm_final_kN", "delta_kN")
+
+    def __init__(self, ids, lote, errores=None, materiales_dic=MATERIALES):
+        self.ids = ids
+        self.errores = errores or {}
+        self.claves_materiales = list(materiales_dic)
+        self.tabla_fc = np.array([materiales_dic[k]["f_c"] for k in self.claves_materiales])
+        self.tabla_E = np.array([materiales_dic[k]["E_GPa"] for k in self.claves_materiales])
+
+        for campo in self.CAMPOS_FLOAT:
+            setattr(self, campo, lote[campo])
+        self.lambda_ = lote["lambda"]
+        # copy=False: si ya vienen con estos tipos (p. ej. mapeados desde binario.py) no se copian
+        self.material = lote["material_idx"].astype(np.int16, copy=False)
+        self.control = lote["control"].astype(np.int8, copy=False)
+        self.veredicto = lote["veredicto"].astype(np.int8, copy=False)
+
+    @classmethod
+    def desde_matriz(cls, matriz_columnas, materiales_dic=MATERIALES,
+                     factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+        ids, arr, errores = matriz_a_arreglos(matriz_columnas, materiales_dic)
+        lote = calcular_lote(arr["alturas"], arr["areas"], arr["radios"], arr["materiales_idx"], arr["cargas"],
+                             materiales_dic, factor_seguridad, K_factor)
+        return cls(ids, lote, errores, materiales_dic)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return VistaResultado(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield VistaResultado(self, i)
+
+    def resultado(self, i):
+        """Copia de la fila i como Resultado con __slots__ (None si la fila tiene error)."""
+        if i in self.errores:
+            return None
+        r = Resultado()
+        r.id = self.ids[i]
+        for campo in self.CAMPOS_FLOAT:
+            setattr(r, campo, float(getattr(self, campo)[i]))
+        r.lambda_ = float(self.lambda_[i])
+        if r.lambda_ <= ESBELTEZ_CRITERIO:
+            r.euler_adm_kN = None
+        r.material = int(self.material[i])
+        r.control = Control(int(self.control[i]))
+        r.veredicto = Veredicto(int(self.veredicto[i]))
+        return r
+
+    def nbytes(self):
+        """Memoria de los arreglos numéricos (sin contar los ids)."""
+        arreglos = [getattr(self, c) for c in self.CAMPOS_FLOAT]
+        arreglos += [self.lambda_, self.material, self.control, self.veredicto]
+        return sum(a.nbytes for a in arreglos)
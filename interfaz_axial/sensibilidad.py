@@ -0,0 +1,152 @@
+# sensibilidad.py
+"""
+Derivadas analíticas de carga_adm_final_kN respecto de cada dato, calculadas junto
+con el lote (una sola pasada de calcular_lote más unas operaciones por columna).
+
+    material:  C = A·f_c·1000 / FS
+               ∂C/∂A = C/A   ∂C/∂f_c = C/f_c   ∂C/∂FS = -C/FS
+    Euler:     C = π²·E·1e9·A·r² / (K·L)² / 1000 / FS
+               ∂C/∂A = C/A   ∂C/∂r = 2C/r   ∂C/∂L = -2C/L   ∂C/∂K = -2C/K
+               ∂C/∂E = C/E   ∂C/∂FS = -C/FS
+    Euler con r = sqrt(A/12) (sección dada sólo por el área):
+               C ∝ A², así que dC/dA = 2C/A (derivada total) y r no es un dato
+
+Las derivadas son las de la rama que gobierna (la misma regla de calcular_lote).
+Cuando r se deriva del área, la de r queda en NaN (None en el informe).
+Como delta_kN = P - C, ∂delta/∂x = -∂C/∂x.
+
+En lambda = ESBELTEZ_CRITERIO la carga admisible no es continua: al pasar a esbelta
+puede bajar de golpe de A·f_c·1000/FS a la carga de Euler en el criterio. Ese salto
+se informa aparte (salto_criterio_kN) junto con la distancia al criterio.
+"""
+import math
+import numpy as np
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD, ESBELTEZ_CRITERIO
+from utils import validar_numero
+from lotes import matriz_a_arreglos, calcular_lote, CONTROL_EULER
+from validacion import radios_derivados
+
+# variable -> clave de la derivada; el orden es el de las columnas de 'elasticidades'
+VARIABLES = ("area_m2", "r_m", "altura_m", "K_factor", "factor_seguridad", "f_c_MPa", "E_GPa")
+PASO_RELATIVO = 0.01  # paso con que se comparan los efectos de cada dato (1 %)
+# En estas fórmulas las elasticidades valen ±1 o ±2, así que los empates son exactos
+# salvo por el redondeo: efectos que difieren menos que esto se consideran iguales
+TOL_EMPATE = 1e-9
+
+
+def derivadas_lote(lote, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5, r_derivado=None):
+    """
+    Derivadas de carga_adm_final_kN para un lote de calcular_lote. r_derivado marca
+    las filas cuyo r sale del área (validacion.radios_derivados): en ellas la derivada
+    respecto del área es la total y la de r es NaN.
+    Devuelve {variable: arreglo} con las claves de VARIABLES, más 'elasticidades'
+    (n, 7): ∂C/∂x · x / C, comparables entre variables de unidades distintas.
+    """
+    fs = validar_numero(factor_seguridad, "factor_seguridad")
+    K = float(K_factor)
+    C = lote["carga_adm_final_kN"]
+    A, r, L = lote["area_m2"], lote["r_m"], lote["altura_m"]
+    euler = lote["control"] == CONTROL_EULER
+    cero = np.zeros_like(C)
+    derivado = np.zeros(len(C), dtype=bool) if r_derivado is None else np.asarray(r_derivado, dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = {
+            "area_m2": np.where(euler & derivado, 2.0 * C / A, C / A),
+            "r_m": np.where(derivado, np.nan, np.where(euler, 2.0 * C / r, cero)),
+            "altura_m": np.where(euler, -2.0 * C / L, cero),
+            "K_factor": np.where(euler, -2.0 * C / K, cero),
+            "factor_seguridad": -C / fs,
+            "f_c_MPa": np.where(euler, cero, C / lote["f_c_MPa"]),
+            "E_GPa": np.where(euler, C / lote["E_GPa"], cero),
+        }
+    valores = {"area_m2": A, "r_m": r, "altura_m": L, "K_factor": K, "factor_seguridad": fs,
+               "f_c_MPa": lote["f_c_MPa"], "E_GPa": lote["E_GPa"]}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d["elasticidades"] = np.stack([d[v] * valores[v] / C for v in VARIABLES], axis=1)
+    return d
+
+
+def salto_criterio(lote, factor_seguridad=DEFAULT_FACTOR_SEGURIDAD):
+    """
+    Caída de la carga admisible al cruzar lambda = ESBELTEZ_CRITERIO (0 si Euler no
+    gobernaría allí). En el criterio KL/r = λc, así que Pcr = π²·E·A / λc².
+    """
+    fs = validar_numero(factor_seguridad, "factor_seguridad")
+    euler_criterio = (math.pi ** 2) * (lote["E_GPa"] * 1e9) * lote["area_m2"] / (ESBELTEZ_CRITERIO ** 2) / 1000.0 / fs
+    return np.maximum(lote["carga_adm_material_kN"] - euler_criterio, 0.0)
+
+
+def calcular_sensibilidades(matriz_columnas, materiales_dic=MATERIALES,
+                            factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+    """
+    Evalúa la matriz y agrega las derivadas. Devuelve {'ids', 'errores', 'lote',
+    'derivadas', 'r_derivado', 'efecto_paso_kN', 'mas_influyentes', 'distancia_criterio',
+    'salto_criterio_kN'}. efecto_paso_kN (n, 7) es el cambio de delta_kN al subir cada
+    dato un PASO_RELATIVO; mas_influyentes son, por columna, todas las variables con el
+    mayor |efecto| (empates dentro de TOL_EMPATE), en el orden de VARIABLES.
+    """
+    ids, arr, errores = matriz_a_arreglos(matriz_columnas, materiales_dic)
+    lote = calcular_lote(arr["alturas"], arr["areas"], arr["radios"], arr["materiales_idx"], arr["cargas"],
+                         materiales_dic, factor_seguridad, K_factor)
+    r_derivado = radios_derivados(matriz_columnas)
+    derivadas = derivadas_lote(lote, factor_seguridad, K_factor, r_derivado)
+    with np.errstate(invalid="ignore"):
+        # delta = P - C; 0.0 - x evita los -0.0 de las variables que no intervienen
+        efecto = 0.0 - derivadas["elasticidades"] * (lote["carga_adm_final_kN"] * PASO_RELATIVO)[:, None]
+    magnitud = np.where(lote["valido"][:, None], np.nan_to_num(np.abs(efecto), nan=-1.0), -1.0)
+    maximo = magnitud.max(axis=1, keepdims=True)
+    empatadas = (magnitud >= maximo * (1.0 - TOL_EMPATE)) & (maximo > 0.0)
+    return {
+        "ids": ids,
+        "errores": errores,
+        "lote": lote,
+        "derivadas": derivadas,
+        "r_derivado": r_derivado,
+        "efecto_paso_kN": efecto,
+        "mas_influyentes": [[v for v, e in zip(VARIABLES, fila) if e] for fila in empatadas.tolist()],
+        "distancia_criterio": lote["lambda"] - ESBELTEZ_CRITERIO,
+        "salto_criterio_kN": salto_criterio(lote, factor_seguridad),
+    }
+
+
+def informe_sensibilidad(matriz_columnas, materiales_dic=MATERIALES,
+                         factor_seguridad=DEFAULT_FACTOR_SEGURIDAD, K_factor=0.5):
+    """
+    Una fila (diccionario) por columna con derivadas de delta_kN, elasticidades y el
+    efecto sobre delta_kN de subir cada dato un PASO_RELATIVO. Si r se derivó del área,
+    sus valores son None.
+    """
+    sens = calcular_sensibilidades(matriz_columnas, materiales_dic, factor_seguridad, K_factor)
+    lote, d, errores = sens["lote"], sens["derivadas"], sens["errores"]
+    derivadas = {v: d[v].tolist() for v in VARIABLES}
+    elasticidades = d["elasticidades"].tolist()
+    efectos = sens["efecto_paso_kN"].tolist()
+    delta = lote["delta_kN"].tolist()
+    distancia = sens["distancia_criterio"].tolist()
+    salto = sens["salto_criterio_kN"].tolist()
+    r_derivado = sens["r_derivado"].tolist()
+
+    filas = []
+    for i, (id_col, ok) in enumerate(zip(sens["ids"], lote["valido"].tolist())):
+        if not ok:
+            filas.append({"id": id_col, "error": errores[i]})
+            continue
+        # delta = P - C: mejorar delta es bajarlo
+        d_delta = {v: 0.0 - derivadas[v][i] for v in VARIABLES}
+        elasticidad = dict(zip(VARIABLES, elasticidades[i]))
+        efecto = dict(zip(VARIABLES, efectos[i]))
+        if r_derivado[i]:
+            d_delta["r_m"] = elasticidad["r_m"] = efecto["r_m"] = None  # NaN no es JSON válido
+        filas.append({
+            "id": id_col,
+            "delta_kN": delta[i],
+            "r_derivado": r_derivado[i],
+            "d_delta": d_delta,
+            "elasticidad_carga_adm": elasticidad,
+            "efecto_paso_kN": efecto,
+            "mas_influyentes": sens["mas_influyentes"][i],
+            "distancia_criterio": distancia[i],
+            "salto_criterio_kN": salto[i],
+        })
+    return filas
@@ -0,0 +1,412 @@
+# servicio.py
+"""
+Servicio HTTP/JSON local (asyncio, sin dependencias externas).
+
+    POST /columna   {"columna": [id, altura, seccion, material, carga], "factor_seguridad": 3, "K_factor": 0.5}
+    POST /lote      {"columnas": [[...], ...], "factor_seguridad": 3, "K_factor": 0.5}
+    GET  /metricas
+
+Las columnas sueltas que llegan casi al mismo tiempo se juntan en un microlote y se
+evalúan con una sola llamada al motor vectorizado. Todo el cálculo corre en un grupo
+de procesos, así que el bucle de eventos sólo lee, encola y escribe. /lote responde
+con codificación chunked: {"resultados": [...], "resumen": {...}}, bloque a bloque.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from materiales import MATERIALES, DEFAULT_FACTOR_SEGURIDAD
+from utils import validar_numero
+from lotes import calcular_volumenes_totales_lote
+from paralelo import combinar_resumenes, num_procesos_defecto
+
+TAM_MICROLOTE = 2000        # columnas sueltas por llamada al motor
+ESPERA_MICROLOTE_S = 0.002  # cuánto se espera a que lleguen más antes de calcular
+TAM_BLOQUE = 5000           # filas por bloque de /lote
+MAX_SOLICITUDES = 64        # solicitudes atendidas a la vez; el resto espera su turno
+MAX_COLA = 100000           # columnas sueltas en espera antes de responder 503
+MAX_FILAS_LOTE = 5000000
+MAX_CUERPO = 512 * 1024 * 1024
+MUESTRAS_LATENCIA = 10000
+
+RUTAS = {"/columna": "POST", "/lote": "POST", "/metricas": "GET"}
+_ESTADOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+# Materiales de cada proceso trabajador (se envían una sola vez)
+_config = {}
+
+
+def _iniciar_trabajador(materiales_dic):
+    _config["materiales"] = materiales_dic
+
+
+def _nada():
+    pass
+
+
+def _sin_no_finitos(valor):
+    if isinstance(valor, float):
+        return valor if math.isfinite(valor) else None
+    if isinstance(valor, dict):
+        return {k: _sin_no_finitos(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_sin_no_finitos(v) for v in valor]
+    return valor
+
+
+def _json(datos):
+    """JSON válido: NaN e infinitos (p. ej. una carga "nan") se escriben como null."""
+    try:
+        return json.dumps(datos, ensure_ascii=False, allow_nan=False)
+    except ValueError:
+        return json.dumps(_sin_no_finitos(datos), ensure_ascii=False, allow_nan=False)
+
+
+def _evaluar_grupo(columnas, factor_seguridad, K_factor):
+    return calcular_volumenes_totales_lote(columnas, _config["materiales"], factor_seguridad, K_factor)[0]
+
+
+def _evaluar_bloque_json(columnas, factor_seguridad, K_factor):
+    """Resultados del bloque ya serializados (el JSON también es trabajo de CPU) y su resumen."""
+    resultados, resumen = calcular_volumenes_totales_lote(columnas, _config["materiales"], factor_seguridad, K_factor)
+    return ",".join(_json(r) for r in resultados), resumen
+
+
+class ErrorSolicitud(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class _RespuestaCortada(Exception):
+    """Falla después de enviar el encabezado de /lote: ya no se puede responder 500."""
+
+
+class Metricas:
+    """Contadores y latencias recientes para /metricas."""
+
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.solicitudes = {}
+        self.errores = 0
+        self.filas = 0
+        self.microlotes = 0
+        self.filas_microlote = 0
+        self.latencias = {}
+
+    def registrar(self, ruta, segundos, filas, estado):
+        self.solicitudes[ruta] = self.solicitudes.get(ruta, 0) + 1
+        self.latencias.setdefault(ruta, deque(maxlen=MUESTRAS_LATENCIA)).append(segundos)
+        self.filas += filas
+        if estado >= 400:
+            self.errores += 1
+
+    def resumen(self, en_curso, en_cola):
+        transcurrido = time.monotonic() - self.inicio
+        latencias = {}
+        for ruta, muestras in self.latencias.items():
+            orden = sorted(muestras)
+            latencias[ruta] = {
+                f"p{p}_ms": 1000.0 * orden[min(len(orden) - 1, int(p / 100.0 * len(orden)))]
+                for p in (50, 95, 99)
+            }
+        return {
+            "tiempo_activo_s": transcurrido,
+            "solicitudes": dict(self.solicitudes),
+            "errores": self.errores,
+            "filas": self.filas,
+            "filas_por_s": self.filas / transcurrido if transcurrido > 0 else 0.0,
+            "microlotes": self.microlotes,
+            "filas_por_microlote": self.filas_microlote / self.microlotes if self.microlotes else 0.0,
+            "solicitudes_en_curso": en_curso,
+            "columnas_en_cola": en_cola,
+            "latencia": latencias,
+        }
+
+
+def _parametros(cuerpo):
+    """(FS, K) validados antes de encolar: un error en el trabajador ya no se podría informar bien."""
+    try:
+        params = (validar_numero(cuerpo.get("factor_seguridad", DEFAULT_FACTOR_SEGURIDAD), "factor_seguridad"),
+                  validar_numero(cuerpo.get("K_factor", 0.5), "K_factor"))
+    except ValueError as e:
+        raise ErrorSolicitud(400, str(e))
+    # validar_numero acepta "nan" e "inf" (y 1e400); con ellos no hay resultado que informar
+    for nombre, valor in zip(("factor_seguridad", "K_factor"), params):
+        if not math.isfinite(valor):
+            raise ErrorSolicitud(400, f"'{nombre}' debe ser un número finito (entrada: {valor})")
+    return params
+
+
+class ServicioCalculo:
+    """
+    Servidor HTTP/1.1 mínimo. ejecutor permite pasar otro Executor (p. ej. un
+    ThreadPoolExecutor en pruebas); por omisión se crea un grupo de num_procesos procesos.
+    """
+
+    def __init__(self, materiales_dic=MATERIALES, num_procesos=None, max_solicitudes=MAX_SOLICITUDES,
+                 max_filas_lote=MAX_FILAS_LOTE, tam_microlote=TAM_MICROLOTE,
+                 espera_microlote_s=ESPERA_MICROLOTE_S, tam_bloque=TAM_BLOQUE, ejecutor=None):
+        self.materiales_dic = materiales_dic
+        self.num_procesos = num_procesos or num_procesos_defecto()
+        self.max_solicitudes = max_solicitudes
+        self.max_filas_lote = max_filas_lote
+        self.tam_microlote = tam_microlote
+        self.espera_microlote_s = espera_microlote_s
+        self.tam_bloque = tam_bloque
+        self.ejecutor = ejecutor
+        self.metricas = Metricas()
+        self.en_curso = 0
+        self._servidor = None
+        self._conexiones = set()
+        self._grupos = set()  # tareas de microlote en curso: se guardan para que no se pierdan
+
+    # ---------------- ciclo de vida ----------------
+
+    async def iniciar(self, host="127.0.0.1", puerto=8765):
+        loop = asyncio.get_running_loop()
+        if self.ejecutor is None:
+            self.ejecutor = ProcessPoolExecutor(max_workers=self.num_procesos, initializer=_iniciar_trabajador,
+                                                initargs=(self.materiales_dic,))
+            # los procesos se crean con el primer envío; con fork heredan los sockets abiertos
+            # en ese momento y la conexión de ese cliente no se cerraría nunca. Se crean ahora,
+            # antes de escuchar, y de paso un error del inicializador aparece al arrancar.
+            await asyncio.gather(*(loop.run_in_executor(self.ejecutor, _nada) for _ in range(self.num_procesos)))
+        else:
+            _iniciar_trabajador(self.materiales_dic)
+        self._turnos = asyncio.Semaphore(self.max_solicitudes)
+        # a lo sumo dos tareas por proceso: las demás esperan aquí y no en el ejecutor
+        self._calculos = asyncio.Semaphore(2 * self.num_procesos)
+        self._cola = asyncio.Queue(maxsize=MAX_COLA)
+        self._agrupador = asyncio.create_task(self._agrupar())
+        self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            for escritor in list(self._conexiones):
+                escritor.close()
+            await self._servidor.wait_closed()
+        tareas = [self._agrupador, *self._grupos]
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+        self.ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    async def servir(self, host="127.0.0.1", puerto=8765):
+        await self.iniciar(host, puerto)
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.cerrar()
+
+    async def _calcular(self, funcion, *args):
+        async with self._calculos:
+            return await asyncio.get_running_loop().run_in_executor(self.ejecutor, funcion, *args)
+
+    # ---------------- microlotes ----------------
+
+    async def _agrupar(self):
+        """Toma columnas sueltas de la cola y las evalúa juntas, agrupadas por (FS, K)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            pendientes = [await self._cola.get()]
+            limite = loop.time() + self.espera_microlote_s
+            while len(pendientes) < self.tam_microlote:
+                espera = limite - loop.time()
+                if espera <= 0:
+                    break
+                try:
+                    pendientes.append(await asyncio.wait_for(self._cola.get(), espera))
+                except asyncio.TimeoutError:
+                    break
+            grupos = {}
+            for columna, params, futuro in pendientes:
+                grupos.setdefault(params, []).append((columna, futuro))
+            for params, grupo in grupos.items():
+                tarea = asyncio.create_task(self._resolver_grupo(params, grupo))
+                self._grupos.add(tarea)
+                tarea.add_done_callback(self._grupos.discard)
+
+    async def _resolver_grupo(self, params, grupo):
+        self.metricas.microlotes += 1
+        self.metricas.filas_microlote += len(grupo)
+        try:
+            resultados = await self._calcular(_evaluar_grupo, [c for c, _ in grupo], *params)
+        except asyncio.CancelledError:
+            for _, futuro in grupo:
+                futuro.cancel()
+            raise
+        except Exception as e:
+            for _, futuro in grupo:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        for (_, futuro), res in zip(grupo, resultados):
+            if not futuro.done():
+                futuro.set_result(res)
+
+    # ---------------- HTTP ----------------
+
+    async def _atender(self, lector, escritor):
+        self._conexiones.add(escritor)
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not linea.strip():
+                    break
+                try:
+                    metodo, ruta, encabezados, largo = await self._leer_encabezado(linea, lector)
+                except ErrorSolicitud as e:
+                    # sin un encabezado válido no se sabe dónde empieza la próxima solicitud
+                    await self._responder(escritor, e.estado, {"error": str(e)})
+                    self.metricas.registrar("otras", 0.0, 0, e.estado)
+                    break
+                if largo > MAX_CUERPO:
+                    await self._responder(escritor, 413, {"error": "Cuerpo demasiado grande"})
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b""
+                seguir = encabezados.get("connection", "").lower() != "close"
+
+                t0 = time.perf_counter()
+                ruta = ruta.split("?", 1)[0]
+                async with self._turnos:
+                    self.en_curso += 1
+                    try:
+                        estado, filas = await self._despachar(metodo, ruta, cuerpo, escritor)
+                    except ErrorSolicitud as e:
+                        estado, filas = e.estado, 0
+                        await self._responder(escritor, estado, {"error": str(e)})
+                    except _RespuestaCortada:
+                        # el cliente ve el chunked sin terminar y la conexión cerrada
+                        estado, filas, seguir = 500, 0, False
+                    except Exception as e:
+                        # p. ej. un trabajador caído: el cliente recibe una respuesta igual
+                        estado, filas = 500, 0
+                        await self._responder(escritor, estado, {"error": f"Error interno: {e}"})
+                    finally:
+                        self.en_curso -= 1
+                self.metricas.registrar(ruta if ruta in RUTAS else "otras", time.perf_counter() - t0, filas, estado)
+                if not seguir:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: el servidor se está cerrando con la conexión abierta
+            pass
+        finally:
+            self._conexiones.discard(escritor)
+            escritor.close()
+
+    @staticmethod
+    async def _leer_encabezado(linea, lector):
+        """(método, ruta, encabezados, largo del cuerpo); ErrorSolicitud(400) si están mal formados."""
+        partes = linea.decode("latin-1").split()
+        if len(partes) != 3 or not partes[2].startswith("HTTP/"):
+            raise ErrorSolicitud(400, "Línea de solicitud inválida")
+        metodo, ruta, _ = partes
+        encabezados = {}
+        while True:
+            h = await lector.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            nombre, _, valor = h.decode("latin-1").partition(":")
+            encabezados[nombre.strip().lower()] = valor.strip()
+        texto = encabezados.get("content-length", "") or "0"
+        if not texto.isdigit():
+            raise ErrorSolicitud(400, f"Content-Length inválido: {texto}")
+        return metodo, ruta, encabezados, int(texto)
+
+    async def _responder(self, escritor, estado, datos):
+        cuerpo = _json(datos).encode("utf-8")
+        escritor.write(
+            f"HTTP/1.1 {estado} {_ESTADOS[estado]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo)
+        await escritor.drain()
+
+    async def _despachar(self, metodo, ruta, cuerpo, escritor):
+        if ruta not in RUTAS:
+            raise ErrorSolicitud(404, f"Ruta desconocida: {ruta}")
+        if metodo != RUTAS[ruta]:
+            raise ErrorSolicitud(405, f"{ruta} sólo acepta {RUTAS[ruta]}")
+        if ruta == "/metricas":
+            await self._responder(escritor, 200, self.metricas.resumen(self.en_curso, self._cola.qsize()))
+            return 200, 0
+
+        try:
+            datos = json.loads(cuerpo)
+        except ValueError as e:
+            raise ErrorSolicitud(400, f"JSON inválido: {e}")
+        if not isinstance(datos, dict):
+            raise ErrorSolicitud(400, "Se esperaba un objeto JSON")
+        params = _parametros(datos)
+        if ruta == "/columna":
+            return await self._columna(datos, params, escritor)
+        return await self._lote(datos, params, escritor)
+
+    async def _columna(self, datos, params, escritor):
+        columna = datos.get("columna")
+        if not isinstance(columna, list) or not columna:
+            raise ErrorSolicitud(400, "Falta 'columna' (lista [id, altura, seccion, material, carga])")
+        futuro = asyncio.get_running_loop().create_future()
+        try:
+            self._cola.put_nowait((columna, params, futuro))
+        except asyncio.QueueFull:
+            raise ErrorSolicitud(503, "Demasiadas columnas en espera")
+        res = await futuro
+        estado = 422 if "error" in res else 200
+        await self._responder(escritor, estado, res)
+        return estado, 1
+
+    async def _lote(self, datos, params, escritor):
+        columnas = datos.get("columnas")
+        if not isinstance(columnas, list):
+            raise ErrorSolicitud(400, "Falta 'columnas' (lista de columnas)")
+        if len(columnas) > self.max_filas_lote:
+            raise ErrorSolicitud(413, f"Como máximo {self.max_filas_lote} columnas por lote")
+        if any(not isinstance(c, list) or not c for c in columnas):
+            raise ErrorSolicitud(400, "Cada columna debe ser una lista no vacía")
+
+        # ventana deslizante: a lo sumo 2 bloques por proceso en vuelo; al escribir el más
+        # viejo se envía el siguiente, así la memoria no crece con el tamaño del lote
+        ventana = 2 * self.num_procesos
+        en_vuelo = deque()
+        siguiente = 0
+        escritor.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json; charset=utf-8\r\n"
+                       b"Transfer-Encoding: chunked\r\n\r\n")
+        resumenes = []
+        separador = ""
+        try:
+            self._trozo(escritor, '{"resultados": [')
+            while en_vuelo or siguiente < len(columnas):
+                while siguiente < len(columnas) and len(en_vuelo) < ventana:
+                    bloque = columnas[siguiente:siguiente + self.tam_bloque]
+                    en_vuelo.append(asyncio.ensure_future(self._calcular(_evaluar_bloque_json, bloque, *params)))
+                    siguiente += len(bloque)
+                texto, resumen = await en_vuelo.popleft()
+                resumenes.append(resumen)
+                if texto:
+                    self._trozo(escritor, separador + texto)
+                    separador = ","
+                await escritor.drain()
+        except BaseException as e:
+            for tarea in en_vuelo:
+                tarea.cancel()
+            if isinstance(e, Exception) and not isinstance(e, ConnectionError):
+                raise _RespuestaCortada() from e
+            raise
+        self._trozo(escritor, '], "resumen": ' + _json(combinar_resumenes(resumenes)) + "}")
+        escritor.write(b"0\r\n\r\n")
+        await escritor.drain()
+        return 200, len(columnas)
+
+    @staticmethod
+    def _trozo(escritor, texto):
+        datos = texto.encode("utf-8")
+        escritor.write(f"{len(datos):x}\r\n".encode("latin-1") + datos + b"\r\n")
@@ -0,0 +1,188 @@
+# tabla_resultados.py
+import numpy as np
+from lotes import CONTROL_TEXTO, VEREDICTO_TEXTO
+
+CONTROL_ERROR = -1
+VEREDICTO_ERROR = 2
+
+CONTROL_CODIGO = {texto: i for i, texto in enumerate(CONTROL_TEXTO)}
+VEREDICTO_CODIGO = {texto: codigo for codigo, texto in VEREDICTO_TEXTO.items()}
+VEREDICTO_CODIGO["ERROR"] = VEREDICTO_ERROR
+
+CAMPOS_NUMERICOS = ("carga_aplicada_kN", "carga_adm_final_kN", "lambda", "delta_kN")
+CAMPOS_ORDEN = ("id",) + CAMPOS_NUMERICOS + ("control", "veredicto")
+
+CAPACIDAD_INICIAL = 1024
+
+
+class TablaResultados:
+    """
+    Resultados en arreglos columnares con un índice clave de fila -> posición.
+    Las bajas marcan la fila como muerta y se compacta cuando sobran demasiadas.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.capacidad = 0
+        self.numeros = {}
+        self.control = None
+        self.veredicto = None
+        self.vivo = None
+        self.ids = []
+        self.claves = []
+        self.errores = {}   # posición -> mensaje
+        self.indice = {}    # clave de fila -> posición
+        self.muertas = 0
+        self.version = 0
+        self._vista = (None, None)
+        self._reservar(CAPACIDAD_INICIAL)
+
+    def __len__(self):
+        return self.n - self.muertas
+
+    def _reservar(self, capacidad):
+        def crecer(arr, dtype, relleno):
+            nuevo = np.full(capacidad, relleno, dtype=dtype)
+            if arr is not None:
+                nuevo[:self.n] = arr[:self.n]
+            return nuevo
+
+        for c in CAMPOS_NUMERICOS:
+            self.numeros[c] = crecer(self.numeros.get(c), np.float64, np.nan)
+        self.control = crecer(self.control, np.int8, CONTROL_ERROR)
+        self.veredicto = crecer(self.veredicto, np.int8, VEREDICTO_ERROR)
+        self.vivo = crecer(self.vivo, bool, False)
+        self.capacidad = capacidad
+
+    def _escribir(self, pos, res):
+        self.ids[pos] = res["id"]
+        if "error" in res:
+            self.errores[pos] = res["error"]
+            for c in CAMPOS_NUMERICOS:
+                self.numeros[c][pos] = np.nan
+            self.control[pos] = CONTROL_ERROR
+            self.veredicto[pos] = VEREDICTO_ERROR
+        else:
+            self.errores.pop(pos, None)
+            for c in CAMPOS_NUMERICOS:
+                self.numeros[c][pos] = res[c]
+            self.control[pos] = CONTROL_CODIGO[res["control"]]
+            self.veredicto[pos] = VEREDICTO_CODIGO[res["veredicto"]]
+
+    def actualizar(self, clave, res):
+        """Alta o modificación de la fila identificada por clave."""
+        pos = self.indice.get(clave)
+        if pos is None:
+            if self.n == self.capacidad:
+                self._reservar(self.capacidad * 2)
+            pos = self.n
+            self.n += 1
+            self.ids.append(None)
+            self.claves.append(clave)
+            self.indice[clave] = pos
+            self.vivo[pos] = True
+        self._escribir(pos, res)
+        self.version += 1
+
+    def eliminar(self, clave):
+        pos = self.indice.pop(clave, None)
+        if pos is None:
+            return
+        self.vivo[pos] = False
+        self.errores.pop(pos, None)
+        self.muertas += 1
+        self.version += 1
+        if self.muertas > CAPACIDAD_INICIAL and self.muertas * 2 > self.n:
+            self._compactar()
+
+    def _compactar(self):
+        vivas = np.flatnonzero(self.vivo[:self.n])
+        errores = {}
+        for nueva, vieja in enumerate(vivas.tolist()):
+            if vieja in self.errores:
+                errores[nueva] = self.errores[vieja]
+        for c in CAMPOS_NUMERICOS:
+            self.numeros[c][:len(vivas)] = self.numeros[c][vivas]
+        self.control[:len(vivas)] = self.control[vivas]
+        self.veredicto[:len(vivas)] = self.veredicto[vivas]
+        self.ids = [self.ids[i] for i in vivas.tolist()]
+        self.claves = [self.claves[i] for i in vivas.tolist()]
+        self.n = len(vivas)
+        self.vivo[:] = False
+        self.vivo[:self.n] = True
+        self.errores = errores
+        self.indice = {k: i for i, k in enumerate(self.claves)}
+        self.muertas = 0
+
+    def vista(self, veredicto=None, control=None, delta_min=None, orden=None, descendente=False):
+        """
+        Posiciones de las filas vivas que cumplen los filtros, en el orden pedido.
+        veredicto y control aceptan el texto mostrado ("Euler", "margen disponible", "ERROR"...).
+        """
+        parametros = (self.version, veredicto, control, delta_min, orden, descendente)
+        if self._vista[0] == parametros:
+            return self._vista[1]
+
+        n = self.n
+        mascara = self.vivo[:n].copy()
+        if veredicto is not None:
+            mascara &= self.veredicto[:n] == VEREDICTO_CODIGO[veredicto]
+        if control is not None:
+            mascara &= self.control[:n] == CONTROL_CODIGO[control]
+        if delta_min is not None:
+            mascara &= self.numeros["delta_kN"][:n] > delta_min
+        posiciones = np.flatnonzero(mascara)
+
+        if orden is not None:
+            if orden == "id":
+                claves_orden = [str(self.ids[i]) for i in posiciones.tolist()]
+                perm = np.array(sorted(range(len(posiciones)), key=claves_orden.__getitem__), dtype=np.int64)
+            elif orden == "control":
+                perm = np.argsort(self.control[posiciones], kind="stable")
+            elif orden == "veredicto":
+                perm = np.argsort(self.veredicto[posiciones], kind="stable")
+            else:
+                perm = np.argsort(self.numeros[orden][posiciones], kind="stable")
+            if descendente:
+                perm = perm[::-1]
+            posiciones = posiciones[perm]
+
+        self._vista = (parametros, posiciones)
+        return posiciones
+
+    def criticos(self, k, criterio="utilizacion"):
+        """
+        Posiciones de las k filas vivas con mayor criterio (utilizacion, delta_kN o lambda),
+        de la más crítica a la menos; a igual valor, la que se agregó primero.
+        """
+        n = self.n
+        num = self.numeros
+        if criterio == "utilizacion":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                valores = num["carga_aplicada_kN"][:n] / num["carga_adm_final_kN"][:n]
+        else:
+            valores = num[criterio][:n]
+        posiciones = np.flatnonzero(self.vivo[:n] & ~np.isnan(valores))
+        valores = valores[posiciones]
+        if len(posiciones) > k:
+            # partition halla el corte de las k mayores sin ordenar todo el resto
+            corte = np.partition(valores, len(valores) - k)[len(valores) - k]
+            elegidas = valores >= corte
+            posiciones, valores = posiciones[elegidas], valores[elegidas]
+        orden = np.lexsort((posiciones, -valores))[:k]
+        return posiciones[orden]
+
+    def fila(self, pos):
+        """Valores de la fila tal como se muestran en la tabla de resultados."""
+        if pos in self.errores:
+            return (self.ids[pos], "Error", self.errores[pos], "-", "-", "ERROR")
+        num = self.numeros
+        return (
+            self.ids[pos],
+            f"{num['carga_aplicada_kN'][pos]:.3f}",
+            f"{num['carga_adm_final_kN'][pos]:.3f}",
+            f"{num['lambda'][pos]:.3f}",
+            f"{num['delta_kN'][pos]:.3f}",
+            VEREDICTO_TEXTO[int(self.veredicto[pos])],
+        )
+
@@ -0,0 +1,53 @@
+# tareas.py
+import queue
+import threading
+
+
+class TareaSegundoPlano:
+    """
+    Ejecuta una función generadora en un hilo aparte y deja cada elemento producido
+    en una cola. El hilo principal (p. ej. el bucle de Tk) los recoge sin bloquearse.
+    """
+
+    def __init__(self, funcion, *args, **kwargs):
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.cola = queue.Queue()
+        self.evento_cancelar = threading.Event()
+        self.hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self.error = None
+
+    def _ejecutar(self):
+        try:
+            for elemento in self.funcion(*self.args, **self.kwargs):
+                # lo ya producido se entrega siempre; se corta antes del siguiente bloque
+                self.cola.put(elemento)
+                if self.evento_cancelar.is_set():
+                    break
+        except Exception as e:
+            self.error = e
+
+    def iniciar(self):
+        self.hilo.start()
+        return self
+
+    def cancelar(self):
+        self.evento_cancelar.set()
+
+    @property
+    def cancelada(self):
+        return self.evento_cancelar.is_set()
+
+    def recoger(self):
+        """Elementos producidos desde la última llamada, sin esperar."""
+        elementos = []
+        while True:
+            try:
+                elementos.append(self.cola.get_nowait())
+            except queue.Empty:
+                return elementos
+
+    def terminada(self):
+        """Verdadero cuando el hilo terminó y ya se recogió todo lo producido."""
+        return not self.hilo.is_alive() and self.cola.empty()
@@ -35,3 +35,20 @@ def parsear_seccion_raw(seccion_raw):
     area = validar_numero(seccion_raw, "sección(area)", True)
     r = math.sqrt(area / 12.0)
     return area, r
+
+
+def parsear_seccion_texto(seccion):
+    """
+    Convierte el texto de una sección tal como se escribe en la GUI o en un CSV:
+    '[area,r]' o 'area,r' -> [area, r]; cualquier otro texto se devuelve sin cambios.
+    """
+    seccion = str(seccion).strip()
+    if seccion.startswith("[") or "," in seccion:
+        try:
+            s = seccion.replace(" ", "")
+            if s.startswith("[") and s.endswith("]"):
+                s = s[1:-1]
+            return [float(p) for p in s.split(",")]
+        except Exception:
+            return seccion
+    return seccion
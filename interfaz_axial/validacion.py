@@ -0,0 +1,282 @@
+# validacion.py
+"""
+Validación de toda la matriz de columnas en una pasada, sin lanzar excepciones.
+Cada fila recibe una máscara de bits con los campos inválidos y un código de error
+por campo; el mensaje de texto (idéntico al del cálculo escalar) se arma sólo
+cuando alguien lo pide.
+"""
+import math
+import re
+from itertools import chain
+from collections.abc import Mapping
+from numbers import Real
+import numpy as np
+from materiales import MATERIALES
+from catalogo import CatalogoMateriales
+
+# Bits de la máscara (un bit por campo)
+CAMPO_ALTURA = 1
+CAMPO_AREA = 2
+CAMPO_RADIO = 4
+CAMPO_CARGA = 8
+CAMPO_MATERIAL = 16
+
+# Columnas del arreglo de códigos, en el orden en que el cálculo escalar revisa los campos
+CAMPOS = ("altura", "area", "radio", "material_presente", "carga", "material")
+I_ALTURA, I_AREA, I_RADIO, I_MAT_PRESENTE, I_CARGA, I_MATERIAL = range(len(CAMPOS))
+BIT_CAMPO = (CAMPO_ALTURA, CAMPO_AREA, CAMPO_RADIO, CAMPO_MATERIAL, CAMPO_CARGA, CAMPO_MATERIAL)
+
+# Códigos de error
+OK = 0
+NO_NUMERICO = 1
+NO_POSITIVO = 2
+NO_REGISTRADO = 3
+FALTANTE = 4
+
+# Lo que float() acepta en un texto: decimales con guiones bajos, exponente, inf y nan
+_RE_NUMERO = re.compile(
+    r"\s*[+-]?(?:"
+    r"(?:\d(?:_?\d)*(?:\.(?:\d(?:_?\d)*)?)?|\.\d(?:_?\d)*)(?:[eE][+-]?\d(?:_?\d)*)?"
+    r"|inf(?:inity)?|nan"
+    r")\s*",
+    re.IGNORECASE,
+)
+
+
+def convertir_numero(valor):
+    """(float, código) sin lanzar excepciones; sigue las mismas reglas que validar_numero."""
+    t = type(valor)
+    if t is float or t is int:
+        v = float(valor)
+    elif t is str:
+        if not _RE_NUMERO.fullmatch(valor):
+            return 0.0, NO_NUMERICO
+        v = float(valor)
+    elif isinstance(valor, Real):
+        v = float(valor)
+    else:
+        # tipos poco comunes (Decimal, bytes...): aquí sí se delega en float()
+        try:
+            v = float(valor)
+        except (TypeError, ValueError):
+            return 0.0, NO_NUMERICO
+    if v <= 0:
+        return v, NO_POSITIVO
+    return v, OK
+
+
+class ValidacionMatriz:
+    """
+    Resultado de validar_matriz: arreglos numéricos ya convertidos, máscara por fila,
+    códigos por fila y campo, y mensajes perezosos en `errores` (posición -> texto).
+    """
+
+    def __init__(self, matriz_columnas, ids, arreglos, mascara, codigos, primer_error):
+        self.matriz = matriz_columnas
+        self.ids = ids
+        self.arreglos = arreglos
+        self.mascara = mascara
+        self.codigos = codigos
+        self.primer_error = primer_error  # fila inválida -> (campo, código) que vería el cálculo escalar
+        self.validas = mascara == 0
+        self.errores = ErroresPerezosos(self)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def conteo_por_campo(self):
+        """Filas con error en cada campo (según el bit de la máscara)."""
+        return {
+            "altura": int(np.count_nonzero(self.mascara & CAMPO_ALTURA)),
+            "area": int(np.count_nonzero(self.mascara & CAMPO_AREA)),
+            "radio": int(np.count_nonzero(self.mascara & CAMPO_RADIO)),
+            "carga": int(np.count_nonzero(self.mascara & CAMPO_CARGA)),
+            "material": int(np.count_nonzero(self.mascara & CAMPO_MATERIAL)),
+        }
+
+    def invalidas_en(self, campos):
+        """Máscara de filas con error en alguno de los campos dados (índices de CAMPOS)."""
+        return (self.codigos[:, list(campos)] != OK).any(axis=1)
+
+    def mensaje(self, i, campos=None):
+        """
+        Mensaje del primer campo inválido de la fila i, con el texto del cálculo escalar.
+        Con campos (índices de CAMPOS) sólo se consideran esos campos.
+        """
+        if campos is None:
+            if i not in self.primer_error:
+                return None
+            campo, codigo = self.primer_error[i]
+        else:
+            fila = self.codigos[i]
+            campo = next((c for c in sorted(campos) if fila[c] != OK), None)
+            if campo is None:
+                return None
+            codigo = int(fila[campo])
+        col = self.matriz[i]
+        id_col = col[0]
+
+        if codigo == FALTANTE:
+            return f"{type(col).__name__} index out of range"
+
+        if campo == I_ALTURA:
+            return _mensaje_numero(f"altura {id_col}", col[1], codigo)
+        if campo == I_AREA:
+            sec = col[2]
+            if isinstance(sec, (list, tuple)) and len(sec) >= 1:
+                return _mensaje_numero("sección.area", sec[0], codigo)
+            return _mensaje_numero("sección(area)", sec, codigo)
+        if campo == I_RADIO:
+            return _mensaje_numero("sección.radio_de_giro", col[2][1], codigo)
+        if campo == I_CARGA:
+            return _mensaje_numero(f"carga_aplicada {id_col}", col[4], codigo)
+        try:
+            hash(col[3])
+        except TypeError as e:
+            return str(e)
+        return f"Material '{col[3]}' no registrado."
+
+
+class ErroresPerezosos(Mapping):
+    """Posición -> mensaje de error, formateado recién al leerlo."""
+
+    def __init__(self, validacion):
+        self._val = validacion
+
+    def __contains__(self, i):
+        return i in self._val.primer_error
+
+    def __getitem__(self, i):
+        if i not in self._val.primer_error:
+            raise KeyError(i)
+        return self._val.mensaje(i)
+
+    def __iter__(self):
+        return iter(self._val.primer_error)
+
+    def __len__(self):
+        return len(self._val.primer_error)
+
+
+def _mensaje_numero(nombre_campo, valor, codigo):
+    if codigo == NO_NUMERICO:
+        return f"'{nombre_campo}' debe ser un número válido (entrada: {valor})"
+    return f"'{nombre_campo}' debe ser mayor que cero (entrada: {valor})"
+
+
+def radios_derivados(matriz_columnas):
+    """
+    Arreglo booleano: True en las filas cuyo r no se dio y se deriva del área
+    (r = sqrt(A/12)), así que no es un dato independiente.
+    """
+    def derivado(col):
+        sec = col[2] if len(col) > 2 else None
+        if isinstance(sec, (list, tuple)):
+            return len(sec) < 2 or sec[1] is None
+        return True
+
+    return np.fromiter((derivado(col) for col in matriz_columnas), dtype=bool, count=len(matriz_columnas))
+
+
+def validar_matriz(matriz_columnas, materiales_dic=MATERIALES):
+    """
+    Valida y convierte toda la matriz sin excepciones. Devuelve un ValidacionMatriz
+    con alturas, areas, radios, cargas y materiales_idx listos para calcular_lote.
+    """
+    if isinstance(materiales_dic, CatalogoMateriales):
+        claves = materiales_dic.ids
+    else:
+        claves = {k: i for i, k in enumerate(materiales_dic)}
+    n = len(matriz_columnas)
+    ids = [None] * n
+    alturas = [0.0] * n
+    areas = [0.0] * n
+    radios = [0.0] * n
+    cargas = [0.0] * n
+    mat_idx = [-1] * n
+    errores = []  # (fila, campo, código); suelen ser pocas
+    primer_error = {}
+    # nombres locales: el bucle recorre millones de filas
+    convertir = convertir_numero
+    sqrt = math.sqrt
+    i_altura, i_area, i_radio, i_mat_presente, i_carga, i_material = range(len(CAMPOS))
+    faltante, no_registrado = FALTANTE, NO_REGISTRADO
+    agregar = errores.append
+
+    for i, col in enumerate(matriz_columnas):
+        largo = len(col)
+        ids[i] = col[0]
+        n_errores = len(errores)
+
+        if largo > 1:
+            alturas[i], c = convertir(col[1])
+            if c:
+                agregar((i, i_altura, c))
+        else:
+            agregar((i, i_altura, faltante))
+
+        if largo > 2:
+            sec = col[2]
+            if isinstance(sec, (list, tuple)) and len(sec) >= 1:
+                area, c = convertir(sec[0])
+                if c:
+                    agregar((i, i_area, c))
+                if len(sec) >= 2 and sec[1] is not None:
+                    r, c_r = convertir(sec[1])
+                    if c_r:
+                        agregar((i, i_radio, c_r))
+                else:
+                    r = 0.0 if c else sqrt(area / 12.0)
+            else:
+                area, c = convertir(sec)
+                if c:
+                    agregar((i, i_area, c))
+                r = 0.0 if c else sqrt(area / 12.0)
+            areas[i] = area
+            radios[i] = r
+        else:
+            agregar((i, i_area, faltante))
+
+        if largo <= 3:
+            agregar((i, i_mat_presente, faltante))
+
+        if largo > 4:
+            cargas[i], c = convertir(col[4])
+            if c:
+                agregar((i, i_carga, c))
+        else:
+            agregar((i, i_carga, faltante))
+
+        if largo > 3:
+            try:
+                idx = claves.get(col[3])
+            except TypeError:  # clave no hasheable
+                idx = None
+            if idx is None:
+                agregar((i, i_material, no_registrado))
+            else:
+                mat_idx[i] = idx
+
+        if len(errores) > n_errores:
+            # se agregan en el orden de revisión del cálculo escalar: el primero de la fila manda
+            primer_error[i] = errores[n_errores][1:]
+
+    mascara = np.zeros(n, dtype=np.uint8)
+    codigos = np.zeros((n, len(CAMPOS)), dtype=np.int8)
+    if errores:
+        tabla = np.fromiter(chain.from_iterable(errores), dtype=np.int64, count=3 * len(errores)).reshape(-1, 3)
+        filas, campos, cods = tabla[:, 0], tabla[:, 1], tabla[:, 2]
+        codigos[filas, campos] = cods
+        np.bitwise_or.at(mascara, filas, np.array(BIT_CAMPO, dtype=np.uint8)[campos])
+
+    mat_idx = np.array(mat_idx, dtype=np.int64)
+    # las filas inválidas no deben pasar por los núcleos
+    mat_idx[mascara != 0] = -1
+    arreglos = {
+        "alturas": np.array(alturas, dtype=np.float64),
+        "areas": np.array(areas, dtype=np.float64),
+        "radios": np.array(radios, dtype=np.float64),
+        "materiales_idx": mat_idx,
+        "cargas": np.array(cargas, dtype=np.float64),
+    }
+    return ValidacionMatriz(matriz_columnas, ids, arreglos, mascara, codigos, primer_error)
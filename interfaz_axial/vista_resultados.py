@@ -0,0 +1,150 @@
+# vista_resultados.py
+import tkinter as tk
+from tkinter import ttk
+from lotes import CONTROL_TEXTO, VEREDICTO_TEXTO
+from tabla_resultados import TablaResultados
+from criticos import CRITERIOS, K_DEFECTO
+
+FILAS_VISIBLES = 20
+TODOS = "(todos)"
+
+# columna mostrada -> campo de TablaResultados por el que se ordena
+COLUMNAS = (
+    ("id", "id"),
+    ("c_aplicada", "carga_aplicada_kN"),
+    ("c_adm", "carga_adm_final_kN"),
+    ("lambda", "lambda"),
+    ("delta", "delta_kN"),
+    ("veredicto", "veredicto"),
+)
+
+
+class VistaResultados:
+    """
+    Tabla de resultados virtualizada: el Treeview sólo contiene las filas visibles
+    y el resto se lee de una TablaResultados al desplazarse, filtrar u ordenar.
+    """
+
+    def __init__(self, padre, tabla=None, filas_visibles=FILAS_VISIBLES):
+        self.tabla = tabla or TablaResultados()
+        self.filas_visibles = filas_visibles
+        self.inicio = 0
+        self.orden = None
+        self.descendente = False
+        self.posiciones = []
+
+        barra = ttk.Frame(padre)
+        barra.pack(fill="x")
+
+        ttk.Label(barra, text="Veredicto:").pack(side="left")
+        self.filtro_veredicto = ttk.Combobox(barra, state="readonly", width=22,
+                                             values=(TODOS,) + tuple(VEREDICTO_TEXTO.values()) + ("ERROR",))
+        self.filtro_veredicto.set(TODOS)
+        self.filtro_veredicto.pack(side="left", padx=4)
+
+        ttk.Label(barra, text="Control:").pack(side="left")
+        self.filtro_control = ttk.Combobox(barra, state="readonly", width=10, values=(TODOS,) + CONTROL_TEXTO)
+        self.filtro_control.set(TODOS)
+        self.filtro_control.pack(side="left", padx=4)
+
+        ttk.Label(barra, text="delta >").pack(side="left")
+        self.filtro_delta = ttk.Entry(barra, width=10)
+        self.filtro_delta.pack(side="left", padx=4)
+
+        # modo críticos: sólo las k filas con mayor criterio, de la más crítica a la menos
+        self.solo_criticos = tk.BooleanVar(value=False)
+        ttk.Checkbutton(barra, text="Sólo críticos", variable=self.solo_criticos,
+                        command=lambda: self.refrescar(reiniciar=True)).pack(side="left", padx=4)
+        self.criterio = ttk.Combobox(barra, state="readonly", width=11, values=CRITERIOS)
+        self.criterio.set(CRITERIOS[0])
+        self.criterio.pack(side="left", padx=4)
+        ttk.Label(barra, text="k:").pack(side="left")
+        self.k_criticos = ttk.Entry(barra, width=6)
+        self.k_criticos.insert(0, str(K_DEFECTO))
+        self.k_criticos.pack(side="left", padx=4)
+
+        self.lbl_conteo = ttk.Label(barra, text="")
+        self.lbl_conteo.pack(side="right", padx=6)
+
+        for w in (self.filtro_veredicto, self.filtro_control, self.criterio):
+            w.bind("<<ComboboxSelected>>", lambda e: self.refrescar(reiniciar=True))
+        for w in (self.filtro_delta, self.k_criticos):
+            w.bind("<Return>", lambda e: self.refrescar(reiniciar=True))
+
+        cuerpo = ttk.Frame(padre)
+        cuerpo.pack(fill="both", expand=True)
+
+        self.tree = ttk.Treeview(cuerpo, columns=[c for c, _ in COLUMNAS], show="headings", height=filas_visibles)
+        for c, campo in COLUMNAS:
+            self.tree.heading(c, text=c, command=lambda campo=campo: self.ordenar_por(campo))
+        self.scroll = ttk.Scrollbar(cuerpo, orient="vertical", command=self._scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="right", fill="y")
+
+        self.tree.bind("<MouseWheel>", lambda e: self._mover(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda e: self._mover(-1))
+        self.tree.bind("<Button-5>", lambda e: self._mover(1))
+
+    def _filtros(self):
+        veredicto = self.filtro_veredicto.get()
+        control = self.filtro_control.get()
+        texto_delta = self.filtro_delta.get().strip()
+        try:
+            delta_min = float(texto_delta) if texto_delta else None
+        except ValueError:
+            delta_min = None
+        return (
+            None if veredicto == TODOS else veredicto,
+            None if control == TODOS else control,
+            delta_min,
+        )
+
+    def ordenar_por(self, campo):
+        if self.orden == campo:
+            self.descendente = not self.descendente
+        else:
+            self.orden = campo
+            self.descendente = False
+        self.refrescar(reiniciar=True)
+
+    def _scroll(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self.inicio = int(float(cantidad) * len(self.posiciones))
+            self._dibujar()
+        elif accion == "scroll":
+            paso = self.filas_visibles if unidad == "pages" else 1
+            self._mover(int(cantidad) * paso)
+
+    def _mover(self, filas):
+        self.inicio += filas
+        self._dibujar()
+
+    def refrescar(self, reiniciar=False):
+        """Recalcula la vista filtrada/ordenada y vuelve a dibujar la ventana visible."""
+        if self.solo_criticos.get():
+            try:
+                k = max(1, int(self.k_criticos.get()))
+            except ValueError:
+                k = K_DEFECTO
+            self.posiciones = self.tabla.criticos(k, self.criterio.get())
+        else:
+            veredicto, control, delta_min = self._filtros()
+            self.posiciones = self.tabla.vista(veredicto, control, delta_min, self.orden, self.descendente)
+        if reiniciar:
+            self.inicio = 0
+        self.lbl_conteo.config(text=f"{len(self.posiciones)} de {len(self.tabla)} filas")
+        self._dibujar()
+
+    def _dibujar(self):
+        total = len(self.posiciones)
+        self.inicio = max(0, min(self.inicio, total - self.filas_visibles))
+        fin = min(total, self.inicio + self.filas_visibles)
+
+        self.tree.delete(*self.tree.get_children())
+        for pos in self.posiciones[self.inicio:fin].tolist():
+            self.tree.insert("", tk.END, values=self.tabla.fila(pos))
+
+        if total:
+            self.scroll.set(self.inicio / total, fin / total)
+        else:
+            self.scroll.set(0.0, 1.0)